@@ -6,7 +6,7 @@
 from .language_config import LanguageConfig
 from .base_handler import BaseLanguageHandler, WordEntry
 from .word_loader import WordLoader
-from .card_renderer import CardRenderer
+from .card_renderer import CardRenderer, configure_shared_renderers, get_shared_renderer, invalidate_templates
 from .language_manager import LanguageManager
 
 __all__ = [
@@ -15,5 +15,8 @@ __all__ = [
     'WordEntry',
     'WordLoader',
     'CardRenderer',
+    'configure_shared_renderers',
+    'get_shared_renderer',
+    'invalidate_templates',
     'LanguageManager'
 ]
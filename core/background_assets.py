@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+背景图资源管理
+
+将 CDN 背景图和 AI 生成的背景图下载到本地缓存，渲染时改用虚拟源上的本地地址，
+避免 Chromium 在每次渲染中重新下载大尺寸图片。
+下载通过可替换的 BackgroundFetcher 完成，测试时可换成本地 HTTP 服务或内存实现
+（见 scripts/test_background_assets.py）。
+
+安装 Pillow 后还会按卡片尺寸 × 缩放倍数生成缩小后的派生图，
+以及预先模糊好的玻璃区域背景，浏览器只需做廉价的合成。
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import re
+import urllib.parse
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+try:
+    from PIL import Image, ImageFilter
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from .image_cache import ImageCache
+from .image_renderer import VIRTUAL_ORIGIN, local_asset_path, local_asset_url
+
+logger = logging.getLogger(__name__)
+
+# 派生图 JPEG 质量
+DERIVED_JPEG_QUALITY = 88
+
+# 缓存总大小上限中分给派生图的比例（派生图已按卡片尺寸缩小，体积远小于原图）
+DERIVED_BUDGET_RATIO = 0.25
+
+_BLUR_PATTERN = re.compile(r"backdrop-filter:\s*blur\((\d+(?:\.\d+)?)px\)")
+
+
+def detect_backdrop_blur(template_path: Path) -> Optional[float]:
+    """
+    检测模板中玻璃效果使用的模糊半径
+
+    Args:
+        template_path: 模板文件路径
+
+    Returns:
+        模糊半径（CSS 像素），模板未使用 backdrop-filter 时返回 None
+    """
+    try:
+        match = _BLUR_PATTERN.search(template_path.read_text(encoding='utf-8'))
+    except OSError:
+        return None
+    return float(match.group(1)) if match else None
+
+
+# 可识别的图片扩展名，其余 URL（如 AI 生成接口）统一按 .jpg 存储
+_IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif"}
+
+
+class BackgroundFetcher(ABC):
+    """背景图下载器接口"""
+
+    @abstractmethod
+    async def fetch(self, url: str) -> bytes:
+        """
+        下载图片
+
+        Args:
+            url: 图片地址
+
+        Returns:
+            图片字节数据
+        """
+
+
+class HttpFetcher(BackgroundFetcher):
+    """基于 requests 的 HTTP 下载器（在线程中执行，不阻塞事件循环）"""
+
+    def __init__(self, timeout: float = 120):
+        """
+        初始化下载器
+
+        Args:
+            timeout: 单次请求超时（秒），AI 生成接口响应较慢
+        """
+        self.timeout = timeout
+
+    async def fetch(self, url: str) -> bytes:
+        """下载图片"""
+        return await asyncio.to_thread(self._fetch_sync, url)
+
+    def _fetch_sync(self, url: str) -> bytes:
+        import requests
+
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "image/")
+        if not content_type.startswith("image/"):
+            raise ValueError(f"返回内容不是图片: {content_type}")
+        return response.content
+
+
+class BackgroundAssetManager:
+    """
+    背景图本地缓存
+
+    负责：
+    - 按 URL 下载并缓存背景图（同一 URL 并发请求只下载一次）
+    - 将远程 URL 改写为本地虚拟源 URL
+    - 后台预取 CDN 背景图
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        fetcher: Optional[BackgroundFetcher] = None,
+        max_bytes: int = 500 * 1024 * 1024,
+        max_age: float = 365 * 86400
+    ):
+        """
+        初始化管理器
+
+        Args:
+            cache_dir: 背景图缓存目录
+            fetcher: 图片下载器，默认使用 HttpFetcher
+            max_bytes: 缓存总大小上限（字节），原图和派生图按 DERIVED_BUDGET_RATIO 分配
+            max_age: 缓存最长保留时间（秒）
+        """
+        self.cache_dir = cache_dir
+        self.fetcher = fetcher or HttpFetcher()
+        derived_bytes = int(max_bytes * DERIVED_BUDGET_RATIO)
+        self.store = ImageCache(cache_dir, max_bytes=max_bytes - derived_bytes, max_age=max_age)
+        self.derived = ImageCache(cache_dir / "derived", max_bytes=derived_bytes, max_age=max_age)
+
+    @staticmethod
+    def is_remote(url: str) -> bool:
+        """是否为需要下载的远程地址"""
+        return url.startswith(("http://", "https://")) and not url.startswith(VIRTUAL_ORIGIN)
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _suffix(url: str) -> str:
+        suffix = Path(urllib.parse.urlsplit(url).path).suffix.lower()
+        return suffix if suffix in _IMAGE_SUFFIXES else ".jpg"
+
+    def cached_path(self, url: str) -> Optional[Path]:
+        """已缓存时返回本地路径，否则返回 None"""
+        return self.store.get(self._key(url), self._suffix(url))
+
+    async def ensure(self, url: str, timeout: Optional[float] = None) -> Optional[Path]:
+        """
+        确保背景图已下载到本地
+
+        Args:
+            url: 背景图地址
+            timeout: 等待下载的上限（秒），None 表示一直等待；超时后下载仍在后台继续
+
+        Returns:
+            本地路径；非远程地址、下载失败或超时返回 None
+        """
+        if not self.is_remote(url):
+            return None
+
+        async def download(output_path: Path):
+            data = await self.fetcher.fetch(url)
+            output_path.write_bytes(data)
+
+        task = asyncio.ensure_future(
+            self.store.get_or_render(self._key(url), download, self._suffix(url))
+        )
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            logger.debug(f"背景图下载未在 {timeout}s 内完成，继续后台下载: {url}")
+            task.add_done_callback(self._log_background_failure)
+            return None
+        except Exception as e:
+            logger.warning(f"下载背景图失败 {url}: {e}")
+            return None
+
+    def localize(self, url: str) -> str:
+        """
+        将远程背景图地址改写为本地虚拟源地址
+
+        Args:
+            url: 背景图地址
+
+        Returns:
+            已缓存时返回本地 URL，否则原样返回
+        """
+        if not self.is_remote(url):
+            return url
+        path = self.cached_path(url)
+        return local_asset_url(path) if path is not None else url
+
+    def source_path(self, url: str) -> Optional[Path]:
+        """背景图对应的本地原图路径（已下载的远程图或离线图）"""
+        if self.is_remote(url):
+            return self.cached_path(url)
+        path = local_asset_path(url)
+        return path if path is not None and path.exists() else None
+
+    def _derived_key(self, source: Path, kind: str, card_size: Tuple[int, int], scale: int, blur: float) -> str:
+        stat = source.stat()
+        # 已下载的远程图按 URL 寻址、内容不变，而缓存命中会刷新其 mtime，不能计入键；
+        # 离线图可能被替换，按 mtime 区分
+        version = "" if source.parent == self.store.cache_dir else stat.st_mtime_ns
+        signature = f"{source}|{version}|{stat.st_size}|{kind}|{card_size[0]}x{card_size[1]}@{scale}|{blur}"
+        return hashlib.sha256(signature.encode('utf-8')).hexdigest()
+
+    async def prepare(
+        self,
+        url: str,
+        card_size: Tuple[int, int],
+        scale: int,
+        blur: Optional[float] = None,
+        timeout: Optional[float] = None
+    ) -> bool:
+        """
+        下载背景图并生成派生图
+
+        Args:
+            url: 背景图地址
+            card_size: 卡片尺寸（CSS 像素）
+            scale: 设备缩放倍数
+            blur: 玻璃效果模糊半径（CSS 像素），None 表示不生成模糊图
+            timeout: 等待下载的上限（秒）
+
+        Returns:
+            派生图是否可用
+        """
+        if self.is_remote(url):
+            await self.ensure(url, timeout=timeout)
+        if not PIL_AVAILABLE:
+            return False
+
+        source = self.source_path(url)
+        if source is None:
+            return False
+
+        kinds = ["cover"] + (["blur"] if blur else [])
+        try:
+            for kind in kinds:
+                key = self._derived_key(source, kind, card_size, scale, blur or 0)
+
+                async def render(output_path: Path, kind=kind):
+                    await asyncio.to_thread(
+                        _write_derivative, source, output_path, kind, card_size, scale, blur or 0
+                    )
+
+                await self.derived.get_or_render(key, render, ".jpg")
+        except Exception as e:
+            logger.warning(f"生成背景派生图失败 {source.name}: {e}")
+            return False
+        return True
+
+    def resolve(
+        self,
+        url: str,
+        card_size: Tuple[int, int],
+        scale: int,
+        blur: Optional[float] = None
+    ) -> Tuple[str, str]:
+        """
+        获取渲染用的背景图地址
+
+        Args:
+            url: 背景图原始地址
+            card_size: 卡片尺寸（CSS 像素）
+            scale: 设备缩放倍数
+            blur: 玻璃效果模糊半径（CSS 像素）
+
+        Returns:
+            (背景图 URL, 预模糊背景 URL)，没有派生图时分别为本地/原始地址和空字符串
+        """
+        source = self.source_path(url)
+        if source is None or not PIL_AVAILABLE:
+            return self.localize(url), ""
+
+        cover = self.derived.get(self._derived_key(source, "cover", card_size, scale, blur or 0), ".jpg")
+        if cover is None:
+            return self.localize(url), ""
+
+        blurred = None
+        if blur:
+            blurred = self.derived.get(self._derived_key(source, "blur", card_size, scale, blur), ".jpg")
+        return local_asset_url(cover), local_asset_url(blurred) if blurred is not None else ""
+
+    async def prefetch(self, urls: Iterable[str], concurrency: int = 4) -> int:
+        """
+        后台批量预取背景图
+
+        Args:
+            urls: 背景图地址列表
+            concurrency: 同时下载数
+
+        Returns:
+            预取后可用的本地图片数
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(url: str) -> bool:
+            async with semaphore:
+                return await self.ensure(url) is not None
+
+        results = await asyncio.gather(*(fetch_one(url) for url in urls))
+        available = sum(1 for ok in results if ok)
+        logger.info(f"背景图预取完成: {available}/{len(results)}")
+        return available
+
+    @staticmethod
+    def _log_background_failure(task: asyncio.Future):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"后台下载背景图失败: {task.exception()}")
+
+
+def _write_derivative(
+    source: Path,
+    output_path: Path,
+    kind: str,
+    card_size: Tuple[int, int],
+    scale: int,
+    blur: float
+):
+    """
+    生成派生图（同步执行，在线程中调用）
+
+    cover: 缩放到恰好覆盖 card_size × scale 的尺寸，保持宽高比，
+           因此 background-size: cover 与任意 background-position 的取景与原图一致
+    blur:  在 CSS 像素分辨率下预先做高斯模糊，模糊后的图没有高频细节，放大显示无损观感
+    """
+    target_w = card_size[0] * scale
+    target_h = card_size[1] * scale
+    if kind == "blur":
+        target_w, target_h = card_size
+
+    with Image.open(source) as img:
+        img = img.convert("RGB")
+        ratio = max(target_w / img.width, target_h / img.height)
+        if ratio < 1:
+            size = (math.ceil(img.width * ratio), math.ceil(img.height * ratio))
+            img = img.resize(size, Image.LANCZOS)
+        if kind == "blur":
+            img = img.filter(ImageFilter.GaussianBlur(radius=blur))
+        img.save(output_path, format="JPEG", quality=DERIVED_JPEG_QUALITY, optimize=True)
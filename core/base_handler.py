@@ -3,30 +3,123 @@
 语种处理器基类
 """
 
+import logging
+import random
+import sys
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Optional
+from types import MappingProxyType
+from typing import Any, List, Dict, Mapping, Optional, Sequence, Tuple
 
+from .corpus import CorpusView
 from .language_config import LanguageConfig
 from .word_loader import WordLoader
-from .card_renderer import CardRenderer
+from .card_renderer import get_shared_renderer
+
+logger = logging.getLogger(__name__)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """驻留取值有限的分类字段（词性、等级、重音），同一卡组的词条共用同一个字符串对象"""
+    return sys.intern(value) if type(value) is str else value
 
 
-@dataclass
 class WordEntry:
     """
     统一的单词数据模型
 
-    提供跨语种的统一数据结构，支持通过 extra_fields 扩展
+    提供跨语种的统一数据结构。各语种已知的扩展字段（日语重音、例句翻译、JLPT 等级，
+    古文句序，无线电法规标签）为带类型的可选属性，其他扩展字段存放在 extras 中。
+
+    使用 __slots__，没有实例 __dict__；pos、level、accent 构造时驻留，
+    全卡组物化时重复的分类字符串只保留一份。
     """
 
-    word: str
-    phonetic: Optional[str] = None
-    pos: Optional[str] = None
-    definition: str = ""
-    example: Optional[str] = None
-    extra_fields: Dict[str, any] = field(default_factory=dict)
+    __slots__ = (
+        "word", "phonetic", "pos", "definition", "example",
+        "accent", "example_cn", "level", "sentence_num", "tags", "extras",
+    )
+
+    # 已知扩展字段（通过 extra_fields 传入时写入对应属性）
+    KNOWN_EXTRAS = ("accent", "example_cn", "level", "sentence_num", "tags")
+
+    def __init__(
+        self,
+        word: str,
+        phonetic: Optional[str] = None,
+        pos: Optional[str] = None,
+        definition: str = "",
+        example: Optional[str] = None,
+        accent: Optional[str] = None,
+        example_cn: Optional[str] = None,
+        level: Optional[str] = None,
+        sentence_num: Optional[str] = None,
+        tags: Optional[str] = None,
+        extra_fields: Optional[Dict[str, Any]] = None
+    ):
+        """
+        初始化词条
+
+        Args:
+            word: 单词（或题号、关键字）
+            phonetic: 读音
+            pos: 词性
+            definition: 释义
+            example: 例句
+            accent: 日语重音标记
+            example_cn: 日语例句的中文翻译
+            level: JLPT 等级（如 JLPT-N4）
+            sentence_num: 古文句序
+            tags: 无线电法规标签
+            extra_fields: 兼容旧接口的扩展字段字典，已知字段写入对应属性，其余存入 extras
+        """
+        self.word = word
+        self.phonetic = phonetic
+        self.pos = _intern(pos)
+        self.definition = definition
+        self.example = example
+        self.accent = _intern(accent)
+        self.example_cn = example_cn
+        self.level = _intern(level)
+        self.sentence_num = sentence_num
+        self.tags = tags
+        self.extras: Optional[Dict[str, Any]] = None
+        if extra_fields:
+            for key, value in extra_fields.items():
+                if key in self.KNOWN_EXTRAS:
+                    setattr(self, key, _intern(value) if key in ("accent", "level") else value)
+                else:
+                    if self.extras is None:
+                        self.extras = {}
+                    self.extras[key] = value
+
+    @property
+    def extra_fields(self) -> Dict[str, Any]:
+        """扩展字段字典（兼容旧接口，每次访问新建，修改不影响词条）"""
+        fields = {
+            key: getattr(self, key) for key in self.KNOWN_EXTRAS
+            if getattr(self, key) is not None
+        }
+        if self.extras:
+            fields.update(self.extras)
+        return fields
+
+    def _key(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._key() == other._key()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self.__slots__
+            if name in ("word", "definition") or getattr(self, name) is not None
+        )
+        return f"WordEntry({fields})"
 
     def validate(self) -> bool:
         """
@@ -60,6 +153,18 @@ class BaseLanguageHandler(ABC):
     - 字体和样式配置
     """
 
+    # 卡片模板文件名（位于根目录 templates 下），子类覆盖
+    template_name: str = "card.html"
+
+    # 有效词条必须非空的原始字段，子类覆盖
+    required_fields: Tuple[str, ...] = ()
+
+    # 映射到 WordEntry.word 的原始字段，子类覆盖
+    word_field: str = "word"
+
+    # 未传入主题色时使用的默认主题色，子类覆盖
+    default_theme_color: str = "#2F4F4F"
+
     def __init__(self, config: LanguageConfig, lang_dir: Path):
         """
         初始化处理器
@@ -68,34 +173,127 @@ class BaseLanguageHandler(ABC):
             config: 语种配置
             lang_dir: 语种目录路径
         """
-        self.config = config
         self.lang_dir = lang_dir
-        self.words: List[WordEntry] = []
+        self.words: Sequence[WordEntry] = []
 
         # 初始化加载器（支持共享词库路径）
         shared_path = getattr(config, 'shared_words_path', None)
         self.loader = WordLoader(lang_dir / "words.json", shared_path)
-        # 使用根目录下的 templates
-        self.renderer = CardRenderer(lang_dir.parent.parent / "templates")
+        # 使用根目录下的 templates（所有 Handler 共用同一个渲染器）
+        self.renderer = get_shared_renderer(lang_dir.parent.parent / "templates")
+        self.apply_config(config)
 
-    @abstractmethod
-    def load_words(self) -> List[WordEntry]:
+    def apply_config(self, config: LanguageConfig):
+        """
+        应用卡组配置，并预先计算卡片的静态模板变量
+
+        配置加载或重新加载时调用，渲染单张卡片时只需合并词条字段和视觉参数
+
+        Args:
+            config: 语种配置
+        """
+        self.config = config
+        self.static_context: Mapping[str, Any] = MappingProxyType(self.build_static_context())
+        # 按静态变量渲染的模板前缀: (渲染器版本, 前缀)，前缀为 None 表示该模板不能拆分渲染
+        self._static_prefix: Optional[Tuple[int, Optional[str]]] = None
+
+    def build_static_context(self) -> Dict[str, Any]:
+        """
+        构建同一卡组所有卡片相同的模板变量（字体、样式、标签等）
+
+        子类覆盖，结果在 apply_config 中冻结为只读映射
+
+        Returns:
+            模板变量字典
+        """
+        return {}
+
+    def card_context(self, visual: Dict[str, Any], **fields) -> Dict[str, Any]:
+        """
+        合并单张卡片的模板变量
+
+        Args:
+            visual: render_card 收到的视觉参数（bg_url、bg_blur_url、theme_color、bg_position）
+            **fields: 词条字段
+
+        Returns:
+            模板变量字典
+        """
+        context = dict(self.static_context)
+        context.update(fields)
+        context["bg_url"] = visual.get("bg_url", "")
+        context["bg_blur_url"] = visual.get("bg_blur_url", "")
+        context["theme_color"] = visual.get("theme_color", self.default_theme_color)
+        context["bg_position"] = visual.get("bg_position", "50% 50%")
+        return context
+
+    def load_words(self) -> Sequence[WordEntry]:
         """
         加载词汇数据
 
-        子类必须实现此方法，将原始数据转换为 WordEntry 列表
+        以 mmap 方式打开编译词库，只筛选出 required_fields 均非空的记录下标，
+        词条在被访问时才解码并通过 build_entry 转换为 WordEntry
 
         Returns:
-            WordEntry 列表
+            WordEntry 序列（只读视图）
+        """
+        corpus, indices = self.loader.load_corpus(self.required_fields)
+        self.words = CorpusView(corpus, indices, self.build_entry)
+        return self.words
+
+    def word_keys(self, words: Sequence[WordEntry]) -> List[str]:
+        """
+        获取卡组中每个词条的单词文本
+
+        编译词库视图只解码单词字段，不构造 WordEntry
+
+        Args:
+            words: load_words 返回的词条序列
+
+        Returns:
+            与 words 顺序一致的单词文本列表
+        """
+        if isinstance(words, CorpusView):
+            return words.column(self.word_field)
+        return [w.word for w in words]
+
+    @abstractmethod
+    def build_entry(self, item: Dict[str, str]) -> WordEntry:
+        """
+        将一条原始记录转换为 WordEntry
+
+        子类必须实现此方法，处理各语种的字段映射
+
+        Args:
+            item: 原始记录（字段名到文本）
+
+        Returns:
+            WordEntry
         """
         pass
 
     @abstractmethod
+    def card_variables(self, word: WordEntry, **kwargs) -> Dict[str, Any]:
+        """
+        单张卡片的模板变量
+
+        子类必须实现此方法，根据语种特点映射词条字段（通常通过 card_context 合并静态变量）
+
+        Args:
+            word: 单词数据
+            **kwargs: 额外参数（背景图、主题色等）
+
+        Returns:
+            模板变量字典
+        """
+        pass
+
     def render_card(self, word: WordEntry, **kwargs) -> str:
         """
         渲染卡片 HTML
 
-        子类必须实现此方法，根据语种特点渲染卡片
+        模板 <body> 之前的样式和脚本只依赖卡组配置，按静态变量渲染一次后缓存（static_prefix），
+        每张卡片只渲染主体部分
 
         Args:
             word: 单词数据
@@ -104,7 +302,62 @@ class BaseLanguageHandler(ABC):
         Returns:
             渲染后的 HTML 字符串
         """
-        pass
+        variables = self.card_variables(word, **kwargs)
+        prefix = self.static_prefix()
+        if prefix is None:
+            return self.renderer.render(self.template_name, variables)
+        return prefix + self.renderer.render_body(self.template_name, variables)
+
+    def static_prefix(self) -> Optional[str]:
+        """
+        卡组的模板前缀（doctype、样式、就绪脚本），同一卡组所有卡片相同
+
+        配置重新加载或模板失效后重新渲染；打开模板自动重载时每次都重新渲染。
+        前缀用到了静态变量以外的变量时返回 None，由调用方整体渲染
+
+        Returns:
+            HTML 前缀，或 None
+        """
+        generation = self.renderer.generation
+        cached = self._static_prefix
+        if cached is not None and cached[0] == generation and not self.renderer.auto_reload:
+            return cached[1]
+
+        prefix = None
+        missing = self.renderer.prefix_variables(self.template_name) - self.static_context.keys()
+        if missing:
+            logger.warning(
+                f"模板 {self.template_name} 的 <head> 使用了非静态变量 {sorted(missing)}，不拆分渲染"
+            )
+        else:
+            prefix = self.renderer.render_prefix(self.template_name, self.static_context)
+        self._static_prefix = (generation, prefix)
+        return prefix
+
+    def get_template_path(self) -> Path:
+        """
+        获取卡片模板文件路径
+
+        Returns:
+            模板文件路径
+        """
+        return self.renderer.templates_dir / self.template_name
+
+    def card_rng(self, word: WordEntry) -> random.Random:
+        """
+        卡片视觉参数的随机数生成器
+
+        背景、主题色和位置按 (模板, 单词) 固定随机种子选取，
+        同一张卡片每次渲染出相同的 HTML，从而能命中图片缓存；
+        共用模板和配置的卡组（如 japanese 与 japanese_n3）中的同一单词渲染结果相同，共用缓存图片
+
+        Args:
+            word: 单词数据
+
+        Returns:
+            随机数生成器
+        """
+        return random.Random(f"{self.template_name}:{word.word}")
 
     def get_fonts(self) -> Dict[str, str]:
         """
@@ -1,42 +1,216 @@
 # -*- coding: utf-8 -*-
 """
 卡片渲染器
+
+同一模板目录的所有 Handler 共用一个渲染器（get_shared_renderer），
+模板只编译一次；编译结果另存为磁盘字节码缓存，重启后免去解析和编译。
+
+没有 Jinja2 时使用内置的简易模板（compile_template）：模板预编译为文本片段和占位符，
+按文件修改时间缓存，渲染时一次拼接并做 HTML 转义，支持 {{ 变量 }} 和 {% if 变量 %}...{% else %}...{% endif %}。
+
+模板可在 <body> 处拆分为两部分分别渲染（render_prefix / render_body）：
+前缀（doctype、样式、就绪脚本）只能使用卡组静态变量，每个卡组渲染一次；主体随单词变化。
 """
 
+import logging
+import re
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 try:
-    from jinja2 import Environment, FileSystemLoader, select_autoescape
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, meta, select_autoescape
     JINJA2_AVAILABLE = True
 except ImportError:
     JINJA2_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
+# 模板拆分后的两部分，以 "模板名#部分" 的形式作为模板名使用
+PREFIX = "prefix"
+BODY = "body"
+
+_BODY_TAG = re.compile(r"<body\b", re.IGNORECASE)
+
+
+def split_template_source(source: str) -> Tuple[str, str]:
+    """
+    在 <body> 处拆分模板源码
+
+    前缀末尾的空白归入主体，Jinja2 去掉模板末尾换行的规则因此只作用于主体，
+    两部分分别渲染后拼接与整体渲染的结果一致
+
+    Args:
+        source: 模板源码
+
+    Returns:
+        (前缀, 主体)，没有 <body> 时前缀为空
+    """
+    match = _BODY_TAG.search(source)
+    if match is None:
+        return "", source
+    start = len(source[:match.start()].rstrip())
+    return source[:start], source[start:]
+
+
+if JINJA2_AVAILABLE:
+    class _SplitTemplateLoader(FileSystemLoader):
+        """模板名带 #prefix / #body 时返回拆分后的部分（两部分各自编译并缓存字节码）"""
+
+        def get_source(self, environment, template):
+            name, _, part = template.partition("#")
+            source, filename, uptodate = super().get_source(environment, name)
+            if part:
+                source = split_template_source(source)[0 if part == PREFIX else 1]
+            return source, filename, uptodate
+
+# 简易模板支持的标签：{{ name }}、{% if name %}、{% else %}、{% endif %}
+_TAG = re.compile(r"\{\{\s*(\w+)\s*\}\}|\{%\s*(?:if\s+(\w+)|(else)|(endif))\s*%\}")
+
+# HTML 转义表（与 Jinja2 自动转义的输出逐字节一致）
+_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&#34;", "'": "&#39;"})
+
+# 编译后的片段：文本、变量名 (VAR, 名称)、条件块 (IF, 名称, 成立分支, 否则分支)
+VAR = 0
+IF = 1
+Segment = Union[str, Tuple]
+
+
+def compile_template(source: str) -> List[Segment]:
+    """
+    将模板编译为片段列表（Jinja2 不可用时的回退方案）
+
+    Args:
+        source: 模板源码
+
+    Returns:
+        片段列表，供 render_segments 使用
+
+    Raises:
+        ValueError: if / else / endif 不配对
+    """
+    root: List[Segment] = []
+    # 每层: (当前写入的分支, 所属条件块的分支列表, 是否已进入 else)
+    stack: List[Tuple[List[Segment], Optional[List[List[Segment]]], bool]] = [(root, None, False)]
+    position = 0
+    for match in _TAG.finditer(source):
+        current = stack[-1][0]
+        if match.start() > position:
+            current.append(source[position:match.start()])
+        position = match.end()
+
+        name, condition, is_else, is_endif = match.groups()
+        if name is not None:
+            current.append((VAR, name))
+        elif condition is not None:
+            branches: List[List[Segment]] = [[], []]
+            current.append((IF, condition, branches[0], branches[1]))
+            stack.append((branches[0], branches, False))
+        elif is_else:
+            _, branches, in_else = stack[-1]
+            if branches is None or in_else:
+                raise ValueError(f"第 {source.count(chr(10), 0, match.start()) + 1} 行的 else 没有对应的 if")
+            stack[-1] = (branches[1], branches, True)
+        elif is_endif:
+            if len(stack) == 1:
+                raise ValueError(f"第 {source.count(chr(10), 0, match.start()) + 1} 行的 endif 没有对应的 if")
+            stack.pop()
+
+    if len(stack) > 1:
+        raise ValueError("模板中的 if 没有对应的 endif")
+    if position < len(source):
+        root.append(source[position:])
+    return root
+
+
+def render_segments(segments: List[Segment], variables: Dict, out: List[str]):
+    """
+    按变量渲染编译后的片段，结果追加到 out
+
+    变量值做 HTML 转义，缺失的变量输出为空；条件按变量真值判断（与 Jinja2 一致）
+    """
+    for segment in segments:
+        if segment.__class__ is str:
+            out.append(segment)
+        elif segment[0] == VAR:
+            if segment[1] in variables:
+                out.append(str(variables[segment[1]]).translate(_ESCAPES))
+        else:
+            render_segments(segment[2] if variables.get(segment[1]) else segment[3], variables, out)
+
 
 class CardRenderer:
     """
     卡片渲染器
 
     使用 Jinja2 模板引擎渲染卡片 HTML
-    如果 Jinja2 不可用，回退到简单的字符串替换
+    如果 Jinja2 不可用，回退到内置的简易模板（见 compile_template）
     """
 
-    def __init__(self, templates_dir: Path):
+    def __init__(
+        self,
+        templates_dir: Path,
+        bytecode_cache_dir: Optional[Path] = None,
+        auto_reload: bool = True
+    ):
         """
         初始化渲染器
 
         Args:
             templates_dir: 模板目录路径
+            bytecode_cache_dir: 编译后模板的字节码缓存目录，None 表示不缓存
+            auto_reload: 每次渲染时检查模板文件是否修改（关闭后需调用 invalidate 才会重新加载）
         """
         self.templates_dir = templates_dir
         self.use_jinja2 = JINJA2_AVAILABLE
+        # 简易模板的编译缓存: 模板名 -> (文件修改时间, 片段)
+        self._compiled: Dict[str, Tuple[int, List[Segment]]] = {}
+        # 每次重建环境或丢弃已编译模板时加一，调用方据此判断缓存的渲染结果（如模板前缀）是否失效
+        self.generation = 0
+        self.configure(bytecode_cache_dir, auto_reload)
 
-        if self.use_jinja2:
-            self.env = Environment(
-                loader=FileSystemLoader(str(templates_dir)),
-                autoescape=select_autoescape(['html', 'xml'])
-            )
-            self._register_filters()
+    def configure(self, bytecode_cache_dir: Optional[Path] = None, auto_reload: bool = True):
+        """
+        重建 Jinja2 环境（已编译的模板随之丢弃）
+
+        Args:
+            bytecode_cache_dir: 字节码缓存目录，None 表示不缓存
+            auto_reload: 是否检查模板文件修改
+        """
+        self.auto_reload = auto_reload
+        self._compiled.clear()
+        self.generation += 1
+        if not self.use_jinja2:
+            return
+
+        bytecode_cache = None
+        if bytecode_cache_dir is not None:
+            try:
+                bytecode_cache_dir.mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(str(bytecode_cache_dir))
+            except OSError as e:
+                logger.warning(f"无法创建模板字节码缓存目录 {bytecode_cache_dir}: {e}")
+
+        # 拆分后的模板名带 #部分 后缀，按文件名判断是否自动转义
+        autoescape = select_autoescape(['html', 'xml'])
+        self.env = Environment(
+            loader=_SplitTemplateLoader(str(self.templates_dir)),
+            autoescape=lambda name: autoescape(name.partition("#")[0] if name else name),
+            auto_reload=auto_reload,
+            bytecode_cache=bytecode_cache
+        )
+        self._register_filters()
+
+    def invalidate(self):
+        """
+        丢弃已编译的模板，下次渲染时重新加载
+
+        字节码缓存按模板源码校验，源码修改后的旧字节码不会被使用，无需清除
+        """
+        self._compiled.clear()
+        self.generation += 1
+        if self.use_jinja2 and self.env.cache is not None:
+            self.env.cache.clear()
 
     def render(self, template_name: str, variables: Dict) -> str:
         """
@@ -54,28 +228,97 @@ class CardRenderer:
         else:
             return self._render_simple(template_name, variables)
 
+    def render_prefix(self, template_name: str, variables: Dict) -> str:
+        """
+        渲染模板 <body> 之前的部分（样式和脚本）
+
+        Args:
+            template_name: 模板文件名
+            variables: 卡组静态变量
+
+        Returns:
+            HTML 前缀，与 render_body 的结果拼接即为完整 HTML
+        """
+        return self.render(f"{template_name}#{PREFIX}", variables)
+
+    def render_body(self, template_name: str, variables: Dict) -> str:
+        """
+        渲染模板从 <body> 开始的部分
+
+        Args:
+            template_name: 模板文件名
+            variables: 模板变量字典
+
+        Returns:
+            HTML 主体
+        """
+        return self.render(f"{template_name}#{BODY}", variables)
+
+    def prefix_variables(self, template_name: str) -> Set[str]:
+        """
+        模板前缀用到的变量名
+
+        Args:
+            template_name: 模板文件名
+
+        Returns:
+            变量名集合
+        """
+        if self.use_jinja2:
+            source = self.env.loader.get_source(self.env, f"{template_name}#{PREFIX}")[0]
+            return set(meta.find_undeclared_variables(self.env.parse(source)))
+
+        names: Set[str] = set()
+        pending = list(self._get_compiled(f"{template_name}#{PREFIX}"))
+        while pending:
+            segment = pending.pop()
+            if segment.__class__ is str:
+                continue
+            names.add(segment[1])
+            if segment[0] == IF:
+                pending.extend(segment[2])
+                pending.extend(segment[3])
+        return names
+
     def _render_jinja2(self, template_name: str, variables: Dict) -> str:
         """使用 Jinja2 渲染"""
         template = self.env.get_template(template_name)
         return template.render(**variables)
 
     def _render_simple(self, template_name: str, variables: Dict) -> str:
-        """简单字符串替换渲染（回退方案）"""
-        template_path = self.templates_dir / template_name
+        """简易模板渲染（回退方案）"""
+        out: List[str] = []
+        render_segments(self._get_compiled(template_name), variables, out)
+        return "".join(out)
+
+    def _get_compiled(self, template_name: str) -> List[Segment]:
+        """获取编译后的模板，文件修改后重新编译（关闭 auto_reload 时只编译一次）"""
+        cached = self._compiled.get(template_name)
+        if cached is not None and not self.auto_reload:
+            return cached[1]
 
-        if not template_path.exists():
+        file_name, _, part = template_name.partition("#")
+        template_path = self.templates_dir / file_name
+        try:
+            mtime = template_path.stat().st_mtime_ns
+        except OSError:
             raise FileNotFoundError(f"模板文件不存在: {template_path}")
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
 
         with open(template_path, 'r', encoding='utf-8') as f:
-            template = f.read()
-
-        # 简单的占位符替换
-        html = template
-        for key, value in variables.items():
-            placeholder = f"{{{{{key}}}}}"
-            html = html.replace(placeholder, str(value))
-
-        return html
+            source = f.read()
+        # 与 Jinja2 默认行为一致，去掉模板末尾的一个换行
+        if source.endswith("\n"):
+            source = source[:-1]
+        if part:
+            source = split_template_source(source)[0 if part == PREFIX else 1]
+        try:
+            segments = compile_template(source)
+        except ValueError as e:
+            raise ValueError(f"模板语法错误 {template_name}: {e}")
+        self._compiled[template_name] = (mtime, segments)
+        return segments
 
     def _register_filters(self):
         """注册自定义 Jinja2 过滤器"""
@@ -85,3 +328,54 @@ class CardRenderer:
         self.env.filters['upper'] = lambda x: x.upper() if x else ""
         self.env.filters['truncate'] = lambda x, n: x[:n] + "..." if len(x) > n else x
         self.env.filters['default'] = lambda x, d: x if x else d
+
+
+# 模板目录 -> 共享渲染器
+_shared_renderers: Dict[Path, CardRenderer] = {}
+_shared_lock = threading.Lock()
+_shared_settings: Dict[str, object] = {"bytecode_cache_dir": None, "auto_reload": False}
+
+
+def configure_shared_renderers(bytecode_cache_dir: Optional[Path] = None, auto_reload: bool = False):
+    """
+    设置共享渲染器的字节码缓存目录和自动重载（已创建的渲染器立即按新设置重建）
+
+    Args:
+        bytecode_cache_dir: 字节码缓存目录（如 data/template_cache），None 表示不缓存
+        auto_reload: 是否在每次渲染时检查模板文件修改（开发模板时打开）
+    """
+    with _shared_lock:
+        _shared_settings["bytecode_cache_dir"] = bytecode_cache_dir
+        _shared_settings["auto_reload"] = auto_reload
+        for renderer in _shared_renderers.values():
+            renderer.configure(bytecode_cache_dir, auto_reload)
+
+
+def get_shared_renderer(templates_dir: Path) -> CardRenderer:
+    """
+    获取模板目录的共享渲染器（进程内每个模板目录只创建一个）
+
+    Args:
+        templates_dir: 模板目录路径
+
+    Returns:
+        卡片渲染器
+    """
+    key = Path(templates_dir).resolve()
+    with _shared_lock:
+        renderer = _shared_renderers.get(key)
+        if renderer is None:
+            renderer = CardRenderer(
+                key,
+                bytecode_cache_dir=_shared_settings["bytecode_cache_dir"],
+                auto_reload=_shared_settings["auto_reload"]
+            )
+            _shared_renderers[key] = renderer
+        return renderer
+
+
+def invalidate_templates():
+    """模板文件修改后调用：所有共享渲染器在下次渲染时重新加载模板"""
+    with _shared_lock:
+        for renderer in _shared_renderers.values():
+            renderer.invalidate()
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+编译词库格式
+
+将 words.json 编译为列式字符串表 + 偏移数组的二进制文件，以 mmap 方式打开，
+记录在访问时才解码。插件启动和切换卡组的耗时不再随词库大小增长。
+编译文件保存在插件数据目录 data/corpus 下，词库更新后旧版本在新版本映射成功后删除。
+
+文件布局（整数均为 uint32，小端序）：
+    MAGIC (8 字节)
+    头部长度 (4 字节) + 头部 JSON（字段名、记录数）
+    填充到 4 字节对齐
+    偏移数组：每个字段一列，每列 count + 1 个偏移（相对字符串区起点）
+    字符串区：各字段按列连续存放的 UTF-8 文本
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VCORP1\0\0"
+COMPILED_SUFFIX = ".vcorp"
+
+# 编译文件目录（插件数据目录下，插件目录更新或只读时不受影响）
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "corpus"
+
+T = TypeVar("T")
+
+
+def _compiled_prefix(source: Path) -> str:
+    """同一 JSON 词库各版本编译文件共用的文件名前缀（卡组目录名 + 源路径哈希，区分同名的 words.json）"""
+    path_hash = hashlib.sha1(str(source.resolve()).encode('utf-8')).hexdigest()[:8]
+    return f"{source.parent.name}.{source.stem}.{path_hash}."
+
+
+def compiled_path_for(source: Path, cache_dir: Path = DEFAULT_CACHE_DIR) -> Path:
+    """
+    获取 JSON 词库对应的编译文件路径
+
+    文件名包含源文件的 mtime 和大小，JSON 变化后自然指向新文件，
+    不需要覆盖仍被 mmap 占用的旧文件（Windows 下无法替换已映射的文件）。
+
+    Args:
+        source: JSON 词库路径
+        cache_dir: 编译文件目录
+
+    Returns:
+        编译文件路径
+    """
+    stat = source.stat()
+    signature = hashlib.sha1(f"{stat.st_mtime_ns}|{stat.st_size}".encode('utf-8')).hexdigest()[:12]
+    return cache_dir / f"{_compiled_prefix(source)}{signature}{COMPILED_SUFFIX}"
+
+
+def build_corpus(records: List[Dict], target: Path):
+    """
+    将词条列表编译为二进制词库文件
+
+    Args:
+        records: 词条字典列表
+        target: 输出文件路径
+    """
+    fields: List[str] = []
+    for item in records:
+        for key in item:
+            if key not in fields:
+                fields.append(key)
+
+    offsets = array('I')
+    blob = bytearray()
+    for name in fields:
+        offsets.append(len(blob))
+        for item in records:
+            value = item.get(name)
+            if value is not None:
+                blob += str(value).encode('utf-8')
+            offsets.append(len(blob))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+
+    header = json.dumps({"fields": fields, "count": len(records)}, ensure_ascii=False).encode('utf-8')
+    prefix_len = len(MAGIC) + 4 + len(header)
+    padding = b"\0" * (-prefix_len % 4)
+
+    temp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    with open(temp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        f.write(padding)
+        f.write(offsets.tobytes())
+        f.write(blob)
+    os.replace(temp, target)
+
+
+class CompiledCorpus:
+    """
+    mmap 打开的编译词库
+
+    按 (记录下标, 字段) 随机访问，只解码被访问的字符串
+    """
+
+    def __init__(self, path: Path):
+        """
+        打开编译词库
+
+        Args:
+            path: 编译文件路径
+
+        Raises:
+            ValueError: 文件格式无效
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"编译词库为空: {path}")
+
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"编译词库格式无效: {path}")
+
+        pos = len(MAGIC)
+        (header_len,) = struct.unpack_from("<I", self._mm, pos)
+        pos += 4
+        header = json.loads(self._mm[pos:pos + header_len].decode('utf-8'))
+        pos += header_len
+        pos += -pos % 4
+
+        self.fields: List[str] = header["fields"]
+        self.count: int = header["count"]
+        self._field_index = {name: i for i, name in enumerate(self.fields)}
+        self._stride = self.count + 1
+
+        offsets_size = len(self.fields) * self._stride * 4
+        self._offsets = memoryview(self._mm)[pos:pos + offsets_size].cast('I')
+        if sys.byteorder != "little":
+            # 大端机器上复制一份转换字节序（极少见）
+            swapped = array('I', self._offsets.tobytes())
+            swapped.byteswap()
+            self._offsets.release()
+            self._offsets = memoryview(swapped)
+        self._blob_start = pos + offsets_size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _span(self, index: int, column: int):
+        base = column * self._stride + index
+        return self._offsets[base], self._offsets[base + 1]
+
+    def get(self, index: int, field: str) -> str:
+        """
+        读取单个字段
+
+        Args:
+            index: 记录下标
+            field: 字段名
+
+        Returns:
+            字段文本，字段不存在时返回空字符串
+        """
+        column = self._field_index.get(field)
+        if column is None:
+            return ""
+        start, end = self._span(index, column)
+        if start == end:
+            return ""
+        return self._mm[self._blob_start + start:self._blob_start + end].decode('utf-8')
+
+    def record(self, index: int) -> Dict[str, str]:
+        """
+        读取一条记录的全部字段
+
+        Args:
+            index: 记录下标
+
+        Returns:
+            字段名到文本的字典
+        """
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return {name: self.get(index, name) for name in self.fields}
+
+    def column(self, field: str) -> List[str]:
+        """解码整列字段（用于建立索引等一次性操作）"""
+        return [self.get(i, field) for i in range(self.count)]
+
+    def indices_with(self, fields: Iterable[str]) -> array:
+        """
+        筛选指定字段全部非空的记录下标
+
+        只比较偏移数组，不解码任何字符串
+
+        Args:
+            fields: 字段名列表
+
+        Returns:
+            记录下标数组
+        """
+        columns = [self._field_index.get(name) for name in fields]
+        if any(column is None for column in columns):
+            return array('I')
+
+        offsets = self._offsets
+        stride = self._stride
+        bases = [column * stride for column in columns]
+        return array('I', (
+            i for i in range(self.count)
+            if all(offsets[base + i] != offsets[base + i + 1] for base in bases)
+        ))
+
+    def close(self):
+        """关闭映射和文件"""
+        if getattr(self, "_offsets", None) is not None:
+            self._offsets.release()
+            self._offsets = None
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+
+def open_corpus(source: Path, cache_dir: Path = DEFAULT_CACHE_DIR) -> CompiledCorpus:
+    """
+    打开 JSON 词库对应的编译词库，JSON 有变化（或尚未编译）时先重新编译
+
+    Args:
+        source: JSON 词库路径
+        cache_dir: 编译文件目录
+
+    Returns:
+        编译词库
+    """
+    target = compiled_path_for(source, cache_dir)
+    if not target.exists():
+        with open(source, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        if not isinstance(records, list) or not all(isinstance(item, dict) for item in records):
+            raise ValueError(f"词库数据格式无效: {source}")
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        build_corpus(records, target)
+        logger.info(f"已编译词库: {source.name} -> {target.name} ({len(records)} 条)")
+
+    corpus = CompiledCorpus(target)
+    _prune_stale(source, target)
+    return corpus
+
+
+def _prune_stale(source: Path, current: Path):
+    """
+    新版本映射成功后清理同一词库的旧编译文件
+
+    包括早期版本放在词库旁边的编译文件；仍被映射（Windows）时删除失败，下次打开时再清理
+    """
+    stale = list(current.parent.glob(f"{_compiled_prefix(source)}*{COMPILED_SUFFIX}"))
+    stale += source.parent.glob(f"{source.stem}.*{COMPILED_SUFFIX}")
+    for path in stale:
+        if path == current:
+            continue
+        try:
+            path.unlink()
+            logger.debug(f"已清理旧的编译词库: {path.name}")
+        except OSError:
+            pass
+
+
+class CorpusView(Sequence):
+    """
+    编译词库上的只读视图
+
+    持有记录下标数组，按下标访问时才解码记录并通过 factory 构造词条对象
+    """
+
+    def __init__(
+        self,
+        corpus: CompiledCorpus,
+        indices: Sequence[int],
+        factory: Callable[[Dict[str, str]], T]
+    ):
+        """
+        初始化视图
+
+        Args:
+            corpus: 编译词库
+            indices: 视图包含的记录下标
+            factory: 将记录字典转换为词条对象的函数
+        """
+        self.corpus = corpus
+        self.indices = indices
+        self.factory = factory
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, position: Union[int, slice]):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        return self.factory(self.corpus.record(self.indices[position]))
+
+    def __iter__(self) -> Iterator[T]:
+        record = self.corpus.record
+        factory = self.factory
+        for index in self.indices:
+            yield factory(record(index))
+
+    def field(self, position: int, name: str) -> str:
+        """只读取某条记录的单个字段（不构造词条对象）"""
+        return self.corpus.get(self.indices[position], name)
+
+    def column(self, name: str) -> List[str]:
+        """按视图顺序读取全部记录的单个字段"""
+        get = self.corpus.get
+        return [get(index, name) for index in self.indices]
+
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+卡组批量导出
+
+将整个卡组渲染为图片文件（PNG / WebP / JPEG）或多页 PDF：
+- 词条按需逐个生成 HTML，经有界队列交给多个渲染协程，并发数与浏览器页面池一致
+- 渲染协程每次取出一批卡片排在同一页面上渲染（ImageRenderer.render_batch），再按位置裁剪截图
+- 每张卡片先写临时文件再替换，已存在的输出文件视为完成，中断后重新运行即从断点继续
+- 导出目录下的 export.json 记录导出参数和进度，参数不一致时拒绝混写
+- PDF 先导出每页的 JPEG，再由 Chromium 按卷（每卷 PDF_PAGES_PER_FILE 页）排版打印
+"""
+
+import asyncio
+import html
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .base_handler import WordEntry
+from .image_encoder import PIL_AVAILABLE, ImageEncoder
+from .image_renderer import ImageRenderer, grid_capacity, local_asset_url
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("png", "webp", "jpeg", "pdf")
+
+# 导出目录中的断点文件
+CHECKPOINT_FILE = "export.json"
+
+# 每个 PDF 文件的页数，超过时分卷
+PDF_PAGES_PER_FILE = 500
+
+# 断点文件和进度回调的最短间隔（秒）
+REPORT_INTERVAL = 5.0
+
+_UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+@dataclass
+class ExportProgress:
+    """导出进度"""
+
+    total: int = 0
+    # 已完成（含之前运行中完成的）
+    done: int = 0
+    # 本次运行渲染的卡片数
+    rendered: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """本次运行的渲染速度（张/秒）"""
+        return self.rendered / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        """进度摘要"""
+        text = f"{self.done}/{self.total}，{self.rate:.2f} 张/秒"
+        if self.failed:
+            text += f"，失败 {self.failed}"
+        return text
+
+
+class DeckExporter:
+    """
+    卡组导出器
+
+    用法:
+        exporter = DeckExporter(renderer, "idiom", words, build_html, output_dir, (432, 540))
+        progress = await exporter.run(on_progress=print)
+    """
+
+    def __init__(
+        self,
+        renderer: ImageRenderer,
+        lang_id: str,
+        words: Sequence[WordEntry],
+        build_html: Callable[[WordEntry], str],
+        output_dir: Path,
+        card_size: Tuple[int, int],
+        scale: int = 2,
+        fmt: str = "png",
+        quality: int = 90,
+        ready_timeout: int = 5000,
+        prepare: Optional[Callable[[WordEntry], Awaitable[object]]] = None,
+        batch_size: Optional[int] = None
+    ):
+        """
+        初始化导出器
+
+        Args:
+            renderer: 图片渲染器（使用其页面池）
+            lang_id: 卡组 ID（同时作为字体作用域）
+            words: 卡组词条序列
+            build_html: 生成单张卡片 HTML 的函数
+            output_dir: 导出目录
+            card_size: 卡片尺寸 (宽, 高)
+            scale: 设备缩放倍数
+            fmt: 输出格式 png / webp / jpeg / pdf
+            quality: webp / jpeg 质量（1-100）
+            ready_timeout: 等待字体和背景图就绪的上限（毫秒）
+            prepare: 生成 HTML 前的异步准备（如下载背景图），可选
+            batch_size: 每个页面同时渲染的卡片数，默认按网格容量，1 表示逐张渲染
+
+        Raises:
+            ValueError: 不支持的格式，或 webp 缺少 Pillow
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"不支持的导出格式: {fmt}（可选: {', '.join(EXPORT_FORMATS)}）")
+        if fmt == "webp" and not PIL_AVAILABLE:
+            raise ValueError("导出 WebP 需要 Pillow: pip install Pillow")
+
+        self.renderer = renderer
+        self.lang_id = lang_id
+        self.words = words
+        self.build_html = build_html
+        self.output_dir = Path(output_dir)
+        self.card_size = card_size
+        self.scale = scale
+        self.fmt = fmt
+        self.quality = quality
+        self.ready_timeout = ready_timeout
+        self.prepare = prepare
+        self.concurrency = renderer.pool.pool_size
+        # png / jpeg 由浏览器直接截图输出，webp 由截图重新编码
+        self.encoder = ImageEncoder("webp" if fmt == "webp" else "png", quality=quality)
+        if batch_size is None:
+            columns, rows = grid_capacity(card_size[0], card_size[1], scale)
+            batch_size = columns * rows
+        self.batch_size = max(1, batch_size)
+
+        # PDF 的每页图片单独存放，组卷后仍保留以便续导
+        self.pages_dir = self.output_dir / "pages" if fmt == "pdf" else self.output_dir
+        self.suffix = ".jpg" if fmt in ("jpeg", "pdf") else f".{fmt}"
+
+    def card_path(self, index: int, word: WordEntry) -> Path:
+        """第 index 张卡片的输出路径（序号在前，按卡组顺序排列）"""
+        name = _UNSAFE_CHARS.sub("_", word.word)[:40].strip("._") or "card"
+        return self.pages_dir / f"{index + 1:05d}_{name}{self.suffix}"
+
+    def _checkpoint_path(self) -> Path:
+        return self.output_dir / CHECKPOINT_FILE
+
+    def _load_checkpoint(self) -> Optional[Dict]:
+        path = self._checkpoint_path()
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取导出断点失败，重新记录: {e}")
+            return None
+
+    def _save_checkpoint(self, progress: ExportProgress, finished: bool = False):
+        data = {
+            "deck": self.lang_id,
+            "format": self.fmt,
+            "scale": self.scale,
+            "card_size": list(self.card_size),
+            "finished": finished,
+            "updated_at": time.time(),
+            **asdict(progress),
+        }
+        path = self._checkpoint_path()
+        temp = path.with_name(f".{path.name}.tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp, path)
+
+    def _check_compatible(self):
+        """已有断点的导出参数与本次不一致时拒绝续导，避免混入不同规格的图片"""
+        checkpoint = self._load_checkpoint()
+        if checkpoint is None:
+            return
+        previous = (checkpoint.get("deck"), checkpoint.get("format"), checkpoint.get("scale"))
+        if previous != (self.lang_id, self.fmt, self.scale):
+            raise ValueError(
+                f"导出目录 {self.output_dir} 已用于其他导出 "
+                f"(卡组={previous[0]}, 格式={previous[1]}, 缩放={previous[2]})，请更换目录或先删除"
+            )
+
+    async def _render_cards(self, documents: List[str], paths: List[Path]):
+        width, height = self.card_size
+        image_type = "jpeg" if self.suffix == ".jpg" else "png"
+        images = await self.renderer.render_batch(
+            documents,
+            width=width,
+            height=height,
+            scale=self.scale,
+            ready_timeout=self.ready_timeout,
+            font_scope=self.lang_id,
+            image_type=image_type,
+            quality=self.quality if image_type == "jpeg" else None
+        )
+        for data, path in zip(images, paths):
+            await self.encoder.write(data, path)
+
+    async def run(self, on_progress: Optional[Callable[[ExportProgress], object]] = None) -> ExportProgress:
+        """
+        执行导出（可中断，重新运行时跳过已完成的卡片）
+
+        Args:
+            on_progress: 进度回调，每 REPORT_INTERVAL 秒及结束时调用一次
+
+        Returns:
+            最终进度
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.pages_dir.mkdir(parents=True, exist_ok=True)
+        self._check_compatible()
+
+        progress = ExportProgress(total=len(self.words))
+        started = time.monotonic()
+        last_report = started
+        # 队列容量足够每个渲染协程凑满一批
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * self.batch_size)
+
+        def report():
+            nonlocal last_report
+            now = time.monotonic()
+            if now - last_report < REPORT_INTERVAL:
+                return
+            last_report = now
+            progress.elapsed = now - started
+            self._save_checkpoint(progress)
+            if on_progress is not None:
+                on_progress(progress)
+
+        async def produce():
+            # 逐个生成 HTML，队列已满时等待渲染协程，内存占用与卡组大小无关
+            for index in range(len(self.words)):
+                word = self.words[index]
+                path = self.card_path(index, word)
+                if path.exists():
+                    progress.done += 1
+                    continue
+                if self.prepare is not None:
+                    try:
+                        await self.prepare(word)
+                    except Exception as e:
+                        logger.debug(f"导出准备失败 {word.word}: {e}")
+                try:
+                    html_content = self.build_html(word)
+                except Exception as e:
+                    progress.failed += 1
+                    logger.warning(f"生成卡片 HTML 失败 {word.word}: {e}")
+                    continue
+                await queue.put((word, path, html_content))
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        async def consume():
+            finished = False
+            while not finished:
+                # 取到一张后把队列中已就绪的卡片一并取出，凑成一批
+                batch = []
+                item = await queue.get()
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size or queue.empty():
+                        break
+                    item = queue.get_nowait()
+                finished = item is None
+                if not batch:
+                    continue
+                try:
+                    await self._render_cards([html_content for _, _, html_content in batch], [path for _, path, _ in batch])
+                    progress.done += len(batch)
+                    progress.rendered += len(batch)
+                except Exception as e:
+                    progress.failed += len(batch)
+                    logger.warning(f"导出卡片失败 {batch[0][0].word} 等 {len(batch)} 张: {e}")
+                report()
+
+        await asyncio.gather(produce(), *(consume() for _ in range(self.concurrency)))
+
+        if self.fmt == "pdf" and progress.failed == 0:
+            await self._build_pdf()
+
+        progress.elapsed = time.monotonic() - started
+        self._save_checkpoint(progress, finished=progress.failed == 0)
+        if on_progress is not None:
+            on_progress(progress)
+        logger.info(f"卡组 {self.lang_id} 导出完成: {progress.summary()} -> {self.output_dir}")
+        return progress
+
+    def pdf_paths(self) -> List[Path]:
+        """各卷 PDF 的输出路径"""
+        volumes = max(1, -(-len(self.words) // PDF_PAGES_PER_FILE))
+        if volumes == 1:
+            return [self.output_dir / f"{self.lang_id}.pdf"]
+        return [self.output_dir / f"{self.lang_id}_{i + 1:03d}.pdf" for i in range(volumes)]
+
+    async def _build_pdf(self):
+        """将已导出的页面图片按卷排版为 PDF（已存在的卷跳过）"""
+        width, height = self.card_size
+        self.renderer.allow_asset_dir(self.pages_dir)
+
+        for volume, pdf_path in enumerate(self.pdf_paths()):
+            if pdf_path.exists():
+                continue
+            start = volume * PDF_PAGES_PER_FILE
+            end = min(start + PDF_PAGES_PER_FILE, len(self.words))
+            pages = "".join(
+                f'<img src="{html.escape(local_asset_url(self.card_path(index, self.words[index])))}">'
+                for index in range(start, end)
+            )
+            document = (
+                "<!DOCTYPE html><html><head><style>"
+                f"@page {{ size: {width}px {height}px; margin: 0; }}"
+                "html, body { margin: 0; padding: 0; }"
+                f"img {{ display: block; width: {width}px; height: {height}px; break-after: page; }}"
+                "</style></head><body>"
+                f"{pages}</body></html>"
+            )
+            temp = pdf_path.with_name(f".{pdf_path.name}.tmp")
+            await self.renderer.render_pdf(document, str(temp), width, height)
+            os.replace(temp, pdf_path)
+            logger.info(f"PDF 已生成: {pdf_path.name} ({end - start} 页)")
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+卡组运行时状态
+
+一个卡组加载一次词库，可被多个订阅共用；学习进度按进度键（进度组）分开维护，
+共享同一进度键的订阅轮流推进同一份进度。
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from .base_handler import BaseLanguageHandler, WordEntry
+from .word_selector import WordSelector
+
+
+class Cohort:
+    """
+    进度组：共享一份学习进度的订阅集合
+
+    进度键默认为卡组 ID（与 /vocab 等命令共用进度），独立进度的订阅使用 卡组@会话。
+    预留给未来日期的单词在选词索引中视为已推送，不会被再次选中。
+    """
+
+    def __init__(self, key: str, progress: Dict, selector: WordSelector):
+        """
+        初始化进度组
+
+        Args:
+            key: 进度键
+            progress: 进度字典（sent_words / last_push_date）
+            selector: 选词索引
+        """
+        self.key = key
+        self.progress = progress
+        self.selector = selector
+        self.progress.setdefault("reserved", {})
+        for word in self.reserved_words():
+            self.selector.mark(word)
+
+    def reserved_words(self) -> Iterator[str]:
+        """全部预留的单词"""
+        for dates in self.progress["reserved"].values():
+            yield from dates.values()
+
+    def reservation(self, slot: str, date: str) -> Optional[str]:
+        """获取时段某一天预留的单词"""
+        return self.progress["reserved"].get(slot, {}).get(date)
+
+    def reserve(self, slot: str, date: str, word: str):
+        """为时段的某一天预留单词（仅内存，持久化由调用方负责）"""
+        self.progress["reserved"].setdefault(slot, {})[date] = word
+        self.selector.mark(word)
+
+    def release(self, slot: str, date: str, unmark: bool = False) -> Optional[str]:
+        """
+        取消预留（仅内存，持久化由调用方负责）
+
+        Args:
+            slot: 时段标识
+            date: 生成日期
+            unmark: 是否把单词放回未推送集合（预留过期未使用时）
+
+        Returns:
+            原预留的单词，没有预留时返回 None
+        """
+        dates = self.progress["reserved"].get(slot, {})
+        word = dates.pop(date, None)
+        if not dates:
+            self.progress["reserved"].pop(slot, None)
+        if word is not None and unmark:
+            self.selector.unmark(word)
+        return word
+
+
+class DeckRuntime:
+    """已加载的卡组：处理器、词条序列和单词文本索引"""
+
+    def __init__(self, lang_id: str, handler: BaseLanguageHandler, words: Sequence[WordEntry], keys: List[str]):
+        """
+        初始化卡组运行时
+
+        Args:
+            lang_id: 卡组 ID
+            handler: 卡组处理器
+            words: 词条序列
+            keys: 与 words 顺序一致的单词文本（用于构建选词索引）
+        """
+        self.lang_id = lang_id
+        self.handler = handler
+        self.words = words
+        self.keys = keys
+
+    def new_cohort(self, key: str, progress: Dict) -> Cohort:
+        """
+        基于已加载的进度创建进度组
+
+        Args:
+            key: 进度键
+            progress: 进度字典
+
+        Returns:
+            进度组
+        """
+        return Cohort(key, progress, WordSelector(self.keys, progress.get("sent_words", [])))
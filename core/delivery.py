@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+推送分发
+
+将同一条消息并发发送到多个推送目标：
+- 信号量限制同时进行的发送数，单个慢适配器不会拖住其他目标
+- 按平台（unified_msg_origin 的第一段）分别限速，避免触发平台风控
+- 记录每个目标的发送耗时
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def platform_of(umo: str) -> str:
+    """从 unified_msg_origin（平台:消息类型:会话ID）中取出平台名"""
+    return umo.split(":", 1)[0]
+
+
+class TokenBucket:
+    """
+    令牌桶限速器
+
+    以 rate 个/秒的速度补充令牌，最多积累 burst 个
+    """
+
+    def __init__(self, rate: float, burst: float = 1):
+        """
+        初始化限速器
+
+        Args:
+            rate: 每秒补充的令牌数，<= 0 表示不限速
+            burst: 令牌桶容量（允许的瞬时突发数）
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """取得一个令牌，令牌不足时等待"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class DeliveryResult:
+    """单个目标的发送结果"""
+
+    target: str
+    ok: bool
+    latency: float
+    error: Optional[str] = None
+
+
+@dataclass
+class DeliveryReport:
+    """一次分发的汇总"""
+
+    results: List[DeliveryResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> List[DeliveryResult]:
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self) -> List[DeliveryResult]:
+        return [r for r in self.results if not r.ok]
+
+
+class DeliveryEngine:
+    """
+    并发推送引擎
+
+    同一个引擎的多次分发共享平台限速器，速率限制跨批次生效
+    """
+
+    def __init__(self, concurrency: int = 8, rate_per_platform: float = 5, burst: float = 1):
+        """
+        初始化推送引擎
+
+        Args:
+            concurrency: 同时进行的发送数上限
+            rate_per_platform: 每个平台每秒最多发送数，<= 0 表示不限速
+            burst: 每个平台允许的瞬时突发数
+        """
+        self.concurrency = max(1, concurrency)
+        self.rate_per_platform = rate_per_platform
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, platform: str) -> TokenBucket:
+        bucket = self._buckets.get(platform)
+        if bucket is None:
+            bucket = TokenBucket(self.rate_per_platform, self.burst)
+            self._buckets[platform] = bucket
+        return bucket
+
+    async def deliver(
+        self,
+        targets: Iterable[str],
+        send: Callable[[str], Awaitable[object]]
+    ) -> DeliveryReport:
+        """
+        将消息发送到所有目标
+
+        Args:
+            targets: 推送目标（unified_msg_origin）列表
+            send: 发送协程工厂，接收目标并完成发送，失败时抛出异常
+
+        Returns:
+            分发结果汇总
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.monotonic()
+
+        async def send_one(umo: str) -> DeliveryResult:
+            # 先按平台限速，再占用并发槽位，等待限速的目标不占槽位
+            await self._bucket(platform_of(umo)).acquire()
+            async with semaphore:
+                begin = time.monotonic()
+                try:
+                    await send(umo)
+                except Exception as e:
+                    latency = time.monotonic() - begin
+                    logger.error(f"推送到 {umo} 失败 ({latency * 1000:.0f} ms): {e}")
+                    return DeliveryResult(umo, False, latency, str(e))
+                latency = time.monotonic() - begin
+                logger.info(f"已推送到: {umo} ({latency * 1000:.0f} ms)")
+                return DeliveryResult(umo, True, latency)
+
+        results = await asyncio.gather(*(send_one(umo) for umo in targets))
+        return DeliveryReport(list(results), time.monotonic() - started)
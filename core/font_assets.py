@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+本地字体资源管理
+
+模板通过 @import 引用 Google Fonts。渲染时由 ImageRenderer 拦截该请求，
+改为返回指向本地字体文件的 @font-face 样式，避免渲染阻塞在网络字体加载上。
+可选地按卡组实际用到的字符对 CJK 字体做子集化，将字体体积压缩到几百 KB。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import urllib.parse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from fontTools import subset as ft_subset
+    FONTTOOLS_AVAILABLE = True
+except ImportError:
+    FONTTOOLS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 模板用到的字体族 -> {字重: 文件名}，文件放在插件的 fonts/ 目录下
+FONT_FILES: Dict[str, Dict[int, str]] = {
+    "Noto Sans SC": {
+        400: "NotoSansSC-Regular.otf",
+        500: "NotoSansSC-Medium.otf",
+        700: "NotoSansSC-Bold.otf",
+    },
+    "Noto Serif SC": {
+        700: "NotoSerifSC-Bold.otf",
+    },
+    "Noto Sans JP": {
+        400: "NotoSansJP-Regular.otf",
+        500: "NotoSansJP-Medium.otf",
+    },
+    "Noto Serif JP": {
+        700: "NotoSerifJP-Bold.otf",
+    },
+    "Ma Shan Zheng": {
+        400: "MaShanZheng-Regular.ttf",
+    },
+}
+
+# 子集化时始终保留的字符（ASCII 可打印字符和常用标点）
+BASE_CHARSET = "".join(chr(c) for c in range(0x20, 0x7F)) + "，。、；：？！“”‘’「」『』（）《》〔〕…—・～"
+
+_FORMATS = {".otf": "opentype", ".ttf": "truetype", ".woff": "woff", ".woff2": "woff2"}
+
+
+def parse_google_fonts_url(url: str) -> List[Tuple[str, List[int]]]:
+    """
+    解析 Google Fonts css2 URL 中请求的字体族和字重
+
+    Args:
+        url: 如 https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@400;500
+
+    Returns:
+        [(字体族, [字重, ...]), ...]
+    """
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+    requested = []
+    for spec in query.get("family", []):
+        name, _, axes = spec.partition(":")
+        weights = [400]
+        if axes.startswith("wght@"):
+            weights = [int(w) for w in axes[len("wght@"):].split(";") if w.isdigit()]
+        requested.append((name, weights))
+    return requested
+
+
+class FontAssetManager:
+    """
+    本地字体资源管理器
+
+    负责：
+    - 将 Google Fonts 样式请求转换为本地 @font-face 样式
+    - 按作用域（通常为卡组 ID）提供完整字体或子集字体
+    - 生成并缓存卡组字体子集
+    """
+
+    def __init__(self, fonts_dir: Path, cache_dir: Path, offline: bool = False):
+        """
+        初始化字体管理器
+
+        Args:
+            fonts_dir: 完整字体文件目录
+            cache_dir: 子集字体缓存目录
+            offline: 离线模式，本地缺少字体时也不回退到网络字体
+        """
+        self.fonts_dir = fonts_dir
+        self.cache_dir = cache_dir
+        self.offline = offline
+
+    def available_files(self) -> List[str]:
+        """返回本地已存在的字体文件名列表"""
+        return [
+            filename
+            for weights in FONT_FILES.values()
+            for filename in weights.values()
+            if (self.fonts_dir / filename).exists()
+        ]
+
+    def build_css(self, url: str, url_prefix: str, scope: Optional[str] = None) -> Optional[str]:
+        """
+        根据 Google Fonts 样式 URL 生成本地 @font-face 样式
+
+        Args:
+            url: 被拦截的 Google Fonts 样式 URL
+            url_prefix: 字体文件的 URL 前缀（虚拟源下的 fonts 路径）
+            scope: 字体作用域，存在对应子集时优先使用子集
+
+        Returns:
+            CSS 文本；请求的字体在本地一个都没有时返回 None
+        """
+        scope_part = urllib.parse.quote(scope or "_")
+        faces = []
+        for family, weights in parse_google_fonts_url(url):
+            files = FONT_FILES.get(family, {})
+            for weight in weights:
+                filename = files.get(weight)
+                if not filename or not (self.fonts_dir / filename).exists():
+                    continue
+                font_format = _FORMATS.get(Path(filename).suffix, "opentype")
+                faces.append(
+                    "@font-face {\n"
+                    f"  font-family: '{family}';\n"
+                    "  font-style: normal;\n"
+                    f"  font-weight: {weight};\n"
+                    "  font-display: block;\n"
+                    f"  src: url('{url_prefix}/{scope_part}/{filename}') format('{font_format}');\n"
+                    "}"
+                )
+        return "\n".join(faces) if faces else None
+
+    def font_path(self, scope: Optional[str], filename: str) -> Optional[Path]:
+        """
+        获取字体文件路径
+
+        Args:
+            scope: 字体作用域
+            filename: 字体文件名
+
+        Returns:
+            子集字体路径（存在时）或完整字体路径；文件不存在返回 None
+        """
+        if filename not in self.available_files():
+            return None
+        if scope and scope != "_":
+            subset_path = self.cache_dir / scope / filename
+            if subset_path.exists():
+                return subset_path
+        full_path = self.fonts_dir / filename
+        return full_path if full_path.exists() else None
+
+    def subset_for_scope(self, scope: str, texts: Iterable[str]) -> int:
+        """
+        按给定文本用到的字符生成字体子集（同步执行，耗时较长，应放到线程中运行）
+
+        字符集和源字体未变化时跳过重新生成。
+
+        Args:
+            scope: 字体作用域（卡组 ID）
+            texts: 卡组内的全部文本
+
+        Returns:
+            生成的子集字体数量
+        """
+        if not FONTTOOLS_AVAILABLE:
+            logger.warning("未安装 fontTools，跳过字体子集化 (pip install fonttools)")
+            return 0
+
+        charset = set(BASE_CHARSET)
+        for text in texts:
+            if text:
+                charset.update(text)
+        charset.update(self._template_charset())
+        chars = "".join(sorted(charset))
+
+        scope_dir = self.cache_dir / scope
+        scope_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = scope_dir / "manifest.json"
+        manifest = {}
+        if manifest_path.exists():
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                manifest = {}
+
+        built = 0
+        for filename in self.available_files():
+            source = self.fonts_dir / filename
+            signature = hashlib.sha1(
+                f"{chars}|{source.stat().st_mtime_ns}|{source.stat().st_size}".encode('utf-8')
+            ).hexdigest()
+            target = scope_dir / filename
+            if manifest.get(filename) == signature and target.exists():
+                continue
+
+            options = ft_subset.Options()
+            options.layout_features = ["*"]
+            options.name_IDs = ["*"]
+            options.notdef_outline = True
+            font = ft_subset.load_font(str(source), options)
+            subsetter = ft_subset.Subsetter(options)
+            subsetter.populate(text=chars)
+            subsetter.subset(font)
+            # 渲染可能正在读取同名子集，先写临时文件再替换，避免提供写到一半的字体
+            temp = scope_dir / f".{filename}.tmp"
+            ft_subset.save_font(font, str(temp), options)
+            font.close()
+            os.replace(temp, target)
+
+            manifest[filename] = signature
+            built += 1
+            logger.info(
+                f"已生成字体子集 [{scope}] {filename}: "
+                f"{source.stat().st_size // 1024} KB -> {target.stat().st_size // 1024} KB"
+            )
+
+        temp = scope_dir / ".manifest.json.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp, manifest_path)
+        return built
+
+    def _template_charset(self) -> set:
+        """模板中的固定文字（品牌名、标签等）"""
+        chars = set()
+        templates_dir = self.fonts_dir.parent / "templates"
+        for template in templates_dir.glob("*.html"):
+            try:
+                chars.update(template.read_text(encoding='utf-8'))
+            except OSError:
+                continue
+        return chars
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+卡片图片缓存
+
+以渲染后的 HTML 和渲染参数的哈希为键，将截图结果保存在磁盘上。
+同一张卡片重复预览或推送时直接复用，不再启动渲染。
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ImageCache:
+    """
+    内容寻址的图片磁盘缓存
+
+    - 键: sha256(HTML + 宽 + 高 + 缩放倍数 + 其他渲染参数)
+    - 访问时刷新文件 mtime，淘汰时按 mtime 从旧到新删除（LRU）
+    - 超过 max_age 的条目视为过期
+    - 同一键的并发请求只渲染一次
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int, max_age: float):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节）
+            max_age: 条目最长保留时间（秒）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 后台线程正在执行淘汰时，其他渲染完成后不再重复扫描目录
+        self._evicting = False
+
+    @staticmethod
+    def make_key(html_content: str, width: int, height: int, scale: int, **params) -> str:
+        """
+        计算缓存键
+
+        Args:
+            html_content: 渲染后的 HTML
+            width: 卡片宽度
+            height: 卡片高度
+            scale: 缩放倍数
+            **params: 其他影响输出的渲染参数（如输出格式）
+
+        Returns:
+            十六进制哈希字符串
+        """
+        digest = hashlib.sha256(html_content.encode('utf-8'))
+        digest.update(f"|{width}x{height}@{scale}".encode('utf-8'))
+        for name in sorted(params):
+            digest.update(f"|{name}={params[name]}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def path_for(self, key: str, suffix: str = ".png") -> Path:
+        """获取缓存键对应的文件路径"""
+        return self.cache_dir / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = ".png") -> Optional[Path]:
+        """
+        查找缓存
+
+        Args:
+            key: 缓存键
+            suffix: 文件扩展名
+
+        Returns:
+            命中时返回图片路径，否则返回 None
+        """
+        path = self.path_for(key, suffix)
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        if time.time() - stat.st_mtime > self.max_age:
+            self._remove(path)
+            return None
+
+        # 刷新访问时间，供 LRU 淘汰使用
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    async def get_or_render(
+        self,
+        key: str,
+        render: Callable[[Path], Awaitable[object]],
+        suffix: str = ".png"
+    ) -> Path:
+        """
+        命中缓存直接返回，否则调用 render 生成后写入缓存
+
+        Args:
+            key: 缓存键
+            render: 渲染协程工厂，接收临时输出路径并将图片写入该路径
+            suffix: 文件扩展名
+
+        Returns:
+            缓存中的图片路径
+        """
+        cached = self.get(key, suffix)
+        if cached is not None:
+            logger.debug(f"卡片图片缓存命中: {key[:12]}")
+            return cached
+
+        # 同一张卡片正在渲染时等待其结果
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            target = self.path_for(key, suffix)
+            temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp{suffix}")
+            try:
+                await render(temp_path)
+                os.replace(temp_path, target)
+            finally:
+                if temp_path.exists():
+                    self._remove(temp_path)
+            future.set_result(target)
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        if not self._evicting:
+            self._evicting = True
+            try:
+                # 淘汰需要遍历目录并逐个 stat，放到线程中执行，不阻塞事件循环
+                await asyncio.to_thread(self.evict)
+            finally:
+                self._evicting = False
+        return target
+
+    def put(self, key: str, data: bytes, suffix: str = ".png") -> Path:
+        """
+        直接写入已渲染好的图片（批量渲染时使用，同步调用）
+
+        Args:
+            key: 缓存键
+            data: 图片字节
+            suffix: 文件扩展名
+
+        Returns:
+            缓存中的图片路径
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        target = self.path_for(key, suffix)
+        temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp{suffix}")
+        try:
+            temp_path.write_bytes(data)
+            os.replace(temp_path, target)
+        finally:
+            if temp_path.exists():
+                self._remove(temp_path)
+        self.evict()
+        return target
+
+    def evict(self):
+        """删除过期条目，并按最近访问时间淘汰直到总大小不超过上限"""
+        if not self.cache_dir.exists():
+            return
+
+        now = time.time()
+        entries = []
+        total = 0
+        for path in self.cache_dir.iterdir():
+            if not path.is_file() or path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                self._remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def stats(self) -> Dict[str, int]:
+        """返回缓存条目数和总字节数"""
+        count = 0
+        total = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.iterdir():
+                if path.is_file() and not path.name.startswith("."):
+                    count += 1
+                    total += path.stat().st_size
+        return {"count": count, "bytes": total}
+
+    @staticmethod
+    def _remove(path: Path):
+        """删除文件，忽略并发删除导致的错误"""
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.debug(f"删除缓存文件失败 {path}: {e}")
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+卡片图片输出编码
+
+浏览器截图固定为无损 PNG（scale=4 时约数 MB），上传到聊天平台耗时较长。
+截图之后按配置重新编码：
+- png:  原样输出截图
+- png8: 调色板量化（256 色，抖动）并优化压缩的 PNG
+- webp / avif / jpeg: 有损编码，按 quality 压缩
+- max_bytes: 输出超过上限时先降低质量、再按比例缩小尺寸，直到不超过上限
+
+编码在工作线程中执行（asyncio.to_thread），不阻塞事件循环。
+除 png 外均需要 Pillow，AVIF 另需 Pillow >= 11.2 或 pillow-avif-plugin。
+"""
+
+import asyncio
+import logging
+import os
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Tuple
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+if PIL_AVAILABLE:
+    try:
+        import pillow_avif  # noqa: F401  注册 AVIF 编码器（旧版 Pillow）
+    except ImportError:
+        pass
+    Image.init()
+    AVIF_AVAILABLE = "AVIF" in Image.SAVE
+else:
+    AVIF_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ("png", "png8", "webp", "avif", "jpeg")
+
+# 格式 -> 文件扩展名
+SUFFIXES = {"png": ".png", "png8": ".png", "webp": ".webp", "avif": ".avif", "jpeg": ".jpg"}
+
+# 有损格式的 Pillow 格式名
+_LOSSY = {"webp": "WEBP", "avif": "AVIF", "jpeg": "JPEG"}
+
+# 按大小上限自适应时允许的最低质量
+MIN_QUALITY = 40
+
+# 质量降到最低仍超限时，每次缩小的比例，以及允许缩小到的最小比例
+SCALE_STEP = 0.85
+MIN_SCALE = 0.4
+
+
+class ImageEncoder:
+    """
+    截图后的输出编码器
+
+    用法:
+        encoder = ImageEncoder("webp", quality=85, max_bytes=500 * 1024)
+        data = await encoder.encode_async(png_bytes)
+        path = cache_dir / f"{key}{encoder.suffix}"
+    """
+
+    def __init__(self, fmt: str = "png", quality: int = 85, max_bytes: int = 0):
+        """
+        初始化编码器
+
+        不支持的格式（未知名称、缺少 Pillow 或 AVIF 编码器）时回退并记录警告
+
+        Args:
+            fmt: 输出格式 png / png8 / webp / avif / jpeg
+            quality: 有损格式的质量（1-100）
+            max_bytes: 输出大小上限（字节），0 表示不限制
+        """
+        if fmt not in OUTPUT_FORMATS:
+            logger.warning(f"未知的输出格式 '{fmt}'，使用 png（可选: {', '.join(OUTPUT_FORMATS)}）")
+            fmt = "png"
+        if fmt == "avif" and PIL_AVAILABLE and not AVIF_AVAILABLE:
+            logger.warning("当前 Pillow 不支持 AVIF 编码（需 Pillow >= 11.2 或 pillow-avif-plugin），使用 webp")
+            fmt = "webp"
+        if fmt != "png" and not PIL_AVAILABLE:
+            logger.warning(f"输出格式 {fmt} 需要 Pillow: pip install Pillow，使用 png")
+            fmt = "png"
+        if max_bytes > 0 and not PIL_AVAILABLE:
+            logger.warning("输出大小上限需要 Pillow: pip install Pillow，不限制大小")
+            max_bytes = 0
+
+        self.fmt = fmt
+        self.quality = max(1, min(100, quality))
+        self.max_bytes = max(0, max_bytes)
+
+    @property
+    def suffix(self) -> str:
+        """输出文件扩展名"""
+        return SUFFIXES[self.fmt]
+
+    @property
+    def passthrough(self) -> bool:
+        """是否原样输出截图"""
+        return self.fmt == "png" and not self.max_bytes
+
+    def cache_params(self) -> Dict[str, object]:
+        """影响输出的编码参数（计入图片缓存键）"""
+        if self.passthrough:
+            return {}
+        return {"format": self.fmt, "quality": self.quality, "max_bytes": self.max_bytes}
+
+    def encode(self, data: bytes) -> bytes:
+        """
+        编码截图（同步执行，在线程中调用）
+
+        Args:
+            data: 浏览器截图的 PNG 字节
+
+        Returns:
+            编码后的图片字节
+        """
+        if self.passthrough:
+            return data
+
+        with Image.open(BytesIO(data)) as source:
+            image = source.convert("RGB")
+
+        output, quality = self._encode_within(image)
+        if self.max_bytes and len(output) > self.max_bytes:
+            # 质量已降到最低（或无损格式），按比例缩小尺寸
+            ratio = 1.0
+            while len(output) > self.max_bytes and ratio * SCALE_STEP >= MIN_SCALE:
+                ratio *= SCALE_STEP
+                size = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
+                output, quality = self._encode_within(image.resize(size, Image.LANCZOS))
+            if len(output) > self.max_bytes:
+                logger.warning(
+                    f"卡片图片缩小到 {ratio:.0%} 后仍超过大小上限: "
+                    f"{len(output) // 1024}KB > {self.max_bytes // 1024}KB"
+                )
+            else:
+                logger.debug(f"卡片图片按大小上限缩小到 {ratio:.0%}，质量 {quality}")
+        return output
+
+    async def encode_async(self, data: bytes) -> bytes:
+        """在工作线程中编码截图"""
+        if self.passthrough:
+            return data
+        return await asyncio.to_thread(self.encode, data)
+
+    async def write(self, data: bytes, output_path: Path):
+        """
+        编码截图并写入文件（先写临时文件再替换）
+
+        Args:
+            data: 浏览器截图的 PNG 字节
+            output_path: 输出路径
+        """
+        encoded = await self.encode_async(data)
+
+        def write_file():
+            temp = output_path.with_name(f".{output_path.name}.tmp")
+            temp.write_bytes(encoded)
+            os.replace(temp, output_path)
+
+        await asyncio.to_thread(write_file)
+
+    def _encode_within(self, image: "Image.Image") -> Tuple[bytes, int]:
+        """
+        按当前尺寸编码；有大小上限时二分查找不超限的最高质量
+
+        Returns:
+            (图片字节, 使用的质量)，最低质量仍超限时返回最低质量的结果
+        """
+        output = self._save(image, self.quality)
+        if not self.max_bytes or len(output) <= self.max_bytes or self.fmt not in _LOSSY:
+            return output, self.quality
+
+        best, best_quality = None, MIN_QUALITY
+        low, high = MIN_QUALITY, self.quality - 1
+        while low <= high:
+            quality = (low + high) // 2
+            candidate = self._save(image, quality)
+            if len(candidate) <= self.max_bytes:
+                best, best_quality = candidate, quality
+                low = quality + 1
+            else:
+                high = quality - 1
+        if best is None:
+            return self._save(image, MIN_QUALITY), MIN_QUALITY
+        return best, best_quality
+
+    def _save(self, image: "Image.Image", quality: int) -> bytes:
+        buffer = BytesIO()
+        if self.fmt == "png8":
+            quantized = image.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.FLOYDSTEINBERG)
+            quantized.save(buffer, format="PNG", optimize=True)
+        elif self.fmt == "png":
+            image.save(buffer, format="PNG", optimize=True)
+        elif self.fmt == "webp":
+            image.save(buffer, format="WEBP", quality=quality, method=4)
+        elif self.fmt == "jpeg":
+            image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+        else:
+            image.save(buffer, format=_LOSSY[self.fmt], quality=quality)
+        return buffer.getvalue()
@@ -3,20 +3,100 @@
 图片渲染器 - 使用 Playwright 将 HTML 转换为图片
 
 纯 pip 依赖，首次运行自动安装 Chromium 浏览器。
+浏览器常驻于进程内的页面池中，避免每张卡片冷启动 Chromium。
 """
 
 import subprocess
 import tempfile
 import logging
 import asyncio
+import math
+import re
+import urllib.parse
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 # 浏览器安装标记
 _browser_installed = False
 
+# 默认页面池大小
+DEFAULT_POOL_SIZE = 2
+
+# 默认就绪等待上限（毫秒），超时后直接截图
+DEFAULT_READY_TIMEOUT = 5000
+
+# 模板就绪信号（见 templates/*.html 中的 __cardWhenReady 脚本）
+READY_SIGNAL = "window.__cardReady === true"
+HAS_READY_SIGNAL = "typeof window.__cardWhenReady === 'function'"
+
+# 在已加载卡组样式的常驻页面中替换卡片，并等待字体和背景图就绪（超时后照常截图）
+SWAP_CARDS = """async ([html, timeout]) => {
+  document.querySelector('.__card-grid').innerHTML = html;
+  await Promise.race([window.__cardWhenReady(), new Promise(resolve => setTimeout(resolve, timeout))]);
+}"""
+
+# 内存投递使用的虚拟源，页面内的相对路径资源基于它解析
+VIRTUAL_ORIGIN = "http://vocabcard.local"
+
+# 模板 @import 的网络字体样式地址
+GOOGLE_FONTS_CSS = "https://fonts.googleapis.com/**"
+
+# 默认资源目录（模板目录）
+DEFAULT_ASSET_DIR = (Path(__file__).parent.parent / "templates").resolve()
+
+# 网格渲染时单个页面最多排列的卡片数
+GRID_MAX_CARDS = 16
+
+# 网格页面的最大边长（设备像素），超过 Chromium 纹理上限时截图会出错
+GRID_MAX_PIXELS = 16384
+
+_BODY_OPEN = re.compile(r"<body\b[^>]*>", re.IGNORECASE)
+
+# Windows 盘符开头的绝对路径（如 C:/...）
+_DRIVE_PREFIX = re.compile(r"^[A-Za-z]:/")
+
+
+def split_document(html_content: str) -> Optional[Tuple[str, str]]:
+    """
+    将卡片 HTML 拆分为 <body> 之前的部分（样式和就绪脚本）与 body 内容
+
+    同一卡组的卡片每张不同的值都在 body 内（见模板中 .card 的内联自定义属性），
+    因此前半部分相同的卡片可以排在同一个页面上
+
+    Args:
+        html_content: 完整的卡片 HTML
+
+    Returns:
+        (head 部分, body 内容)，结构不符合时返回 None
+    """
+    match = _BODY_OPEN.search(html_content)
+    end = html_content.rfind("</body>")
+    if match is None or end < match.end():
+        return None
+    return html_content[:match.start()], html_content[match.end():end]
+
+
+def grid_capacity(width: int, height: int, scale: int) -> Tuple[int, int]:
+    """
+    网格渲染时单个页面的列数和行数
+
+    Args:
+        width: 卡片宽度
+        height: 卡片高度
+        scale: 设备缩放倍数
+
+    Returns:
+        (列数, 行数)
+    """
+    columns = max(1, min(math.isqrt(GRID_MAX_CARDS), GRID_MAX_PIXELS // (width * scale)))
+    rows = max(1, min(GRID_MAX_CARDS // columns, GRID_MAX_PIXELS // (height * scale)))
+    return columns, rows
+
 
 async def _ensure_browser_installed():
     """确保 Chromium 浏览器已安装"""
@@ -49,25 +129,396 @@ async def _ensure_browser_installed():
             )
 
 
+@dataclass
+class _PageSlot:
+    """页面池中的一个槽位（独立的浏览器上下文 + 页面）"""
+
+    context: Any = None
+    page: Any = None
+    scale: int = 0
+    # 页面当前加载的卡片网格外壳（卡组样式 + 字体作用域 + 网格尺寸），相同时只替换卡片内容
+    shell: Optional[Tuple] = None
+
+    async def close(self):
+        """关闭槽位持有的上下文"""
+        if self.context is not None:
+            try:
+                await self.context.close()
+            except Exception as e:
+                logger.debug(f"关闭浏览器上下文失败: {e}")
+        self.context = None
+        self.page = None
+        self.scale = 0
+        self.shell = None
+
+
+class BrowserPool:
+    """
+    常驻 Chromium 页面池
+
+    - 进程内只启动一个 Playwright 驱动和一个 Chromium 实例
+    - 维护 pool_size 个上下文/页面，渲染时借出、用完归还
+    - device_scale_factor 属于上下文级参数，缩放倍数变化时才重建该槽位
+    - 浏览器意外退出时自动重新拉起
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        on_new_page: Optional[Callable[[Any], Awaitable[None]]] = None
+    ):
+        """
+        初始化页面池
+
+        Args:
+            pool_size: 同时可用的页面数（即最大并发渲染数）
+            on_new_page: 新建页面后的初始化回调（如注册路由）
+        """
+        self.pool_size = max(1, int(pool_size))
+        self.on_new_page = on_new_page
+        self._playwright = None
+        self._browser = None
+        self._slots: List[_PageSlot] = []
+        # 空闲槽位队列；关闭时放入 None 哨兵，唤醒仍在等待的调用方
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        """页面池是否已启动"""
+        return self._browser is not None and self._browser.is_connected()
+
+    async def start(self):
+        """启动浏览器并预热页面池（可重复调用）"""
+        async with self._start_lock:
+            if self.started:
+                return
+
+            await _ensure_browser_installed()
+            from playwright.async_api import async_playwright
+
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+
+            if self._idle is None:
+                self._slots = [_PageSlot() for _ in range(self.pool_size)]
+                self._idle = asyncio.Queue()
+                for slot in self._slots:
+                    self._idle.put_nowait(slot)
+            else:
+                # 浏览器重启：沿用同一批槽位和等待队列，只丢弃旧浏览器的上下文，
+                # 已在队列上等待的调用方拿到槽位后按需重建页面
+                for slot in self._slots:
+                    await slot.close()
+
+            logger.info(f"Chromium 页面池已启动 (pool_size={self.pool_size})")
+
+    async def acquire(self, width: int, height: int, scale: int) -> _PageSlot:
+        """
+        借出一个已按视口和缩放配置好的页面
+
+        Args:
+            width: 视口宽度
+            height: 视口高度
+            scale: 设备缩放倍数
+
+        Returns:
+            页面槽位，使用完毕后必须调用 release 归还
+
+        Raises:
+            RuntimeError: 等待期间页面池被关闭
+        """
+        if not self.started:
+            await self.start()
+
+        idle = self._idle
+        slot = await idle.get()
+        if slot is None:
+            # 页面池已关闭：把哨兵放回队列，依次唤醒其余等待者
+            idle.put_nowait(None)
+            raise RuntimeError("浏览器页面池已关闭")
+        try:
+            if slot.page is None or slot.page.is_closed() or slot.scale != scale:
+                await slot.close()
+                slot.context = await self._browser.new_context(
+                    viewport={"width": width, "height": height},
+                    device_scale_factor=scale
+                )
+                slot.page = await slot.context.new_page()
+                slot.scale = scale
+                if self.on_new_page is not None:
+                    await self.on_new_page(slot.page)
+            else:
+                await slot.page.set_viewport_size({"width": width, "height": height})
+        except Exception:
+            await slot.close()
+            if idle is self._idle:
+                idle.put_nowait(slot)
+            raise
+        return slot
+
+    async def release(self, slot: _PageSlot, broken: bool = False):
+        """
+        归还页面槽位
+
+        Args:
+            slot: acquire 借出的槽位
+            broken: 渲染过程中出错时为 True，槽位会被重建
+        """
+        if broken:
+            await slot.close()
+        # 页面池关闭后不再归还（关闭时已唤醒等待者）
+        if slot in self._slots and self._idle is not None:
+            self._idle.put_nowait(slot)
+
+    async def close(self):
+        """关闭全部页面、浏览器和 Playwright 驱动"""
+        async with self._start_lock:
+            for slot in self._slots:
+                await slot.close()
+            self._slots = []
+            if self._idle is not None:
+                # 丢弃空闲槽位，放入哨兵让 acquire 中的等待者报错返回，而不是永远挂起
+                while not self._idle.empty():
+                    self._idle.get_nowait()
+                self._idle.put_nowait(None)
+                self._idle = None
+
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception as e:
+                    logger.debug(f"关闭浏览器失败: {e}")
+                self._browser = None
+
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception as e:
+                    logger.debug(f"停止 Playwright 失败: {e}")
+                self._playwright = None
+
+            logger.info("Chromium 页面池已关闭")
+
+
 class ImageRenderer:
     """
     图片渲染器
 
     使用 Playwright (Chromium) 将 HTML 渲染为 PNG 图片。
     纯 pip 依赖，首次运行自动安装浏览器。
+
+    HTML 投递方式：
+    - memory（默认）：通过路由拦截在虚拟源 VIRTUAL_ORIGIN 下直接提供内存中的 HTML，
+      相对路径资源按模板目录解析，不产生任何临时文件
+    - file：写入临时文件后以 file:// 打开（兼容旧行为）
     """
 
-    def __init__(self):
-        """初始化渲染器"""
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, delivery: str = "memory"):
+        """
+        初始化渲染器
+
+        Args:
+            pool_size: 浏览器页面池大小
+            delivery: HTML 投递方式，memory 或 file
+        """
+        self.delivery = delivery
+        self.asset_dirs: List[Path] = [DEFAULT_ASSET_DIR]
+        self.fonts = None  # 可选的 FontAssetManager，设置后拦截网络字体
+        self._documents: Dict[str, str] = {}
+        self._font_scopes: Dict[Any, Optional[str]] = {}
+        self.pool = BrowserPool(pool_size, on_new_page=self._setup_page)
         logger.info("ImageRenderer 初始化完成 (Playwright Async)")
 
+    async def start(self):
+        """预热浏览器页面池"""
+        await self.pool.start()
+
+    async def close(self):
+        """关闭浏览器页面池"""
+        await self.pool.close()
+
+    def allow_asset_dir(self, directory: Path):
+        """
+        允许页面通过虚拟源读取某个本地目录下的文件
+
+        Args:
+            directory: 本地目录（如离线背景图目录）
+        """
+        directory = Path(directory).resolve()
+        if directory not in self.asset_dirs:
+            self.asset_dirs.append(directory)
+
+    async def _setup_page(self, page):
+        """为新建页面注册虚拟源和网络字体路由"""
+        await page.route(f"{VIRTUAL_ORIGIN}/**", self._handle_virtual_request)
+
+        async def handle_font_css(route):
+            await self._handle_font_css(route, page)
+
+        await page.route(GOOGLE_FONTS_CSS, handle_font_css)
+
+    async def _handle_font_css(self, route, page):
+        """将 Google Fonts 样式请求替换为本地字体样式"""
+        if self.fonts is None:
+            await route.continue_()
+            return
+
+        css = self.fonts.build_css(
+            route.request.url,
+            f"{VIRTUAL_ORIGIN}/fonts",
+            scope=self._font_scopes.get(page)
+        )
+        if css is not None:
+            await route.fulfill(status=200, content_type="text/css; charset=utf-8", body=css)
+        elif self.fonts.offline:
+            # 离线部署：直接返回空样式，使用系统回退字体，避免阻塞到超时
+            await route.fulfill(status=200, content_type="text/css; charset=utf-8", body="")
+        else:
+            await route.continue_()
+
+    def _resolve_asset(self, rel_path: str) -> Optional[Path]:
+        """在允许的目录中查找虚拟源路径对应的文件"""
+        if rel_path.startswith("fs/"):
+            # 绝对路径形式: /fs/<absolute path>
+            candidates = [_fs_path(rel_path[len("fs/"):])]
+        else:
+            # 相对路径形式: 依次在资源目录中查找
+            candidates = [base / rel_path for base in self.asset_dirs]
+
+        for candidate in candidates:
+            try:
+                resolved = candidate.resolve()
+            except (OSError, RuntimeError):
+                continue
+            if not resolved.is_file():
+                continue
+            if any(resolved.is_relative_to(base) for base in self.asset_dirs):
+                return resolved
+        return None
+
+    async def _handle_virtual_request(self, route):
+        """响应虚拟源下的请求：卡片 HTML 来自内存，其余资源来自允许的本地目录"""
+        rel_path = urllib.parse.unquote(urllib.parse.urlsplit(route.request.url).path).lstrip("/")
+
+        if rel_path.startswith("fonts/") and self.fonts is not None:
+            scope, _, filename = rel_path[len("fonts/"):].partition("/")
+            font_path = self.fonts.font_path(scope, filename)
+            if font_path is not None:
+                await route.fulfill(
+                    path=str(font_path),
+                    headers={"Access-Control-Allow-Origin": "*"}
+                )
+                return
+        elif rel_path.startswith("card/"):
+            token = rel_path[len("card/"):].rsplit(".", 1)[0]
+            html_content = self._documents.get(token)
+            if html_content is not None:
+                await route.fulfill(
+                    status=200,
+                    content_type="text/html; charset=utf-8",
+                    body=html_content
+                )
+                return
+        else:
+            asset_path = self._resolve_asset(rel_path)
+            if asset_path is not None:
+                await route.fulfill(path=str(asset_path))
+                return
+
+        logger.debug(f"虚拟源资源不存在: {route.request.url}")
+        await route.fulfill(status=404, body="")
+
+    @asynccontextmanager
+    async def _deliver(self, html_content: str, delivery: Optional[str]):
+        """
+        将 HTML 投递给页面，产出可供 page.goto 打开的 URL
+
+        Args:
+            html_content: HTML 内容字符串
+            delivery: 投递方式，None 时使用实例默认值
+        """
+        if (delivery or self.delivery) == "file":
+            with tempfile.NamedTemporaryFile(
+                mode='w', suffix='.html', delete=False, encoding='utf-8'
+            ) as f:
+                f.write(html_content)
+                temp_html = Path(f.name)
+            try:
+                yield temp_html.as_uri()
+            finally:
+                if temp_html.exists():
+                    temp_html.unlink()
+        else:
+            token = uuid.uuid4().hex
+            self._documents[token] = html_content
+            try:
+                yield f"{VIRTUAL_ORIGIN}/card/{token}.html"
+            finally:
+                self._documents.pop(token, None)
+
+    async def _wait_ready(self, page, timeout: int):
+        """
+        等待页面就绪
+
+        模板带有就绪脚本时，等待其在字体和背景图加载完成后发出信号；
+        否则回退为等待网络空闲。两种方式都受 timeout 上限约束，超时后照常截图。
+        """
+        try:
+            if await page.evaluate(HAS_READY_SIGNAL):
+                await page.wait_for_function(READY_SIGNAL, timeout=timeout)
+            else:
+                await page.wait_for_load_state("networkidle", timeout=timeout)
+        except Exception as e:
+            logger.debug(f"等待页面就绪超时，直接截图: {e}")
+
+    async def _screenshot(
+        self,
+        html_content: str,
+        width: int,
+        height: int,
+        scale: int,
+        output_path: Optional[str] = None,
+        ready_timeout: int = DEFAULT_READY_TIMEOUT,
+        delivery: Optional[str] = None,
+        font_scope: Optional[str] = None,
+        image_type: str = "png",
+        quality: Optional[int] = None
+    ) -> bytes:
+        """借用池中的页面加载 HTML 并截图"""
+        slot = await self.pool.acquire(width, height, scale)
+        broken = False
+        try:
+            page = slot.page
+            slot.shell = None
+            self._font_scopes[page] = font_scope
+            async with self._deliver(html_content, delivery) as url:
+                await page.goto(url, wait_until="domcontentloaded")
+
+                # 等待字体和背景图就绪
+                await self._wait_ready(page, ready_timeout)
+
+                # 截图（quality 仅对 jpeg 有效）
+                options = {"quality": quality} if image_type == "jpeg" and quality else {}
+                return await page.screenshot(path=output_path, type=image_type, scale="device", **options)
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self._font_scopes.pop(slot.page, None)
+            await self.pool.release(slot, broken=broken)
+
     async def render_to_file(
         self,
         html_content: str,
         output_path: str,
         width: int = 432,
         height: int = 540,
-        scale: int = 4
+        scale: int = 4,
+        ready_timeout: int = DEFAULT_READY_TIMEOUT,
+        delivery: Optional[str] = None,
+        font_scope: Optional[str] = None
     ) -> str:
         """
         将 HTML 渲染为 PNG 图片文件
@@ -78,112 +529,323 @@ class ImageRenderer:
             width: 卡片宽度 (像素)
             height: 卡片高度 (像素)
             scale: 缩放倍数 (4 = 4K 清晰度)
+            ready_timeout: 等待字体和背景图就绪的上限 (毫秒)
+            delivery: HTML 投递方式 (memory/file)，默认使用实例配置
+            font_scope: 字体作用域（卡组 ID），存在该卡组的字体子集时优先使用
 
         Returns:
             输出图片的绝对路径
         """
-        await _ensure_browser_installed()
-        from playwright.async_api import async_playwright
-
-        # 写入临时 HTML 文件
-        with tempfile.NamedTemporaryFile(
-            mode='w', suffix='.html', delete=True, encoding='utf-8'
-        ) as f:
-            f.write(html_content)
-            f.flush()  # 确保写入磁盘
-            temp_html_path = f.name
-
-            try:
-                async with async_playwright() as p:
-                    browser = await p.chromium.launch(headless=True)
-                    page = await browser.new_page(
-                        viewport={"width": width, "height": height},
-                        device_scale_factor=scale
-                    )
-                    await page.goto(Path(temp_html_path).as_uri())
-
-                    # 等待背景图加载
-                    try:
-                        await page.wait_for_load_state("networkidle", timeout=15000)
-                    except Exception as e:
-                        logger.debug(f"背景图加载超时: {e}")
-                    await page.wait_for_timeout(2000)
-
-                    # 截图
-                    await page.screenshot(path=output_path, type="png", scale="device")
-                    await browser.close()
-
-                logger.info(f"图片已生成: {output_path}")
-                return output_path
-            except Exception as e:
-                logger.error(f"渲染图片失败: {e}")
-                raise
+        try:
+            await self._screenshot(
+                html_content, width, height, scale,
+                output_path=output_path, ready_timeout=ready_timeout,
+                delivery=delivery, font_scope=font_scope
+            )
+            logger.info(f"图片已生成: {output_path}")
+            return output_path
+        except Exception as e:
+            logger.error(f"渲染图片失败: {e}")
+            raise
 
     async def render_to_bytes(
         self,
         html_content: str,
         width: int = 432,
         height: int = 540,
-        scale: int = 4
+        scale: int = 4,
+        ready_timeout: int = DEFAULT_READY_TIMEOUT,
+        delivery: Optional[str] = None,
+        font_scope: Optional[str] = None,
+        image_type: str = "png",
+        quality: Optional[int] = None
     ) -> bytes:
         """
-        将 HTML 渲染为 PNG 图片字节
+        将 HTML 渲染为图片字节
 
         Args:
             html_content: HTML 内容字符串
             width: 卡片宽度 (像素)
             height: 卡片高度 (像素)
             scale: 缩放倍数 (4 = 4K 清晰度)
+            ready_timeout: 等待字体和背景图就绪的上限 (毫秒)
+            delivery: HTML 投递方式 (memory/file)，默认使用实例配置
+            font_scope: 字体作用域（卡组 ID），存在该卡组的字体子集时优先使用
+            image_type: 截图格式 png 或 jpeg
+            quality: jpeg 质量 (1-100)
 
         Returns:
-            PNG 图片字节数据
+            图片字节数据
         """
-        await _ensure_browser_installed()
-        from playwright.async_api import async_playwright
+        try:
+            return await self._screenshot(
+                html_content, width, height, scale,
+                ready_timeout=ready_timeout, delivery=delivery, font_scope=font_scope,
+                image_type=image_type, quality=quality
+            )
+        except Exception as e:
+            logger.error(f"渲染图片失败: {e}")
+            raise
 
-        # 写入临时 HTML 文件
-        with tempfile.NamedTemporaryFile(
-            mode='w', suffix='.html', delete=False, encoding='utf-8'
-        ) as f:
-            f.write(html_content)
-            temp_html = Path(f.name)
+    async def render_batch(
+        self,
+        documents: List[str],
+        width: int = 432,
+        height: int = 540,
+        scale: int = 4,
+        ready_timeout: int = DEFAULT_READY_TIMEOUT,
+        font_scope: Optional[str] = None,
+        image_type: str = "png",
+        quality: Optional[int] = None
+    ) -> List[bytes]:
+        """
+        批量渲染同一卡组的多张卡片
 
-        try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page(
-                    viewport={"width": width, "height": height},
-                    device_scale_factor=scale
+        样式和脚本相同的卡片按网格排在同一个页面上，排版完成后按每张卡片的位置分别裁剪截图。
+        页面加载过某个卡组的样式后常驻在页面池中，之后同一卡组的卡片只替换网格内容，
+        样式表、字体和脚本不再重新加载解析。无法拆分出 <body> 的卡片逐张渲染。
+
+        Args:
+            documents: 卡片 HTML 列表
+            width: 卡片宽度 (像素)
+            height: 卡片高度 (像素)
+            scale: 缩放倍数
+            ready_timeout: 等待字体和背景图就绪的上限 (毫秒)
+            font_scope: 字体作用域（卡组 ID）
+            image_type: 截图格式 png 或 jpeg
+            quality: jpeg 质量 (1-100)
+
+        Returns:
+            与 documents 顺序一致的图片字节列表
+        """
+        results: List[Optional[bytes]] = [None] * len(documents)
+        groups: Dict[str, List[Tuple[int, str]]] = {}
+        singles: List[int] = []
+        for index, html_content in enumerate(documents):
+            parts = split_document(html_content)
+            if parts is None:
+                singles.append(index)
+            else:
+                groups.setdefault(parts[0], []).append((index, parts[1]))
+
+        columns, rows = grid_capacity(width, height, scale)
+        capacity = columns * rows
+        for head, cards in groups.items():
+            for start in range(0, len(cards), capacity):
+                chunk = cards[start:start + capacity]
+                images = await self._screenshot_grid(
+                    head, [body for _, body in chunk], width, height, scale,
+                    ready_timeout=ready_timeout, font_scope=font_scope,
+                    image_type=image_type, quality=quality
                 )
-                await page.goto(temp_html.as_uri())
+                for (index, _), data in zip(chunk, images):
+                    results[index] = data
 
-                # 等待背景图加载
-                try:
-                    await page.wait_for_load_state("networkidle", timeout=15000)
-                except Exception as e:
-                    logger.debug(f"背景图加载超时: {e}")
-                await page.wait_for_timeout(2000)
+        for index in singles:
+            results[index] = await self._screenshot(
+                documents[index], width, height, scale,
+                ready_timeout=ready_timeout, font_scope=font_scope,
+                image_type=image_type, quality=quality
+            )
+        return results
+
+    async def _screenshot_grid(
+        self,
+        head: str,
+        bodies: List[str],
+        width: int,
+        height: int,
+        scale: int,
+        ready_timeout: int = DEFAULT_READY_TIMEOUT,
+        font_scope: Optional[str] = None,
+        image_type: str = "png",
+        quality: Optional[int] = None
+    ) -> List[bytes]:
+        """将多张卡片按网格排在一个页面上，就绪后逐张裁剪截图"""
+        columns, rows = grid_capacity(width, height, scale)
+        page_width, page_height = columns * width, rows * height
+        # 字体子集按卡组区分：head 相同的卡组（如 japanese 与 japanese_n1）不能共用已加载的外壳
+        shell_key = (head, font_scope, columns, rows, width, height)
+        cells = "".join(f'<div class="__card-cell">{body}</div>' for body in bodies)
+
+        slot = await self.pool.acquire(page_width, page_height, scale)
+        broken = False
+        try:
+            page = slot.page
+            self._font_scopes[page] = font_scope
+            if slot.shell != shell_key:
+                slot.shell = None
+                if await self._load_grid_shell(page, head, columns, width, height, page_width, page_height):
+                    slot.shell = shell_key
 
-                # 截图返回字节
-                image_bytes = await page.screenshot(type="png", scale="device")
-                await browser.close()
+            if slot.shell is not None:
+                await page.evaluate(SWAP_CARDS, [cells, ready_timeout])
+            else:
+                # 模板没有就绪脚本时无法判断替换后的卡片何时就绪，整页加载
+                document = f'{self._grid_head(head, columns, width, height, page_width, page_height)}' \
+                    f'<body><div class="__card-grid">{cells}</div></body></html>'
+                async with self._deliver(document, None) as url:
+                    await page.goto(url, wait_until="domcontentloaded")
+                    await self._wait_ready(page, ready_timeout)
 
-            return image_bytes
+            options = {"quality": quality} if image_type == "jpeg" and quality else {}
+            images = []
+            for position in range(len(bodies)):
+                row, column = divmod(position, columns)
+                clip = {"x": column * width, "y": row * height, "width": width, "height": height}
+                images.append(await page.screenshot(type=image_type, scale="device", clip=clip, **options))
+            return images
         except Exception as e:
-            logger.error(f"渲染图片失败: {e}")
+            broken = True
+            logger.error(f"网格渲染失败: {e}")
+            raise
+        finally:
+            self._font_scopes.pop(slot.page, None)
+            await self.pool.release(slot, broken=broken)
+
+    @staticmethod
+    def _grid_head(head: str, columns: int, width: int, height: int, page_width: int, page_height: int) -> str:
+        """在卡组样式后追加网格样式（覆盖模板中 body 的固定尺寸，每个格子等同于单张卡片的 body）"""
+        grid_style = (
+            "<style>"
+            f"html, body {{ width: {page_width}px !important; height: {page_height}px !important; "
+            "overflow: hidden !important; }"
+            f".__card-grid {{ display: grid; grid-template-columns: repeat({columns}, {width}px); "
+            f"grid-auto-rows: {height}px; }}"
+            f".__card-cell {{ position: relative; width: {width}px; height: {height}px; overflow: hidden; }}"
+            "</style>"
+        )
+        if "</head>" in head:
+            return head.replace("</head>", f"{grid_style}</head>", 1)
+        return head + grid_style
+
+    async def _load_grid_shell(
+        self,
+        page,
+        head: str,
+        columns: int,
+        width: int,
+        height: int,
+        page_width: int,
+        page_height: int
+    ) -> bool:
+        """
+        在页面中加载只含卡组样式和空网格的外壳
+
+        Returns:
+            模板是否带有就绪脚本（可以只替换卡片内容复用外壳）
+        """
+        document = f'{self._grid_head(head, columns, width, height, page_width, page_height)}' \
+            '<body><div class="__card-grid"></div></body></html>'
+        async with self._deliver(document, None) as url:
+            await page.goto(url, wait_until="domcontentloaded")
+        return bool(await page.evaluate(HAS_READY_SIGNAL))
+
+    async def render_pdf(
+        self,
+        html_content: str,
+        output_path: str,
+        width: int,
+        height: int,
+        timeout: int = 600000
+    ) -> str:
+        """
+        将 HTML 打印为 PDF（分页由文档中的 CSS 控制）
+
+        Args:
+            html_content: HTML 内容字符串
+            output_path: 输出 PDF 路径
+            width: 页面宽度 (像素)
+            height: 页面高度 (像素)
+            timeout: 等待页面及其图片加载完成的上限 (毫秒)
+
+        Returns:
+            输出 PDF 路径
+        """
+        slot = await self.pool.acquire(width, height, 1)
+        broken = False
+        try:
+            page = slot.page
+            slot.shell = None
+            async with self._deliver(html_content, None) as url:
+                await page.goto(url, wait_until="load", timeout=timeout)
+                await page.pdf(
+                    path=output_path,
+                    width=f"{width}px",
+                    height=f"{height}px",
+                    print_background=True,
+                    prefer_css_page_size=True
+                )
+            return output_path
+        except Exception as e:
+            broken = True
+            logger.error(f"生成 PDF 失败: {e}")
             raise
         finally:
-            if temp_html.exists():
-                temp_html.unlink()
+            await self.pool.release(slot, broken=broken)
+
+
+def local_asset_url(path: Path) -> str:
+    """
+    将本地文件路径转换为虚拟源 URL
+
+    文件所在目录需先通过 ImageRenderer.allow_asset_dir 放行。
+    与 file:// 不同，该 URL 在 memory 和 file 两种投递方式下都能被页面加载。
+
+    Args:
+        path: 本地文件路径
+
+    Returns:
+        虚拟源 URL
+    """
+    posix_path = Path(path).resolve().as_posix()
+    # POSIX 路径去掉开头的 "/"，Windows 盘符路径（C:/...）原样保留，UNC 路径（//server/...）保留一个 "/"
+    if posix_path.startswith("/"):
+        posix_path = posix_path[1:]
+    return f"{VIRTUAL_ORIGIN}/fs/{urllib.parse.quote(posix_path)}"
+
+
+def local_asset_path(url: str) -> Optional[Path]:
+    """
+    将 local_asset_url 生成的虚拟源 URL 还原为本地路径
+
+    Args:
+        url: 虚拟源 URL
+
+    Returns:
+        本地文件路径，不是 local_asset_url 生成的地址时返回 None
+    """
+    prefix = f"{VIRTUAL_ORIGIN}/fs/"
+    if not url.startswith(prefix):
+        return None
+    return _fs_path(urllib.parse.unquote(url[len(prefix):]))
+
+
+def _fs_path(rel_path: str) -> Path:
+    """将虚拟源 /fs/ 之后的路径部分还原为本地绝对路径"""
+    if _DRIVE_PREFIX.match(rel_path):
+        return Path(rel_path)
+    return Path("/" + rel_path)
 
 
 # 全局单例实例（延迟初始化）
 _renderer_instance: Optional[ImageRenderer] = None
 
 
-def get_image_renderer() -> ImageRenderer:
-    """获取全局图片渲染器实例（单例模式）"""
+def get_image_renderer(
+    pool_size: Optional[int] = None,
+    delivery: Optional[str] = None
+) -> ImageRenderer:
+    """
+    获取全局图片渲染器实例（单例模式）
+
+    Args:
+        pool_size: 页面池大小，仅在首次创建实例时生效
+        delivery: HTML 投递方式 (memory/file)，传入时更新实例配置
+    """
     global _renderer_instance
     if _renderer_instance is None:
-        _renderer_instance = ImageRenderer()
+        _renderer_instance = ImageRenderer(pool_size or DEFAULT_POOL_SIZE)
+    if delivery:
+        _renderer_instance.delivery = delivery
     return _renderer_instance
@@ -83,6 +83,30 @@ class LanguageManager:
 
         return handler
 
+    def reload_config(self, lang_id: str) -> LanguageConfig:
+        """
+        重新读取语种配置文件，已实例化的处理器随即应用新配置（重新计算静态模板变量）
+
+        Args:
+            lang_id: 语种 ID
+
+        Returns:
+            新的语种配置
+
+        Raises:
+            ValueError: 语种未注册
+            FileNotFoundError: 配置文件不存在
+        """
+        if lang_id not in self._handler_classes:
+            raise ValueError(f"语种 '{lang_id}' 未注册")
+
+        config = LanguageConfig.from_json(self.languages_dir / lang_id / "config.json")
+        self._configs[lang_id] = config
+        handler = self._handlers.get(lang_id)
+        if handler is not None:
+            handler.apply_config(config)
+        return config
+
     def list_languages(self) -> List[Dict[str, str]]:
         """
         列出所有已注册的语种
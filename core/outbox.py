@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+推送发件箱
+
+每张卡片对每个推送目标登记一条投递记录，保存在 SQLite 中，插件重启后仍然有效。
+发送失败的记录按指数退避重试，直到成功或过期；卡片图片复制到发件箱目录，
+在所有投递结束前不会被图片缓存淘汰。
+
+所有方法均为同步调用，应通过 asyncio.to_thread 在工作线程中执行。
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .delivery import DeliveryResult
+
+logger = logging.getLogger(__name__)
+
+# 首次重试间隔（秒），之后每次翻倍
+RETRY_BASE_DELAY = 60
+# 重试间隔上限（秒）
+RETRY_MAX_DELAY = 3600
+# 过期记录保留时间（秒），供 /vocab_outbox 查看
+EXPIRED_RETENTION = 7 * 86400
+
+
+@dataclass
+class OutboxCard:
+    """一张待投递的卡片及其到期的推送目标"""
+
+    card_id: str
+    caption: str
+    image_path: Path
+    targets: List[str] = field(default_factory=list)
+
+
+class Outbox:
+    """
+    持久化推送发件箱
+
+    - cards: 每张卡片一行（说明文字、图片路径）
+    - deliveries: 每个 (卡片, 目标) 一行，成功后删除，失败时记录重试次数和下次重试时间
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cards (
+            card_id TEXT PRIMARY KEY,
+            caption TEXT NOT NULL,
+            image_path TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS deliveries (
+            card_id TEXT NOT NULL,
+            target TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            last_error TEXT,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (card_id, target)
+        );
+        CREATE INDEX IF NOT EXISTS idx_deliveries_due ON deliveries (status, next_attempt_at);
+    """
+
+    def __init__(self, outbox_dir: Path, max_attempts: int = 8, max_age: float = 12 * 3600):
+        """
+        初始化发件箱
+
+        Args:
+            outbox_dir: 发件箱目录（数据库和卡片图片副本）
+            max_attempts: 单个目标最多发送次数
+            max_age: 投递记录的有效期（秒），过期后不再重试
+        """
+        self.outbox_dir = outbox_dir
+        self.max_attempts = max(1, max_attempts)
+        self.max_age = max_age
+        outbox_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(outbox_dir / "outbox.db"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """第 attempts 次失败后的重试间隔（秒）"""
+        return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** max(0, attempts - 1))
+
+    def _keep_image(self, card_id: str, image_path: Path) -> Path:
+        """将卡片图片保存到发件箱目录（优先硬链接）"""
+        target = self.outbox_dir / f"{card_id}{image_path.suffix}"
+        if target.exists():
+            return target
+        temp = target.with_name(f".{target.name}.tmp")
+        try:
+            os.link(image_path, temp)
+        except OSError:
+            shutil.copy2(image_path, temp)
+        os.replace(temp, target)
+        return target
+
+    def enqueue(self, card_id: str, caption: str, image_path: Path, targets: Iterable[str]) -> int:
+        """
+        登记一张卡片到多个目标的投递
+
+        Args:
+            card_id: 卡片 ID（图片缓存键）
+            caption: 随图片发送的说明文字
+            image_path: 卡片图片路径
+            targets: 推送目标列表
+
+        Returns:
+            登记的投递数
+        """
+        kept = self._keep_image(card_id, Path(image_path))
+        now = time.time()
+        rows = [(card_id, umo, now, now + self.max_age, now) for umo in targets]
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT INTO cards (card_id, caption, image_path, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (card_id) DO UPDATE SET caption = excluded.caption, image_path = excluded.image_path",
+                (card_id, caption, str(kept), now)
+            )
+            # 同一卡片再次推送到同一目标时重新开始计数
+            self._conn.executemany(
+                "INSERT INTO deliveries (card_id, target, next_attempt_at, expires_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (card_id, target) DO UPDATE SET status = 'pending', attempts = 0, "
+                "next_attempt_at = excluded.next_attempt_at, expires_at = excluded.expires_at, "
+                "last_error = NULL, updated_at = excluded.updated_at",
+                rows
+            )
+        return len(rows)
+
+    def due(self, now: Optional[float] = None) -> List[OutboxCard]:
+        """
+        取出到期待发送的投递，按卡片分组
+
+        Args:
+            now: 当前时间戳，默认 time.time()
+
+        Returns:
+            卡片列表（每张卡片附带到期的目标）
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.card_id, c.caption, c.image_path, d.target FROM deliveries d "
+                "JOIN cards c ON c.card_id = d.card_id "
+                "WHERE d.status = 'pending' AND d.next_attempt_at <= ? "
+                "ORDER BY c.created_at, d.target",
+                (now,)
+            ).fetchall()
+
+        cards: Dict[str, OutboxCard] = {}
+        for card_id, caption, image_path, target in rows:
+            card = cards.get(card_id)
+            if card is None:
+                card = cards[card_id] = OutboxCard(card_id, caption, Path(image_path))
+            card.targets.append(target)
+        return list(cards.values())
+
+    def record(self, card_id: str, results: Iterable[DeliveryResult]) -> Dict[str, int]:
+        """
+        记录一次发送的结果
+
+        成功的投递删除；失败的按指数退避安排重试，超过次数或有效期则标记为过期
+
+        Args:
+            card_id: 卡片 ID
+            results: 各目标的发送结果
+
+        Returns:
+            {"delivered": 成功数, "retrying": 等待重试数, "expired": 过期数}
+        """
+        now = time.time()
+        counts = {"delivered": 0, "retrying": 0, "expired": 0}
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            for result in results:
+                if result.ok:
+                    self._conn.execute(
+                        "DELETE FROM deliveries WHERE card_id = ? AND target = ?",
+                        (card_id, result.target)
+                    )
+                    counts["delivered"] += 1
+                    continue
+
+                row = self._conn.execute(
+                    "SELECT attempts, expires_at FROM deliveries WHERE card_id = ? AND target = ?",
+                    (card_id, result.target)
+                ).fetchone()
+                if row is None:
+                    continue
+                attempts = row[0] + 1
+                next_attempt = now + self.retry_delay(attempts)
+                expired = attempts >= self.max_attempts or next_attempt > row[1]
+                self._conn.execute(
+                    "UPDATE deliveries SET status = ?, attempts = ?, next_attempt_at = ?, "
+                    "last_error = ?, updated_at = ? WHERE card_id = ? AND target = ?",
+                    (
+                        "expired" if expired else "pending", attempts, next_attempt,
+                        result.error, now, card_id, result.target
+                    )
+                )
+                counts["expired" if expired else "retrying"] += 1
+                if expired:
+                    logger.warning(f"推送到 {result.target} 已放弃（共尝试 {attempts} 次）: {result.error}")
+        return counts
+
+    def next_attempt_at(self) -> Optional[float]:
+        """最近一次待重试的时间戳，没有待发送的投递时返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM deliveries WHERE status = 'pending'"
+            ).fetchone()
+        return row[0]
+
+    def cleanup(self):
+        """删除已无待发送投递的卡片及其图片副本，并清理较早的过期记录"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "DELETE FROM deliveries WHERE status = 'expired' AND updated_at < ?",
+                (now - EXPIRED_RETENTION,)
+            )
+            finished = self._conn.execute(
+                "SELECT card_id, image_path FROM cards WHERE card_id NOT IN "
+                "(SELECT card_id FROM deliveries WHERE status = 'pending')"
+            ).fetchall()
+            # 仍有过期记录的卡片保留说明文字供查看，但图片不再需要
+            self._conn.execute(
+                "DELETE FROM cards WHERE card_id NOT IN (SELECT card_id FROM deliveries)"
+            )
+
+        for _, image_path in finished:
+            try:
+                Path(image_path).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.debug(f"删除发件箱图片失败 {image_path}: {e}")
+
+    def stats(self) -> Dict:
+        """
+        发件箱状态
+
+        Returns:
+            {"pending": 待发送数, "expired": 过期数, "failures": 累计失败次数,
+             "entries": [{"card", "target", "status", "attempts", "next_attempt_at", "last_error"}, ...]}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.card_id, c.caption, d.target, d.status, d.attempts, d.next_attempt_at, d.last_error "
+                "FROM deliveries d LEFT JOIN cards c ON c.card_id = d.card_id "
+                "ORDER BY d.status DESC, d.next_attempt_at"
+            ).fetchall()
+
+        entries = [
+            {
+                "card": caption or card_id[:12],
+                "target": target,
+                "status": status,
+                "attempts": attempts,
+                "next_attempt_at": next_attempt_at,
+                "last_error": last_error,
+            }
+            for card_id, caption, target, status, attempts, next_attempt_at, last_error in rows
+        ]
+        return {
+            "pending": sum(1 for e in entries if e["status"] == "pending"),
+            "expired": sum(1 for e in entries if e["status"] == "expired"),
+            "failures": sum(e["attempts"] for e in entries),
+            "entries": entries,
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
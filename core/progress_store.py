@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+"""
+学习进度存储
+
+进度以卡组为单位记录已推送的单词、最后推送日期，以及提前生成卡片时为未来日期预留的单词。
+提供两种后端：
+- SqliteProgressStore: 每次推送追加一行，WAL 模式，写入原子且不随历史增长变慢
+- JsonProgressStore: 旧版 data/progress_<卡组>.json 文件格式（每次整体重写）
+
+所有方法均为同步调用，应通过 asyncio.to_thread 在工作线程中执行。
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def default_progress() -> Dict:
+    """空进度"""
+    return {"sent_words": [], "last_push_date": "", "reserved": {}}
+
+
+class ProgressStore(ABC):
+    """
+    进度存储接口
+
+    load 返回的字典格式与旧版进度文件一致，另加预留单词：
+    {"sent_words": [单词, ...], "last_push_date": "YYYY-MM-DD",
+     "reserved": {时段标识: {"YYYY-MM-DD": 单词}}}
+    """
+
+    def __init__(self, data_dir: Path):
+        """
+        初始化存储
+
+        Args:
+            data_dir: 插件数据目录（旧版 JSON 进度文件所在目录）
+        """
+        self.data_dir = data_dir
+
+    def json_path(self, deck: str) -> Path:
+        """
+        卡组的 JSON 进度文件路径
+
+        独立进度的进度键包含会话 ID（如 english@aiocqhttp:GroupMessage:123），
+        其中不能用于文件名的字符替换为下划线
+
+        Args:
+            deck: 卡组 ID 或进度键
+
+        Returns:
+            data/progress_<进度键>.json
+        """
+        name = re.sub(r'[^\w.@-]', '_', deck)
+        return self.data_dir / f"progress_{name}.json"
+
+    def legacy_file(self, deck: str) -> Optional[Path]:
+        """
+        获取卡组的 JSON 进度文件
+
+        英语卡组兼容最早版本的 data/progress.json
+
+        Args:
+            deck: 卡组 ID
+
+        Returns:
+            存在的 JSON 进度文件路径，没有则返回 None
+        """
+        progress_file = self.json_path(deck)
+        if progress_file.exists():
+            return progress_file
+        old_progress_file = self.data_dir / "progress.json"
+        if deck == "english" and old_progress_file.exists():
+            return old_progress_file
+        return None
+
+    @staticmethod
+    def read_json(path: Path) -> Dict:
+        """读取 JSON 进度文件，损坏时返回空进度"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"加载进度数据失败 {path}: {e}")
+            return default_progress()
+        progress = default_progress()
+        progress.update(data)
+        return progress
+
+    @abstractmethod
+    def load(self, deck: str) -> Dict:
+        """
+        加载卡组进度
+
+        Args:
+            deck: 卡组 ID 或进度键
+
+        Returns:
+            进度字典
+        """
+
+    @abstractmethod
+    def mark_sent(self, deck: str, word: str, date: str):
+        """
+        记录单词已推送
+
+        Args:
+            deck: 卡组 ID
+            word: 单词文本
+            date: 推送日期（YYYY-MM-DD）
+        """
+
+    @abstractmethod
+    def reset(self, deck: str):
+        """
+        清空卡组的已推送记录（预留单词保留）
+
+        Args:
+            deck: 卡组 ID
+        """
+
+    @abstractmethod
+    def reserve(self, deck: str, slot: str, date: str, word: str):
+        """
+        为推送时段的某一天预留单词
+
+        Args:
+            deck: 卡组 ID 或进度键
+            slot: 时段标识
+            date: 生成日期（YYYY-MM-DD）
+            word: 单词文本
+        """
+
+    @abstractmethod
+    def release(self, deck: str, slot: str, date: str):
+        """
+        取消预留（已推送或已过期）
+
+        Args:
+            deck: 卡组 ID 或进度键
+            slot: 时段标识
+            date: 生成日期（YYYY-MM-DD）
+        """
+
+    def close(self):
+        """释放资源"""
+
+
+class JsonProgressStore(ProgressStore):
+    """
+    JSON 文件进度存储（data/progress_<卡组>.json）
+
+    每次修改整体重写文件，先写临时文件再替换，避免写入中途崩溃导致文件损坏
+    """
+
+    def __init__(self, data_dir: Path):
+        super().__init__(data_dir)
+        self._progress: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def load(self, deck: str) -> Dict:
+        """加载卡组进度（支持旧数据迁移）"""
+        with self._lock:
+            progress_file = self.json_path(deck)
+            source = self.legacy_file(deck)
+            if source is not None and source != progress_file:
+                # 将旧的进度文件复制为英语进度文件（因为旧版本只支持英语）
+                try:
+                    shutil.copy2(source, progress_file)
+                    logger.info(f"已将旧进度文件迁移到: {progress_file}")
+                except OSError as e:
+                    logger.warning(f"迁移旧进度文件失败: {e}")
+
+            progress = self.read_json(source) if source is not None else default_progress()
+            self._progress[deck] = progress
+            return {
+                "sent_words": list(progress["sent_words"]),
+                "last_push_date": progress["last_push_date"],
+                "reserved": {slot: dict(dates) for slot, dates in progress["reserved"].items()},
+            }
+
+    def mark_sent(self, deck: str, word: str, date: str):
+        """记录单词已推送"""
+        with self._lock:
+            progress = self._progress.setdefault(deck, default_progress())
+            if word not in progress["sent_words"]:
+                progress["sent_words"].append(word)
+            progress["last_push_date"] = date
+            self._write(deck, progress)
+
+    def reset(self, deck: str):
+        """清空卡组的已推送记录"""
+        with self._lock:
+            progress = self._progress.setdefault(deck, default_progress())
+            progress["sent_words"] = []
+            self._write(deck, progress)
+
+    def reserve(self, deck: str, slot: str, date: str, word: str):
+        """为推送时段的某一天预留单词"""
+        with self._lock:
+            progress = self._progress.setdefault(deck, default_progress())
+            progress["reserved"].setdefault(slot, {})[date] = word
+            self._write(deck, progress)
+
+    def release(self, deck: str, slot: str, date: str):
+        """取消预留"""
+        with self._lock:
+            progress = self._progress.setdefault(deck, default_progress())
+            dates = progress["reserved"].get(slot, {})
+            if dates.pop(date, None) is None:
+                return
+            if not dates:
+                del progress["reserved"][slot]
+            self._write(deck, progress)
+
+    def _write(self, deck: str, progress: Dict):
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        progress_file = self.json_path(deck)
+        temp = progress_file.with_name(f".{progress_file.name}.tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(progress, f, ensure_ascii=False, indent=2)
+        os.replace(temp, progress_file)
+
+
+class SqliteProgressStore(ProgressStore):
+    """
+    SQLite 进度存储（WAL 模式）
+
+    - sent_words: 每个 (卡组, 单词) 一行，推送时追加
+    - deck_meta: 每个卡组一行，记录最后推送日期；存在即表示该卡组已从 JSON 迁移
+    - reservations: 每个 (卡组, 时段, 日期) 一行，记录提前生成卡片时预留的单词
+
+    首次加载某个卡组时自动导入对应的 JSON 进度文件（原文件保留不动）
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sent_words (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            deck TEXT NOT NULL,
+            word TEXT NOT NULL,
+            sent_at TEXT NOT NULL,
+            UNIQUE (deck, word)
+        );
+        CREATE TABLE IF NOT EXISTS deck_meta (
+            deck TEXT PRIMARY KEY,
+            last_push_date TEXT NOT NULL DEFAULT ''
+        );
+        CREATE TABLE IF NOT EXISTS reservations (
+            deck TEXT NOT NULL,
+            slot TEXT NOT NULL,
+            date TEXT NOT NULL,
+            word TEXT NOT NULL,
+            PRIMARY KEY (deck, slot, date)
+        );
+    """
+
+    def __init__(self, data_dir: Path, db_path: Optional[Path] = None):
+        """
+        初始化存储
+
+        Args:
+            data_dir: 插件数据目录
+            db_path: 数据库文件路径，默认为 data_dir/progress.db
+        """
+        super().__init__(data_dir)
+        self.db_path = db_path or data_dir / "progress.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def load(self, deck: str) -> Dict:
+        """加载卡组进度（首次加载时从 JSON 进度文件迁移）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_push_date FROM deck_meta WHERE deck = ?", (deck,)
+            ).fetchone()
+            if row is None:
+                self._migrate(deck)
+                row = self._conn.execute(
+                    "SELECT last_push_date FROM deck_meta WHERE deck = ?", (deck,)
+                ).fetchone()
+
+            words = [
+                word for (word,) in self._conn.execute(
+                    "SELECT word FROM sent_words WHERE deck = ? ORDER BY id", (deck,)
+                )
+            ]
+            reserved: Dict[str, Dict[str, str]] = {}
+            for slot, date, word in self._conn.execute(
+                "SELECT slot, date, word FROM reservations WHERE deck = ? ORDER BY date", (deck,)
+            ):
+                reserved.setdefault(slot, {})[date] = word
+            return {"sent_words": words, "last_push_date": row[0], "reserved": reserved}
+
+    def _migrate(self, deck: str):
+        """导入 JSON 进度文件并登记卡组（调用方需持有锁）"""
+        source = self.legacy_file(deck)
+        progress = self.read_json(source) if source is not None else default_progress()
+
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sent_words (deck, word, sent_at) VALUES (?, ?, ?)",
+                ((deck, str(word), progress["last_push_date"]) for word in progress["sent_words"])
+            )
+            self._conn.execute(
+                "INSERT INTO deck_meta (deck, last_push_date) VALUES (?, ?)",
+                (deck, progress["last_push_date"])
+            )
+        if source is not None:
+            logger.info(f"已将进度文件迁移到数据库: {source.name} -> {self.db_path.name} ({len(progress['sent_words'])} 条)")
+
+    def mark_sent(self, deck: str, word: str, date: str):
+        """记录单词已推送"""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT OR IGNORE INTO sent_words (deck, word, sent_at) VALUES (?, ?, ?)",
+                (deck, word, date)
+            )
+            self._conn.execute(
+                "INSERT INTO deck_meta (deck, last_push_date) VALUES (?, ?) "
+                "ON CONFLICT (deck) DO UPDATE SET last_push_date = excluded.last_push_date",
+                (deck, date)
+            )
+
+    def reset(self, deck: str):
+        """清空卡组的已推送记录"""
+        with self._lock:
+            self._conn.execute("DELETE FROM sent_words WHERE deck = ?", (deck,))
+
+    def reserve(self, deck: str, slot: str, date: str, word: str):
+        """为推送时段的某一天预留单词"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO reservations (deck, slot, date, word) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (deck, slot, date) DO UPDATE SET word = excluded.word",
+                (deck, slot, date, word)
+            )
+
+    def release(self, deck: str, slot: str, date: str):
+        """取消预留"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM reservations WHERE deck = ? AND slot = ? AND date = ?",
+                (deck, slot, date)
+            )
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+def create_progress_store(backend: str, data_dir: Path) -> ProgressStore:
+    """
+    按配置创建进度存储
+
+    Args:
+        backend: sqlite 或 json
+        data_dir: 插件数据目录
+
+    Returns:
+        进度存储
+    """
+    if backend == "json":
+        return JsonProgressStore(data_dir)
+    return SqliteProgressStore(data_dir)
@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+"""
+每日推送调度器
+
+每个推送时段有两个每日任务（生成、推送），按各自时区的本地时间触发。
+待执行任务保存在按触发时间排序的最小堆中，调度协程只在堆顶任务到期或时段变化时醒来，
+没有周期性轮询。
+
+每个 (时段, 任务) 最近一次完成的日期持久化在 SQLite 中：插件重启后，
+若某个任务在 catch_up 时长内错过了触发时间，会立即补执行一次。
+
+到期的任务在独立的协程中执行，调度协程不等待其完成：一个时段生成卡片较慢时，
+其他时段的推送照常按时执行；只有同一时段的推送会等待该时段仍在执行的生成任务。
+"""
+
+import asyncio
+import datetime
+import heapq
+import itertools
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .subscriptions import SlotPlan
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    ZONEINFO_AVAILABLE = True
+except ImportError:
+    ZONEINFO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEZONE = "Asia/Shanghai"
+
+# 同一时刻到期时先生成后推送
+JOB_KINDS = ("generate", "send")
+
+_BEIJING_TZ = datetime.timezone(datetime.timedelta(hours=8))
+_timezones: Dict[str, datetime.tzinfo] = {}
+
+
+def resolve_timezone(name: str) -> datetime.tzinfo:
+    """
+    获取时区
+
+    不可用（未知名称，或系统缺少时区数据库且未安装 tzdata）时回退到东八区
+
+    Args:
+        name: IANA 时区名，如 Asia/Shanghai、Europe/Berlin
+
+    Returns:
+        时区对象
+    """
+    tz = _timezones.get(name)
+    if tz is not None:
+        return tz
+    tz = _BEIJING_TZ
+    if ZONEINFO_AVAILABLE:
+        try:
+            tz = ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError) as e:
+            logger.warning(f"时区 '{name}' 不可用，使用东八区: {e}")
+    elif name != DEFAULT_TIMEZONE:
+        logger.warning(f"当前环境不支持 zoneinfo，时区 '{name}' 按东八区处理")
+    _timezones[name] = tz
+    return tz
+
+
+def is_valid_timezone(name: str) -> bool:
+    """时区名是否可用（不支持 zoneinfo 的环境只接受默认时区）"""
+    if not ZONEINFO_AVAILABLE:
+        return name == DEFAULT_TIMEZONE
+    try:
+        ZoneInfo(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+
+
+def parse_time(time_str: str) -> Tuple[int, int]:
+    """解析时间字符串 HH:MM，格式错误时返回 08:00"""
+    try:
+        hour, minute = time_str.split(':')
+        return int(hour), int(minute)
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"时间格式解析失败 '{time_str}': {e}，使用默认值 08:00")
+        return 8, 0
+
+
+def generate_occurrence(slot: SlotPlan, send_occurrence: str) -> str:
+    """
+    推送任务对应的生成任务日期
+
+    生成时间晚于推送时间的时段（如 23:00 生成、07:00 推送），卡片在推送前一天生成
+
+    Args:
+        slot: 推送时段
+        send_occurrence: 推送任务所属的本地日期
+
+    Returns:
+        生成任务所属的本地日期
+    """
+    date = datetime.date.fromisoformat(send_occurrence)
+    if parse_time(slot.generate_time) > parse_time(slot.send_time):
+        date -= datetime.timedelta(days=1)
+    return date.isoformat()
+
+
+@dataclass(order=True)
+class ScheduledJob:
+    """堆中的一个待执行任务"""
+
+    due: float
+    order: int
+    seq: int
+    kind: str = field(compare=False)
+    slot_key: str = field(compare=False)
+    # 任务所属的本地日期（YYYY-MM-DD），完成后记录到状态表
+    occurrence: str = field(compare=False)
+
+
+class JobStateStore:
+    """
+    调度状态存储（data/schedule.db）
+
+    job_runs: 每个 (时段, 任务) 一行，记录最近一次完成的本地日期
+    slot_cards: 每个时段已生成、尚未推送的卡片（生成日期、图片路径、单词），重启后推送任务继续使用
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS job_runs (
+            slot_key TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            occurrence TEXT NOT NULL,
+            finished_at REAL NOT NULL,
+            PRIMARY KEY (slot_key, kind)
+        );
+        CREATE TABLE IF NOT EXISTS slot_cards (
+            slot_key TEXT PRIMARY KEY,
+            occurrence TEXT NOT NULL,
+            image_path TEXT NOT NULL,
+            word TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        初始化存储
+
+        Args:
+            db_path: 数据库文件路径
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def load(self) -> Dict[Tuple[str, str], str]:
+        """
+        读取全部任务状态
+
+        Returns:
+            (时段标识, 任务类型) -> 最近一次完成的本地日期
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT slot_key, kind, occurrence FROM job_runs").fetchall()
+        return {(slot_key, kind): occurrence for slot_key, kind, occurrence in rows}
+
+    def mark_done(self, jobs: List[ScheduledJob]):
+        """记录任务已完成"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO job_runs (slot_key, kind, occurrence, finished_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (slot_key, kind) DO UPDATE SET occurrence = excluded.occurrence, "
+                "finished_at = excluded.finished_at",
+                ((job.slot_key, job.kind, job.occurrence, now) for job in jobs)
+            )
+
+    def load_cards(self) -> Dict[str, Tuple[str, str, str]]:
+        """
+        读取已生成、尚未推送的卡片
+
+        Returns:
+            时段标识 -> (图片路径, 单词, 生成日期)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT slot_key, image_path, word, occurrence FROM slot_cards").fetchall()
+        return {slot_key: (image_path, word, occurrence) for slot_key, image_path, word, occurrence in rows}
+
+    def save_card(self, slot_key: str, image_path: str, word: str, occurrence: str):
+        """记录时段已生成的卡片（同一时段只保留最新一张）"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO slot_cards (slot_key, occurrence, image_path, word) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (slot_key) DO UPDATE SET occurrence = excluded.occurrence, "
+                "image_path = excluded.image_path, word = excluded.word",
+                (slot_key, occurrence, image_path, word)
+            )
+
+    def remove_card(self, slot_key: str):
+        """时段的卡片已推送（或已作废）"""
+        with self._lock:
+            self._conn.execute("DELETE FROM slot_cards WHERE slot_key = ?", (slot_key,))
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+class DailyScheduler:
+    """
+    基于最小堆的每日任务调度器
+
+    用法:
+        scheduler = DailyScheduler(state, runner, catch_up=6 * 3600)
+        scheduler.update(slots)           # 时段变化时随时调用
+        task = asyncio.create_task(scheduler.run())
+
+    runner(kind, slots, occurrences) 在任务到期时被调用，occurrences 为 时段标识 -> 任务所属的本地日期。
+    生成任务每个时段调用一次，同一时刻到期的推送任务合并为一次调用；各次调用并发执行。
+    """
+
+    def __init__(
+        self,
+        state: JobStateStore,
+        runner: Callable[[str, List[SlotPlan], Dict[str, str]], Awaitable[object]],
+        catch_up: float = 6 * 3600
+    ):
+        """
+        初始化调度器
+
+        Args:
+            state: 调度状态存储
+            runner: 任务执行协程工厂，接收任务类型、到期的时段列表和各时段的任务日期
+            catch_up: 错过触发时间后仍补执行的时长（秒），0 表示不补执行
+        """
+        self.state = state
+        self.runner = runner
+        self.catch_up = catch_up
+        self._slots: Dict[str, SlotPlan] = {}
+        self._done: Optional[Dict[Tuple[str, str], str]] = None
+        self._heap: List[ScheduledJob] = []
+        # 执行中的任务: (时段标识, 任务类型) -> (任务日期, 执行协程)
+        self._running: Dict[Tuple[str, str], Tuple[str, asyncio.Task]] = {}
+        self._seq = itertools.count()
+        self._changed = asyncio.Event()
+        # 调度状态加载完成后置位
+        self.ready = asyncio.Event()
+
+    def update(self, slots: List[SlotPlan]):
+        """
+        替换全部推送时段，调度协程随即醒来重建任务堆
+
+        Args:
+            slots: 推送时段列表
+        """
+        self._slots = {slot.key: slot for slot in slots}
+        self._changed.set()
+
+    def next_run(self, slot_key: str, kind: str) -> Optional[float]:
+        """
+        时段任务的下次触发时间
+
+        Args:
+            slot_key: 时段标识
+            kind: generate 或 send
+
+        Returns:
+            时间戳，未安排时返回 None
+        """
+        for job in self._heap:
+            if job.slot_key == slot_key and job.kind == kind:
+                return job.due
+        return None
+
+    def next_occurrence(self, slot: SlotPlan, kind: str) -> Optional[str]:
+        """
+        时段任务下一次执行所属的本地日期
+
+        Args:
+            slot: 推送时段
+            kind: generate 或 send
+
+        Returns:
+            YYYY-MM-DD，调度状态尚未加载时返回 None
+        """
+        if self._done is None:
+            return None
+        # 执行中的任务尚未完成，其日期仍算作下一次执行（预生成不会提前取消它要用的预留）
+        return self._next_job(slot, kind, time.time(), include_running=False).occurrence
+
+    def _rebuild(self, now: float):
+        self._heap = [
+            self._next_job(slot, kind, now)
+            for slot in self._slots.values()
+            for kind in JOB_KINDS
+        ]
+        heapq.heapify(self._heap)
+        for job in self._heap:
+            if job.due == now:
+                logger.info(f"补执行错过的任务: {job.kind} [{job.slot_key}] {job.occurrence}")
+
+    def _next_job(self, slot: SlotPlan, kind: str, now: float, include_running: bool = True) -> ScheduledJob:
+        """
+        计算时段任务的下一次执行
+
+        最近一次应触发的时间未完成且在补执行时长内时立即执行，否则安排到下一次触发时间。
+        没有任何完成记录的新时段不补执行。include_running 为 True 时执行中的任务视为已完成，不会重复安排。
+        """
+        tz = resolve_timezone(slot.timezone)
+        hour, minute = parse_time(slot.generate_time if kind == "generate" else slot.send_time)
+        trigger = datetime.time(hour, minute)
+
+        local_now = datetime.datetime.fromtimestamp(now, tz)
+        latest = datetime.datetime.combine(local_now.date(), trigger, tzinfo=tz)
+        if latest.timestamp() > now:
+            latest -= datetime.timedelta(days=1)
+
+        last_done = self._done.get((slot.key, kind))
+        running = self._running.get((slot.key, kind)) if include_running else None
+        if running is not None and (last_done is None or running[0] > last_done):
+            last_done = running[0]
+        occurrence = latest.date().isoformat()
+        if last_done is not None and last_done < occurrence and now - latest.timestamp() <= self.catch_up:
+            due = now
+        else:
+            upcoming = datetime.datetime.combine(latest.date() + datetime.timedelta(days=1), trigger, tzinfo=tz)
+            occurrence = upcoming.date().isoformat()
+            due = upcoming.timestamp()
+
+        return ScheduledJob(due, JOB_KINDS.index(kind), next(self._seq), kind, slot.key, occurrence)
+
+    async def _wait(self, timeout: Optional[float]):
+        """等待到超时或时段变化"""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _dispatch(self, kind: str, jobs: List[ScheduledJob], after: Optional[asyncio.Task] = None):
+        """
+        在独立的协程中执行一批同类任务
+
+        Args:
+            kind: 任务类型
+            jobs: 同一时刻到期的任务
+            after: 需要先等待完成的任务（同一时段的生成任务）
+        """
+        slots = [self._slots[job.slot_key] for job in jobs]
+        occurrences = {job.slot_key: job.occurrence for job in jobs}
+
+        async def execute():
+            if after is not None:
+                await asyncio.wait([after])
+            try:
+                await self.runner(kind, slots, occurrences)
+            except Exception as e:
+                logger.error(f"定时任务出错 ({kind}): {e}")
+
+            # 无论成功与否都记为完成，失败的推送由发件箱负责重试
+            for job in jobs:
+                self._done[(job.slot_key, job.kind)] = job.occurrence
+            try:
+                await asyncio.to_thread(self.state.mark_done, jobs)
+            except Exception as e:
+                logger.error(f"保存调度状态失败: {e}")
+
+        task = asyncio.create_task(execute())
+        for job in jobs:
+            self._running[(job.slot_key, job.kind)] = (job.occurrence, task)
+
+        def finished(task: asyncio.Task):
+            for job in jobs:
+                key = (job.slot_key, job.kind)
+                if key in self._running and self._running[key][1] is task:
+                    del self._running[key]
+
+        task.add_done_callback(finished)
+
+    async def run(self):
+        """调度主循环"""
+        self._done = await asyncio.to_thread(self.state.load)
+        self._changed.set()
+        self.ready.set()
+
+        try:
+            await self._loop()
+        finally:
+            # 调度协程被取消（插件卸载）时一并取消执行中的任务
+            tasks = {task for _, task in self._running.values()}
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _loop(self):
+        while True:
+            # 时段变化（或首次运行）时按最新时段和完成记录重建任务堆
+            if self._changed.is_set():
+                self._changed.clear()
+                self._rebuild(time.time())
+
+            if not self._heap:
+                await self._wait(None)
+                continue
+
+            delay = self._heap[0].due - time.time()
+            if delay > 0:
+                logger.debug(f"距离下次任务还有 {delay:.0f} 秒")
+                await self._wait(delay)
+                continue
+
+            # 取出所有已到期的任务
+            now = time.time()
+            due: List[ScheduledJob] = []
+            while self._heap and self._heap[0].due <= now:
+                due.append(heapq.heappop(self._heap))
+
+            # 生成任务每个时段单独执行，一个时段较慢不影响其他时段
+            for job in due:
+                if job.kind == "generate" and job.slot_key in self._slots:
+                    self._dispatch("generate", [job])
+
+            # 推送任务按其时段是否有执行中的生成任务分组：有的等待该生成任务，其余合并后立即执行
+            batches: Dict[Optional[asyncio.Task], List[ScheduledJob]] = {}
+            for job in due:
+                if job.kind == "send" and job.slot_key in self._slots:
+                    running = self._running.get((job.slot_key, "generate"))
+                    batches.setdefault(running[1] if running else None, []).append(job)
+            for after, jobs in batches.items():
+                self._dispatch("send", jobs, after)
+
+            # 安排下一次（执行中的任务视为已完成；时段有变化时由下一轮统一重建）
+            if not self._changed.is_set():
+                for job in due:
+                    slot = self._slots.get(job.slot_key)
+                    if slot is not None:
+                        heapq.heappush(self._heap, self._next_job(slot, job.kind, time.time()))
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+推送订阅
+
+每个推送目标（会话）可以订阅不同的卡组和推送时间。
+没有单独订阅的已注册会话沿用全局配置（current_language 和全局推送时间）。
+
+推送计划按 (进度键, 时区, 生成时间, 推送时间) 分组：同组的会话共用一次选词和一张卡片，
+渲染次数只与不同的 (卡组, 单词) 数量有关，与会话数量无关。
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Subscription:
+    """单个会话的推送订阅"""
+
+    target: str
+    deck: str
+    send_time: str = "08:00"
+    generate_time: str = "07:30"
+    # 独立进度：不与同卡组的其他会话共享学习进度
+    own_progress: bool = False
+    # 推送时间所在时区（IANA 时区名）
+    timezone: str = "Asia/Shanghai"
+
+    @property
+    def progress_key(self) -> str:
+        """进度键（共享进度时为卡组 ID）"""
+        return f"{self.deck}@{self.target}" if self.own_progress else self.deck
+
+
+@dataclass
+class SlotPlan:
+    """一个推送时段：同一进度键、同一时间的全部会话"""
+
+    deck: str
+    progress_key: str
+    generate_time: str
+    send_time: str
+    timezone: str = "Asia/Shanghai"
+    targets: List[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        """时段标识"""
+        return f"{self.progress_key}|{self.timezone}|{self.generate_time}|{self.send_time}"
+
+
+def plan_slots(subscriptions: Iterable[Subscription]) -> List[SlotPlan]:
+    """
+    将订阅按 (进度键, 时区, 生成时间, 推送时间) 分组
+
+    Args:
+        subscriptions: 订阅列表
+
+    Returns:
+        推送时段列表
+    """
+    slots: Dict[tuple, SlotPlan] = {}
+    for sub in subscriptions:
+        group = (sub.progress_key, sub.timezone, sub.generate_time, sub.send_time)
+        slot = slots.get(group)
+        if slot is None:
+            slot = slots[group] = SlotPlan(
+                sub.deck, sub.progress_key, sub.generate_time, sub.send_time, sub.timezone
+            )
+        slot.targets.append(sub.target)
+    return list(slots.values())
+
+
+class SubscriptionStore:
+    """
+    订阅存储（data/subscriptions.json）
+
+    写入时先写临时文件再替换
+    """
+
+    def __init__(self, path: Path):
+        """
+        初始化存储
+
+        Args:
+            path: 订阅文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, Subscription] = self._load()
+
+    def _load(self) -> Dict[str, Subscription]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {item["target"]: Subscription(**item) for item in data}
+        except Exception as e:
+            logger.error(f"加载订阅数据失败: {e}")
+            return {}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump([asdict(sub) for sub in self._subscriptions.values()], f, ensure_ascii=False, indent=2)
+        os.replace(temp, self.path)
+
+    def get(self, target: str) -> Optional[Subscription]:
+        """获取会话的订阅"""
+        return self._subscriptions.get(target)
+
+    def all(self) -> List[Subscription]:
+        """全部订阅"""
+        return list(self._subscriptions.values())
+
+    def set(self, subscription: Subscription):
+        """新增或更新订阅"""
+        with self._lock:
+            self._subscriptions[subscription.target] = subscription
+            self._save()
+
+    def remove(self, target: str) -> bool:
+        """
+        删除订阅
+
+        Returns:
+            是否存在并已删除
+        """
+        with self._lock:
+            if self._subscriptions.pop(target, None) is None:
+                return False
+            self._save()
+            return True
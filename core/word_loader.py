@@ -4,8 +4,157 @@
 """
 
 import json
+import logging
+import threading
+from array import array
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional, Tuple
+
+from .corpus import CompiledCorpus, open_corpus
+
+logger = logging.getLogger(__name__)
+
+
+class _CorpusEntry:
+    """注册表中的一个物理词库文件"""
+
+    def __init__(self, corpus: CompiledCorpus, signature: Tuple[int, int]):
+        self.corpus = corpus
+        self.signature = signature
+        # 字段名 -> {字段值: 记录下标数组}
+        self.groups: Dict[str, Dict[str, array]] = {}
+        # (必填字段, 分组字段, 分组值) -> 记录下标数组
+        self.views: Dict[Tuple, array] = {}
+
+
+class CorpusRegistry:
+    """
+    进程级编译词库注册表
+
+    同一个物理文件（按解析后的绝对路径）只打开一次，所有引用它的卡组
+    （如 japanese 与 japanese_n1…n5）共享同一个 mmap 和同一批下标数组：
+    - 按分组字段（如 level）一次性建立 值 -> 下标数组 的索引
+    - 按 (文件, 必填字段, 筛选条件) 缓存筛选结果，视图之间零拷贝共享
+    - 源文件变化（mtime/大小）后自动重新加载
+    """
+
+    def __init__(self):
+        self._entries: Dict[Path, _CorpusEntry] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, source: Path) -> _CorpusEntry:
+        """获取（必要时打开或重新加载）词库条目，调用方需持有锁"""
+        path = source.resolve()
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(path)
+        if entry is not None and entry.signature == signature:
+            return entry
+
+        corpus = open_corpus(path)
+        if len(corpus) == 0:
+            corpus.close()
+            raise ValueError(f"词库数据格式无效: {path}")
+
+        # 旧版本可能仍被已发放的视图引用，交由垃圾回收释放映射
+        if entry is not None:
+            logger.info(f"词库文件已变化，重新加载: {path}")
+        entry = _CorpusEntry(corpus, signature)
+        self._entries[path] = entry
+        return entry
+
+    def open(self, source: Path) -> CompiledCorpus:
+        """
+        获取共享的编译词库
+
+        Args:
+            source: JSON 词库路径
+
+        Returns:
+            编译词库
+        """
+        with self._lock:
+            return self._entry(source).corpus
+
+    def groups(self, source: Path, field: str) -> Dict[str, array]:
+        """
+        获取按字段值分组的记录下标索引（每个文件每个字段只建立一次）
+
+        Args:
+            source: JSON 词库路径
+            field: 分组字段名（如 level）
+
+        Returns:
+            字段值 -> 记录下标数组
+        """
+        with self._lock:
+            entry = self._entry(source)
+            return self._groups(entry, field)
+
+    @staticmethod
+    def _groups(entry: _CorpusEntry, field: str) -> Dict[str, array]:
+        grouped = entry.groups.get(field)
+        if grouped is None:
+            grouped = {}
+            for i, value in enumerate(entry.corpus.column(field)):
+                grouped.setdefault(value, array('I')).append(i)
+            entry.groups[field] = grouped
+        return grouped
+
+    def indices(
+        self,
+        source: Path,
+        required_fields: Iterable[str],
+        group_field: Optional[str] = None,
+        group_value: Optional[str] = None
+    ) -> Tuple[CompiledCorpus, array]:
+        """
+        获取筛选后的记录下标（按条件缓存，多次调用返回同一个数组）
+
+        Args:
+            source: JSON 词库路径
+            required_fields: 必须非空的字段
+            group_field: 分组字段名，None 表示不按分组筛选
+            group_value: 分组值需包含的文本（如 N3 匹配 JLPT-N3）
+
+        Returns:
+            (编译词库, 记录下标数组)
+        """
+        required = tuple(required_fields)
+        with self._lock:
+            entry = self._entry(source)
+            key = (required, group_field, group_value)
+            cached = entry.views.get(key)
+            if cached is not None:
+                return entry.corpus, cached
+
+            base_key = (required, None, None)
+            base = entry.views.get(base_key)
+            if base is None:
+                base = entry.corpus.indices_with(required)
+                entry.views[base_key] = base
+
+            if group_field is None or group_value is None:
+                return entry.corpus, base
+
+            # 合并所有匹配分组的下标，再与必填字段筛选结果求交（均保持原始顺序）
+            grouped = self._groups(entry, group_field)
+            matched = set()
+            for value, members in grouped.items():
+                if group_value in value:
+                    matched.update(members)
+            result = array('I', (i for i in base if i in matched))
+            entry.views[key] = result
+            return entry.corpus, result
+
+
+_registry = CorpusRegistry()
+
+
+def get_corpus_registry() -> CorpusRegistry:
+    """获取进程级词库注册表"""
+    return _registry
 
 
 class WordLoader:
@@ -55,6 +204,37 @@ class WordLoader:
 
         return data
 
+    def load_corpus(
+        self,
+        required_fields: Iterable[str] = (),
+        group_field: Optional[str] = None,
+        group_value: Optional[str] = None
+    ) -> Tuple[CompiledCorpus, array]:
+        """
+        加载编译词库（mmap 打开，按需解码）及筛选后的记录下标
+
+        通过进程级注册表加载，共用同一文件的卡组共享词库和下标数组。
+        JSON 文件变化后会自动重新编译。优先使用共享词库路径（如果配置了）
+
+        Args:
+            required_fields: 必须非空的字段
+            group_field: 分组筛选字段（如 level）
+            group_value: 分组值需包含的文本（如 N3）
+
+        Returns:
+            (编译词库, 记录下标数组)
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            ValueError: 数据格式无效
+        """
+        target_path = self._get_target_path()
+
+        if not target_path.exists():
+            raise FileNotFoundError(f"词库文件不存在: {target_path}")
+
+        return get_corpus_registry().indices(target_path, required_fields, group_field, group_value)
+
     def validate_data(self, data: List[Dict]) -> bool:
         """
         验证数据格式
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+单词选择器
+
+增量维护卡组中"尚未推送"的单词集合，随机选词、顺序选词和标记已推送均为 O(1)，
+不再在每次选词时重建已推送集合并遍历整个卡组。
+"""
+
+import random
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# 位置不在可用数组中的标记值
+_NOT_AVAILABLE = 0xFFFFFFFF
+
+
+class WordSelector:
+    """
+    卡组选词索引
+
+    - 已推送标记：每个卡组位置一个字节
+    - 可用数组：未推送位置的紧凑数组，随机选词直接按下标取，标记时与末尾交换后删除
+    - 顺序游标：指向卡组顺序中第一个未推送的位置，只向前移动
+    - 单词 -> 位置列表：按单词文本标记（同名词条一起标记，与进度文件的记录方式一致）
+    """
+
+    def __init__(self, keys: Sequence[str], sent_words: Iterable[str] = ()):
+        """
+        初始化选择器
+
+        Args:
+            keys: 卡组中每个位置的单词文本（即 WordEntry.word）
+            sent_words: 已推送的单词文本
+        """
+        self.size = len(keys)
+        self._positions: Dict[str, List[int]] = {}
+        for position, key in enumerate(keys):
+            self._positions.setdefault(key, []).append(position)
+
+        self._sent_keys = set()
+        self._sent = bytearray(self.size)
+        self._available = array('I', range(self.size))
+        self._slot = array('I', range(self.size))
+        self._cursor = 0
+
+        for word in sent_words:
+            self.mark(word)
+
+    @property
+    def remaining(self) -> int:
+        """未推送的位置数"""
+        return len(self._available)
+
+    def is_sent(self, word: str) -> bool:
+        """单词是否已推送"""
+        return word in self._sent_keys
+
+    def positions(self, word: str) -> List[int]:
+        """单词在卡组中的位置列表"""
+        return self._positions.get(word, [])
+
+    def pick(self, sequential: bool = False, rng: Optional[random.Random] = None) -> Optional[int]:
+        """
+        选出一个未推送的位置（不标记）
+
+        Args:
+            sequential: 顺序模式，返回卡组顺序中第一个未推送的位置
+            rng: 随机数生成器，默认使用 random 模块
+
+        Returns:
+            卡组位置，全部已推送时返回 None
+        """
+        if not self._available:
+            return None
+
+        if sequential:
+            while self._sent[self._cursor]:
+                self._cursor += 1
+            return self._cursor
+
+        index = (rng or random).randrange(len(self._available))
+        return self._available[index]
+
+    def mark(self, word: str) -> bool:
+        """
+        标记单词已推送
+
+        Args:
+            word: 单词文本
+
+        Returns:
+            是否为新标记（之前未推送过）
+        """
+        if word in self._sent_keys:
+            return False
+        self._sent_keys.add(word)
+
+        available = self._available
+        slot = self._slot
+        for position in self._positions.get(word, ()):
+            if self._sent[position]:
+                continue
+            self._sent[position] = 1
+
+            # 与末尾元素交换后删除
+            index = slot[position]
+            last = available[-1]
+            available[index] = last
+            slot[last] = index
+            available.pop()
+            slot[position] = _NOT_AVAILABLE
+        return True
+
+    def unmark(self, word: str) -> bool:
+        """
+        撤销单词的已推送标记（取消预留时使用）
+
+        Args:
+            word: 单词文本
+
+        Returns:
+            之前是否已标记
+        """
+        if word not in self._sent_keys:
+            return False
+        self._sent_keys.discard(word)
+
+        for position in self._positions.get(word, ()):
+            if not self._sent[position]:
+                continue
+            self._sent[position] = 0
+            self._slot[position] = len(self._available)
+            self._available.append(position)
+            self._cursor = min(self._cursor, position)
+        return True
+
+    def reset(self):
+        """清空全部已推送标记"""
+        self._sent_keys.clear()
+        self._sent = bytearray(self.size)
+        self._available = array('I', range(self.size))
+        self._slot = array('I', range(self.size))
+        self._cursor = 0
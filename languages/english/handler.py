@@ -21,62 +21,30 @@ class EnglishLanguageHandler(BaseLanguageHandler):
     - 提供英语特定的样式和字体配置
     """
 
-    def load_words(self) -> List[WordEntry]:
-        """
-        加载英语词汇
-
-        从 words.json 加载数据并转换为 WordEntry 列表
+    template_name = "card.html"
+    required_fields = ("word", "definition_cn")
 
-        Returns:
-            WordEntry 列表
+    def build_entry(self, item: Dict[str, str]) -> WordEntry:
         """
-        raw_data = self.loader.load_json()
-
-        words = []
-        for item in raw_data:
-            word_entry = WordEntry(
-                word=item.get("word", ""),
-                phonetic=item.get("phonetic", ""),
-                pos=item.get("pos", ""),
-                definition=item.get("definition_cn", ""),
-                example=item.get("example", ""),
-                extra_fields={}
-            )
-
-            if word_entry.validate():
-                words.append(word_entry)
-
-        self.words = words
-        return words
-
-    def render_card(self, word: WordEntry, **kwargs) -> str:
-        """
-        渲染英语卡片
+        将 words.json 中的一条记录转换为 WordEntry
 
         Args:
-            word: 单词数据
-            **kwargs: 额外参数
-                - bg_url: 背景图 URL
-                - theme_color: 主题色
-                - bg_position: 背景位置
+            item: 原始记录
 
         Returns:
-            渲染后的 HTML 字符串
+            WordEntry
         """
-        # 准备模板变量
-        template_vars = {
-            # 单词数据
-            "word": word.word,
-            "phonetic": word.phonetic or "",
-            "pos": (word.pos or "WORD").upper(),
-            "definition_cn": word.definition,
-            "example": word.example or "",
-
-            # 背景和主题
-            "bg_url": kwargs.get("bg_url", ""),
-            "theme_color": kwargs.get("theme_color", "#2F4F4F"),
-            "bg_position": kwargs.get("bg_position", "50% 50%"),
-
+        return WordEntry(
+            word=item.get("word", ""),
+            phonetic=item.get("phonetic", ""),
+            pos=item.get("pos", ""),
+            definition=item.get("definition_cn", ""),
+            example=item.get("example", "")
+        )
+
+    def build_static_context(self) -> Dict[str, str]:
+        """英语卡片的字体、样式和标签"""
+        return {
             # 字体配置
             "font_word": self.config.fonts.get("word", "serif"),
             "font_phonetic": self.config.fonts.get("phonetic", "monospace"),
@@ -97,8 +65,29 @@ class EnglishLanguageHandler(BaseLanguageHandler):
             "brand": "Daily Vocab"
         }
 
-        # 渲染模板
-        return self.renderer.render("card.html", template_vars)
+    def card_variables(self, word: WordEntry, **kwargs) -> Dict[str, str]:
+        """
+        英语卡片的模板变量
+
+        Args:
+            word: 单词数据
+            **kwargs: 额外参数
+                - bg_url: 背景图 URL
+                - theme_color: 主题色
+                - bg_position: 背景位置
+
+        Returns:
+            模板变量字典
+        """
+        # 静态变量（字体、样式、标签）已在加载配置时计算，这里只合并单词数据和视觉参数
+        return self.card_context(
+            kwargs,
+            word=word.word,
+            phonetic=word.phonetic or "",
+            pos=(word.pos or "WORD").upper(),
+            definition_cn=word.definition,
+            example=word.example or ""
+        )
 
     def _get_background_url(self, word: WordEntry, backgrounds: List[Path]) -> str:
         """
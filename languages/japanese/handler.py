@@ -4,10 +4,11 @@
 """
 
 import random
-from typing import List, Dict
+from typing import List, Dict, Sequence
 from pathlib import Path
 
 from ...core.base_handler import BaseLanguageHandler, WordEntry
+from ...core.corpus import CorpusView
 from ...core.language_config import LanguageConfig
 
 
@@ -21,11 +22,14 @@ class JapaneseLanguageHandler(BaseLanguageHandler):
     - 提供日语特定的样式和字体配置
     """
 
-    def load_words(self, level_filter: str = None) -> List[WordEntry]:
+    template_name = "card_japanese.html"
+    required_fields = ("word", "definition_cn")
+    default_theme_color = "#8B4513"
+
+    def load_words(self, level_filter: str = None) -> Sequence[WordEntry]:
         """
         加载日语词汇
 
-        从 words.json 加载数据并转换为 WordEntry 列表
         日语数据包含：word(汉字), kana(假名), accent(重音), pos(词性),
         definition_cn(中文释义), example_ja(日语例句), example_cn(中文例句翻译),
         level(JLPT等级)
@@ -35,76 +39,45 @@ class JapaneseLanguageHandler(BaseLanguageHandler):
                          如果为 None，则使用配置文件中的 level_filter
 
         Returns:
-            WordEntry 列表
+            WordEntry 序列（只读视图）
         """
         # 优先使用传入参数，否则使用配置中的默认值
         filter_level = level_filter if level_filter is not None else getattr(self.config, 'level_filter', 'all')
 
-        raw_data = self.loader.load_json()
-
-        words = []
-        for item in raw_data:
-            # 等级筛选
-            item_level = item.get("level", "")  # 格式: JLPT-N4
-            if filter_level != "all":
-                # 检查是否匹配指定等级
-                if f"JLPT-{filter_level}" not in item_level and filter_level not in item_level:
-                    continue
-
-            word_entry = WordEntry(
-                word=item.get("word", ""),
-                phonetic=item.get("kana", ""),  # 假名读音
-                pos=item.get("pos", ""),
-                definition=item.get("definition_cn", ""),
-                example=item.get("example_ja", ""),  # 日语例句
-                extra_fields={
-                    "accent": item.get("accent", ""),  # 重音标记
-                    "example_cn": item.get("example_cn", ""),  # 中文例句翻译
-                    "level": item_level  # JLPT等级
-                }
-            )
-
-            if word_entry.validate():
-                words.append(word_entry)
-
-        self.words = words
-        return words
-
-    def render_card(self, word: WordEntry, **kwargs) -> str:
+        # 等级索引（格式: JLPT-N4）在共享词库上只建立一次，各等级卡组共用筛选结果
+        corpus, indices = self.loader.load_corpus(
+            self.required_fields,
+            group_field="level",
+            group_value=None if filter_level == "all" else filter_level
+        )
+
+        self.words = CorpusView(corpus, indices, self.build_entry)
+        return self.words
+
+    def build_entry(self, item: Dict[str, str]) -> WordEntry:
         """
-        渲染日语卡片
+        将 words.json 中的一条记录转换为 WordEntry
 
         Args:
-            word: 单词数据
-            **kwargs: 额外参数
-                - bg_url: 背景图 URL
-                - theme_color: 主题色
-                - bg_position: 背景位置
+            item: 原始记录
 
         Returns:
-            渲染后的 HTML 字符串
+            WordEntry
         """
-        # 提取日语特定字段
-        accent = word.extra_fields.get("accent", "")
-        example_cn = word.extra_fields.get("example_cn", "")
-        level = word.extra_fields.get("level", "JLPT")
-
-        # 准备模板变量
-        template_vars = {
-            # 单词数据
-            "word": word.word,  # 汉字
-            "kana": word.phonetic,  # 假名
-            "accent": accent,  # 重音标记
-            "pos": word.pos or "単語",
-            "definition_cn": word.definition,
-            "example_ja": word.example or "",  # 日语例句
-            "example_cn": example_cn,  # 中文例句翻译
-
-            # 背景和主题
-            "bg_url": kwargs.get("bg_url", ""),
-            "theme_color": kwargs.get("theme_color", "#8B4513"),
-            "bg_position": kwargs.get("bg_position", "50% 50%"),
-
+        return WordEntry(
+            word=item.get("word", ""),
+            phonetic=item.get("kana", ""),  # 假名读音
+            pos=item.get("pos", ""),
+            definition=item.get("definition_cn", ""),
+            example=item.get("example_ja", ""),  # 日语例句
+            accent=item.get("accent", ""),  # 重音标记
+            example_cn=item.get("example_cn", ""),  # 中文例句翻译
+            level=item.get("level", "")  # JLPT等级
+        )
+
+    def build_static_context(self) -> Dict[str, str]:
+        """日语卡片的字体、样式和标签（tag1 为每个单词的 JLPT 等级）"""
+        return {
             # 字体配置
             "font_word": self.config.fonts.get("word", "serif"),
             "font_phonetic": self.config.fonts.get("phonetic", "sans-serif"),
@@ -120,13 +93,39 @@ class JapaneseLanguageHandler(BaseLanguageHandler):
             "example_style": self.config.styles.get("example_style", "normal"),
 
             # 标签
-            "tag1": f"#{level}",  # JLPT等级
             "tag2": "#Daily",
             "brand": "毎日単語"  # 日语品牌名
         }
 
-        # 渲染模板
-        return self.renderer.render("card_japanese.html", template_vars)
+    def card_variables(self, word: WordEntry, **kwargs) -> Dict[str, str]:
+        """
+        日语卡片的模板变量
+
+        Args:
+            word: 单词数据
+            **kwargs: 额外参数
+                - bg_url: 背景图 URL
+                - theme_color: 主题色
+                - bg_position: 背景位置
+
+        Returns:
+            模板变量字典
+        """
+        # JLPT 等级（未记录等级的词条显示为 JLPT）
+        level = word.level if word.level is not None else "JLPT"
+
+        # 静态变量（字体、样式、标签）已在加载配置时计算，这里只合并单词数据和视觉参数
+        return self.card_context(
+            kwargs,
+            word=word.word,  # 汉字
+            kana=word.phonetic,  # 假名
+            accent=word.accent or "",  # 重音标记
+            pos=word.pos or "単語",
+            definition_cn=word.definition,
+            example_ja=word.example or "",  # 日语例句
+            example_cn=word.example_cn or "",  # 中文例句翻译
+            tag1=f"#{level}"  # JLPT等级
+        )
 
     def _get_background_url(self, word: WordEntry, backgrounds: List[Path]) -> str:
         """
@@ -1,44 +1,32 @@
 # -*- coding: utf-8 -*-
 """无线电法规处理器"""
 
-from typing import List
+from typing import Dict
 from ...core.base_handler import BaseLanguageHandler, WordEntry
 
 
 class RadioLanguageHandler(BaseLanguageHandler):
     """无线电法规处理器"""
 
-    def load_words(self) -> List[WordEntry]:
-        """加载无线电法规题库"""
-        raw_data = self.loader.load_json()
-
-        words = []
-        for item in raw_data:
-            word_entry = WordEntry(
-                word=item.get("question_id", ""),
-                phonetic="",
-                pos="法规",
-                definition=item.get("answer", ""),
-                example=item.get("question", ""),
-                extra_fields={"tags": item.get("tags", "")}
-            )
-
-            if word_entry.example and word_entry.definition:
-                words.append(word_entry)
-
-        self.words = words
-        return words
-
-    def render_card(self, word: WordEntry, **kwargs) -> str:
-        """渲染无线电法规卡片"""
-        template_vars = {
-            "question_id": word.word,
-            "question": word.example,
-            "answer": word.definition,
-            "tags": word.extra_fields.get("tags", ""),
-            "bg_url": kwargs.get("bg_url", ""),
-            "theme_color": kwargs.get("theme_color", "#0f3460"),
-            "bg_position": kwargs.get("bg_position", "50% 50%"),
+    template_name = "card_radio.html"
+    required_fields = ("question", "answer")
+    word_field = "question_id"
+    default_theme_color = "#0f3460"
+
+    def build_entry(self, item: Dict[str, str]) -> WordEntry:
+        """转换无线电法规题目"""
+        return WordEntry(
+            word=item.get("question_id", ""),
+            phonetic="",
+            pos="法规",
+            definition=item.get("answer", ""),
+            example=item.get("question", ""),
+            tags=item.get("tags", "")
+        )
+
+    def build_static_context(self) -> Dict[str, str]:
+        """无线电法规卡片的字体、样式和标签"""
+        return {
             "font_question": self.config.fonts.get("question", "sans-serif"),
             "font_answer": self.config.fonts.get("answer", "sans-serif"),
             "question_size": self.config.styles.get("question_size", "16px"),
@@ -47,4 +35,13 @@ class RadioLanguageHandler(BaseLanguageHandler):
             "tag2": "#法规",
             "brand": "无线电法规"
         }
-        return self.renderer.render("card_radio.html", template_vars)
+
+    def card_variables(self, word: WordEntry, **kwargs) -> Dict[str, str]:
+        """无线电法规卡片的模板变量"""
+        return self.card_context(
+            kwargs,
+            question_id=word.word,
+            question=word.example,
+            answer=word.definition,
+            tags=word.tags or ""
+        )
@@ -13,17 +13,33 @@ import astrbot.api.message_components as Comp
 
 import asyncio
 import datetime
-import json
 import os
 import random
+import re
+import time
 import traceback
 import urllib.parse
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Sequence, Set, Tuple
 
 # 导入新架构模块
 from .core.language_manager import LanguageManager
 from .core.base_handler import WordEntry
+from .core.card_renderer import configure_shared_renderers, invalidate_templates
+from .core.deck_runtime import Cohort, DeckRuntime
+from .core.subscriptions import SlotPlan, Subscription, SubscriptionStore, plan_slots
+from .core.progress_store import create_progress_store, default_progress
+from .core.delivery import DeliveryEngine
+from .core.outbox import Outbox
+from .core.deck_export import EXPORT_FORMATS, DeckExporter, ExportProgress
+from .core.scheduler import (
+    DailyScheduler, JobStateStore, generate_occurrence, is_valid_timezone, parse_time, resolve_timezone
+)
+from .core.image_renderer import get_image_renderer, local_asset_url
+from .core.font_assets import FontAssetManager
+from .core.image_cache import ImageCache
+from .core.image_encoder import ImageEncoder
+from .core.background_assets import BackgroundAssetManager, detect_backdrop_blur
 from .languages.english.handler import EnglishLanguageHandler
 from .languages.japanese.handler import JapaneseLanguageHandler
 from .languages.idiom.handler import IdiomLanguageHandler
@@ -87,10 +103,19 @@ CDN_BACKGROUNDS = [
 ]
 
 
-def get_beijing_time() -> datetime.datetime:
-    """获取北京时间（东八区）- 兼容 Docker 容器 UTC 时间"""
-    beijing_tz = datetime.timezone(datetime.timedelta(hours=8))
-    return datetime.datetime.now(beijing_tz)
+# 卡片截图的设备缩放倍数（4 = 4K 清晰度）
+CARD_SCALE = 4
+
+# 定时生成卡片时等待背景图下载的上限（秒）
+BG_PREFETCH_TIMEOUT = 180
+
+# 按会话订阅时，生成时间比推送时间提前的分钟数
+GENERATE_LEAD_MINUTES = 30
+
+# 命令等待词库加载完成的上限（秒），超过后提示用户稍后再试
+DECK_READY_WAIT = 3
+
+DECK_LOADING_MESSAGE = "⏳ 词库加载中，请稍后再试"
 
 
 @register("vocabcard", "Assistant", "每日多语种单词卡片推送插件 - 支持英语/日语", "2.0.0")
@@ -102,6 +127,12 @@ class VocabCardPlugin(Star):
         self.data_dir = self.plugin_dir / "data"
         self.backgrounds_dir = self.plugin_dir / "photos"  # 离线背景图目录
 
+        # 所有卡组共用一个模板引擎，编译后的模板缓存在磁盘上，重启后无需重新编译
+        configure_shared_renderers(
+            bytecode_cache_dir=self.data_dir / "template_cache",
+            auto_reload=self.config.get("template_auto_reload", False)
+        )
+
         # 初始化语种管理器
         self.lang_manager = LanguageManager(self.plugin_dir)
 
@@ -129,21 +160,90 @@ class VocabCardPlugin(Star):
             self.current_language = "english"
             self.current_handler = self.lang_manager.get_handler("english")
 
-        # 加载词汇数据和进度
-        self.words: List[WordEntry] = self._load_words()
-        self.progress: Dict = self._load_progress()
+        # 学习进度存储（默认 SQLite，首次加载卡组时自动迁移 JSON 进度文件）
+        self.progress_store = create_progress_store(
+            self.config.get("progress_backend", "sqlite"), self.data_dir
+        )
+
+        # 已加载的卡组和进度组，由当前卡组与各订阅共用
+        self._decks: Dict[str, DeckRuntime] = {}
+        self._deck_loads: Dict[str, asyncio.Future] = {}
+        self._cohorts: Dict[str, Cohort] = {}
+
+        # 会话订阅（未单独订阅的已注册会话沿用全局卡组和推送时间）
+        self.subscriptions = SubscriptionStore(self.data_dir / "subscriptions.json")
+
+        # 后台辅助任务（字体子集等），保留引用直到完成，插件卸载时取消
+        self._background_tasks: Set[asyncio.Task] = set()
+
+        # 当前卡组（交互命令使用），在后台线程中加载，不阻塞事件循环
+        self.deck: Optional[DeckRuntime] = None
+        self.cohort: Optional[Cohort] = None
+        self._deck_ready = asyncio.Event()
+        self._deck_generation = 0
+        self._deck_task: Optional[asyncio.Task] = self._start_deck_load()
         self.offline_backgrounds: List[Path] = self._load_offline_backgrounds()
 
-        # 定时任务相关
-        self._scheduler_task: Optional[asyncio.Task] = asyncio.create_task(self._schedule_loop())
+        # 各推送时段已生成待推送的卡片: 时段标识 -> (图片路径, 单词, 生成日期)，随调度状态持久化
+        self._slot_cards: Dict[str, Tuple[str, str, str]] = {}
+
+        # 卡片图片缓存（图片由缓存统一管理生命周期，发送后不再删除）
+        self.image_cache = ImageCache(
+            self.data_dir / "card_cache",
+            max_bytes=self.config.get("image_cache_max_mb", 200) * 1024 * 1024,
+            max_age=self.config.get("image_cache_max_age_days", 30) * 86400
+        )
+
+        # 截图后的输出编码（格式、质量、大小上限）
+        self.image_encoder = ImageEncoder(
+            self.config.get("output_format", "png"),
+            quality=self.config.get("output_quality", 85),
+            max_bytes=self.config.get("output_max_kb", 0) * 1024
+        )
+
+        self._template_blur: Dict[Path, Optional[float]] = {}
+
+        # 并发推送引擎（按平台限速）
+        self.delivery = DeliveryEngine(
+            concurrency=self.config.get("push_concurrency", 8),
+            rate_per_platform=self.config.get("push_rate_per_platform", 5)
+        )
+
+        # 持久化发件箱（失败的推送按指数退避重试，重启后继续）
+        self.outbox = Outbox(
+            self.data_dir / "outbox",
+            max_attempts=self.config.get("push_max_attempts", 8),
+            max_age=self.config.get("push_retry_hours", 12) * 3600
+        )
+        self._outbox_lock = asyncio.Lock()
+        self._outbox_changed = asyncio.Event()
+
+        # 定时任务：按各推送时段的时区触发，任务完成记录保存在 data/schedule.db，重启后补执行错过的任务
+        self.scheduler = DailyScheduler(
+            JobStateStore(self.data_dir / "schedule.db"),
+            self._run_scheduled_job,
+            catch_up=self.config.get("catch_up_hours", 6) * 3600
+        )
+        self._slot_cards = self.scheduler.state.load_cards()
+        self.scheduler.update(self._plan_slots())
+        self._scheduler_task: Optional[asyncio.Task] = asyncio.create_task(self.scheduler.run())
+        self._retry_task: Optional[asyncio.Task] = asyncio.create_task(self._retry_loop())
+
+        # 预生成未来几天的卡片（pregenerate_days 为 0 时只清理预留）
+        self._pregenerate_wakeup = asyncio.Event()
+        self._pregenerate_task: Optional[asyncio.Task] = asyncio.create_task(self._pregenerate_loop())
+
+        # 卡组导出（同一时间只运行一个）
+        self._export_task: Optional[asyncio.Task] = None
+        self._export_deck = ""
+        self._export_progress: Optional[ExportProgress] = None
         logger.info("单词卡片定时任务已启动")
-        self._cached_image_path: Optional[str] = None
-        self._current_word: Optional[WordEntry] = None
-        self._today_generated: bool = False
-        self._last_check_date: str = ""
 
-        # 进度文件保存锁（防止并发写入冲突）
-        self._progress_lock = asyncio.Lock()
+        # 背景图本地缓存（CDN 与 AI 背景下载一次后改用本地地址）
+        self.bg_assets = BackgroundAssetManager(
+            self.data_dir / "backgrounds",
+            max_bytes=self.config.get("bg_cache_max_mb", 500) * 1024 * 1024
+        )
 
     def _load_offline_backgrounds(self) -> List[Path]:
         """加载离线背景图列表"""
@@ -158,12 +258,12 @@ class VocabCardPlugin(Star):
         logger.info(f"已加载 {len(backgrounds)} 张离线背景图")
         return backgrounds
 
-    def _get_background_url(self, word: WordEntry) -> str:
+    def _get_background_url(self, word: WordEntry, rng: random.Random) -> str:
         """获取背景图 URL（优先 CDN，其次 AI 生成，最后本地图片）"""
         # 优先使用 CDN 图片（阿里云 OSS）
         use_cdn = self.config.get("use_cdn_background", True)
         if use_cdn and CDN_BACKGROUNDS:
-            return random.choice(CDN_BACKGROUNDS)
+            return rng.choice(CDN_BACKGROUNDS)
 
         # 回退到 AI 生成（如果启用）
         use_ai = self.config.get("enable_ai_background", False)
@@ -174,65 +274,231 @@ class VocabCardPlugin(Star):
             return f"https://image.pollinations.ai/prompt/{bg_prompt}?width=1920&height=2400&nologo=true&model=flux&enhance=true"
 
         # 最后回退到本地图片
-        return self._get_offline_background_url()
+        return self._get_offline_background_url(rng)
 
-    def _get_offline_background_url(self) -> str:
+    def _get_offline_background_url(self, rng: random.Random) -> str:
         """获取一张离线背景图的 file:// URL"""
         if not self.offline_backgrounds:
             # 没有离线图，返回纯色背景的 data URL
             return "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='1080' height='1350'%3E%3Crect fill='%231a1a2e' width='100%25' height='100%25'/%3E%3C/svg%3E"
 
-        bg_path = random.choice(self.offline_backgrounds)
-        # 返回 file:// URL
-        return f"file:///{bg_path.as_posix()}"
+        bg_path = rng.choice(self.offline_backgrounds)
+        # 返回虚拟源 URL（内存投递的页面无法直接加载 file:// 资源）
+        return local_asset_url(bg_path)
+
+    def _get_renderer(self):
+        """获取全局图片渲染器，并按插件配置设置页面池和投递方式"""
+        renderer = get_image_renderer(
+            self.config.get("render_pool_size", 2),
+            self.config.get("render_delivery", "memory")
+        )
+        renderer.allow_asset_dir(self.backgrounds_dir)
+        renderer.allow_asset_dir(self.bg_assets.cache_dir)
+        if renderer.fonts is None and self.config.get("local_fonts", True):
+            renderer.fonts = FontAssetManager(
+                self.plugin_dir / "fonts",
+                self.data_dir / "fonts",
+                offline=self.config.get("font_offline", False)
+            )
+        return renderer
+
+    async def _build_font_subset(self, deck: DeckRuntime):
+        """按卡组用到的字符生成字体子集（在线程中执行）"""
+        renderer = self._get_renderer()
+        if renderer.fonts is None or not self.config.get("font_subset", False) or not deck.words:
+            return
+
+        lang_id = deck.lang_id
+        # 品牌名、标签等由处理器填入，取一张样例卡片的 HTML 一并纳入字符集
+        sample = self._render_template(deck.words[0], deck)
+
+        def subset() -> int:
+            # 遍历词条会逐条解码编译词库，放在工作线程中，不阻塞事件循环
+            texts = [str(value) for word in deck.words for value in word.to_dict().values() if value]
+            texts.append(sample)
+            return renderer.fonts.subset_for_scope(lang_id, texts)
+
+        try:
+            built = await asyncio.to_thread(subset)
+            logger.info(f"卡组 {lang_id} 字体子集已就绪 (新生成 {built} 个)")
+        except Exception as e:
+            logger.warning(f"生成字体子集失败，将使用完整字体: {e}")
+
+    def _spawn_background(self, coro, description: str) -> asyncio.Task:
+        """
+        启动后台辅助任务
+
+        保留任务引用避免运行中被回收，失败时记录日志，插件卸载时统一取消
+
+        Args:
+            coro: 任务协程
+            description: 任务说明（用于日志）
+
+        Returns:
+            后台任务
+        """
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+
+        def done(task: asyncio.Task):
+            self._background_tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"后台任务失败 [{description}]: {task.exception()}")
+
+        task.add_done_callback(done)
+        return task
+
+    @property
+    def words(self) -> Sequence[WordEntry]:
+        """当前卡组的词条"""
+        return self.deck.words if self.deck else []
+
+    @property
+    def progress(self) -> Dict:
+        """当前卡组的学习进度"""
+        return self.cohort.progress if self.cohort else default_progress()
+
+    def _start_deck_load(self) -> asyncio.Task:
+        """
+        开始在后台加载当前卡组
+
+        立即清除就绪标记，此后的命令会等待新卡组而不是使用旧卡组的数据。
+        加载过程中再次切换卡组时，旧的加载结果会被丢弃。
+
+        Returns:
+            加载任务
+        """
+        self._deck_generation += 1
+        self._deck_ready.clear()
+        return asyncio.create_task(self._load_deck(self._deck_generation, self.current_language))
+
+    async def _load_deck(self, generation: int, lang_id: str):
+        """
+        加载当前卡组的词汇和进度
+
+        Args:
+            generation: 加载序号，与最新序号不一致时丢弃结果
+            lang_id: 卡组 ID
+        """
+        started = asyncio.get_running_loop().time()
+        deck = await self._get_deck(lang_id)
+        cohort = await self._get_cohort(deck, lang_id)
+
+        if generation != self._deck_generation:
+            return
+
+        self.deck = deck
+        self.cohort = cohort
+        self._deck_ready.set()
+        elapsed = asyncio.get_running_loop().time() - started
+        logger.info(f"卡组 {lang_id} 已就绪，共 {len(deck.words)} 个单词 ({elapsed * 1000:.0f} ms)")
+
+    async def _get_deck(self, lang_id: str) -> DeckRuntime:
+        """
+        获取已加载的卡组，未加载时在工作线程中加载（同一卡组并发请求只加载一次）
+
+        Args:
+            lang_id: 卡组 ID
+
+        Returns:
+            卡组运行时
+        """
+        deck = self._decks.get(lang_id)
+        if deck is not None:
+            return deck
+
+        pending = self._deck_loads.get(lang_id)
+        if pending is None:
+            pending = asyncio.ensure_future(self._build_deck(lang_id))
+            self._deck_loads[lang_id] = pending
+            pending.add_done_callback(lambda _: self._deck_loads.pop(lang_id, None))
+        return await asyncio.shield(pending)
+
+    async def _build_deck(self, lang_id: str) -> DeckRuntime:
+        """在工作线程中加载卡组词库并建立单词索引"""
+        handler = self.lang_manager.get_handler(lang_id)
+
+        def load() -> DeckRuntime:
+            words = self._load_words(lang_id, handler)
+            return DeckRuntime(lang_id, handler, words, handler.word_keys(words))
+
+        started = asyncio.get_running_loop().time()
+        deck = await asyncio.to_thread(load)
+        elapsed = asyncio.get_running_loop().time() - started
+        logger.info(f"卡组 {lang_id} 已加载 {len(deck.words)} 个单词 ({elapsed * 1000:.0f} ms)")
+
+        # 加载失败（空词库）时不缓存，下次使用时重试
+        if deck.words:
+            self._decks[lang_id] = deck
+            self._spawn_background(self._build_font_subset(deck), f"字体子集 {lang_id}")
+        return deck
+
+    async def _get_cohort(self, deck: DeckRuntime, key: str) -> Cohort:
+        """
+        获取进度组，未加载时在工作线程中读取进度并建立选词索引
+
+        Args:
+            deck: 进度组对应的卡组
+            key: 进度键
 
-    def _load_words(self) -> List[WordEntry]:
-        """加载词汇数据"""
+        Returns:
+            进度组
+        """
+        cohort = self._cohorts.get(key)
+        if cohort is not None:
+            return cohort
+
+        progress = await asyncio.to_thread(self._load_progress, key)
+        cohort = await asyncio.to_thread(deck.new_cohort, key, progress)
+        if not deck.words:
+            return cohort
+        # 并发加载时以先完成的为准
+        return self._cohorts.setdefault(key, cohort)
+
+    async def _wait_deck_ready(self, timeout: Optional[float] = DECK_READY_WAIT) -> bool:
+        """
+        等待当前卡组加载完成
+
+        Args:
+            timeout: 等待上限（秒），None 表示一直等待
+
+        Returns:
+            是否已加载完成
+        """
+        if self._deck_ready.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self._deck_ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _load_words(self, lang_id: str, handler) -> Sequence[WordEntry]:
+        """加载词汇数据（在工作线程中执行）"""
         try:
             # 日语卡组支持等级筛选
-            if self.current_language == "japanese":
+            if lang_id == "japanese":
                 level_filter = self.config.get("japanese_level", "all")
-                return self.current_handler.load_words(level_filter=level_filter)
-            return self.current_handler.load_words()
+                return handler.load_words(level_filter=level_filter)
+            return handler.load_words()
         except Exception as e:
             logger.error(f"加载词汇数据失败: {e}")
             return []
 
-    def _load_progress(self) -> Dict:
-        """加载学习进度（语种特定，支持旧数据迁移）"""
-        progress_file = self.data_dir / f"progress_{self.current_language}.json"
-
-        # 如果语种特定的进度文件不存在，尝试从旧文件迁移
-        if not progress_file.exists():
-            old_progress_file = self.data_dir / "progress.json"
-            if old_progress_file.exists() and self.current_language == "english":
-                # 将旧的进度文件重命名为英语进度文件（因为旧版本只支持英语）
-                try:
-                    import shutil
-                    shutil.copy2(old_progress_file, progress_file)
-                    logger.info(f"已将旧进度文件迁移到: {progress_file}")
-                except Exception as e:
-                    logger.warning(f"迁移旧进度文件失败: {e}")
-
-        # 加载进度文件
-        if progress_file.exists():
-            try:
-                with open(progress_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"加载进度数据失败: {e}")
-
-        return {"sent_words": [], "last_push_date": ""}
+    def _load_progress(self, key: str) -> Dict:
+        """加载学习进度（按进度键，支持旧数据迁移，在工作线程中执行）"""
+        try:
+            return self.progress_store.load(key)
+        except Exception as e:
+            logger.error(f"加载进度数据失败: {e}")
+            return default_progress()
 
-    async def _save_progress(self):
-        """保存学习进度（语种特定）- 使用锁防止并发写入"""
-        async with self._progress_lock:
-            progress_file = self.data_dir / f"progress_{self.current_language}.json"
-            try:
-                with open(progress_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.progress, f, ensure_ascii=False, indent=2)
-            except Exception as e:
-                logger.error(f"保存进度数据失败: {e}")
+    async def _save_progress(self, action, key: str, *args):
+        """在工作线程中执行一次进度写入"""
+        try:
+            await asyncio.to_thread(action, key, *args)
+        except Exception as e:
+            logger.error(f"保存进度数据失败: {e}")
 
     async def initialize(self):
         """异步初始化"""
@@ -246,148 +512,278 @@ class VocabCardPlugin(Star):
             logger.debug(f"确保目录存在: {directory}")
             directory.mkdir(parents=True, exist_ok=True)
 
-        # 确保进度文件存在
-        progress_file = self.data_dir / f"progress_{self.current_language}.json"
-        if not progress_file.exists():
-            default_progress = {"sent_words": [], "last_push_date": ""}
-            async with self._progress_lock:
-                try:
-                    with open(progress_file, 'w', encoding='utf-8') as f:
-                        json.dump(default_progress, f, ensure_ascii=False, indent=2)
-                    logger.info(f"已创建进度文件: {progress_file}")
-                except Exception as e:
-                    logger.error(f"创建进度文件失败: {e}")
+        # 预热浏览器页面池，避免首张卡片冷启动 Chromium
+        renderer = self._get_renderer()
+        try:
+            await renderer.start()
+        except Exception as e:
+            logger.warning(f"浏览器页面池预热失败，将在首次渲染时重试: {e}")
 
-        logger.info(f"单词卡片插件初始化完成 [语种: {self.current_language}]，已加载 {len(self.words)} 个单词")
+        # 后台预取 CDN 背景图
+        if self.config.get("use_cdn_background", True) and CDN_BACKGROUNDS:
+            self._spawn_background(self.bg_assets.prefetch(CDN_BACKGROUNDS), "预取背景图")
 
-    async def _schedule_loop(self):
-        """定时任务主循环 - 智能睡眠，精准触发"""
+        logger.info(f"单词卡片插件初始化完成 [语种: {self.current_language}]，词库在后台加载")
+
+    async def _run_scheduled_job(self, kind: str, slots: List[SlotPlan], occurrences: Dict[str, str]):
+        """
+        执行到期的定时任务（由调度器调用）
+
+        Args:
+            kind: generate（生成卡片）或 send（推送卡片）
+            slots: 到期的推送时段
+            occurrences: 时段标识 -> 任务所属的本地日期
+        """
+        if kind == "generate":
+            logger.info(f"开始生成每日单词卡片（{len(slots)} 个推送时段）...")
+            await self._generate_daily_cards(slots, occurrences)
+            # 用掉了一天的预留，补齐预生成窗口
+            self._pregenerate_wakeup.set()
+            return
+
+        # 本次推送应使用的卡片所属的生成日期（预留按生成日期记录）
+        generate_dates = {slot.key: generate_occurrence(slot, occurrences[slot.key]) for slot in slots}
+        # 生成任务失败（或被跳过）时推送前按生成日期补生成；已生成的卡片随调度状态持久化，重启后仍可推送
+        missing = [
+            slot for slot in slots
+            if slot.key not in self._slot_cards or self._slot_cards[slot.key][2] != generate_dates[slot.key]
+        ]
+        if missing:
+            logger.info(f"{len(missing)} 个推送时段没有已生成的卡片，推送前补生成")
+            await self._generate_daily_cards(missing, generate_dates)
+        logger.info(f"开始推送每日单词卡片（{len(slots)} 个推送时段）...")
+        await self._push_daily_cards(slots)
+
+    async def _retry_loop(self):
+        """发件箱重试循环：睡到最近一次待重试的时间，有新投递登记时提前醒来"""
         while True:
             try:
-                now = get_beijing_time()
-                today_str = now.strftime("%Y-%m-%d")
-
-                # 解析配置的时间
-                gen_time = self._parse_time(self.config.get("push_time_generate", "07:30"))
-                push_time = self._parse_time(self.config.get("push_time_send", "08:00"))
-
-                # 每天0点重置标记
-                if self._last_check_date != today_str:
-                    self._today_generated = False
-                    self._last_check_date = today_str
-
-                # 计算下一个目标时间
-                next_target = self._calculate_next_target_time(now, gen_time, push_time)
-
-                if next_target:
-                    sleep_seconds = (next_target - now).total_seconds()
-
-                    # 如果距离目标时间超过 60 秒，先睡到提前 30 秒
-                    if sleep_seconds > 60:
-                        sleep_until = sleep_seconds - 30
-                        logger.debug(f"距离下次任务还有 {sleep_seconds:.0f} 秒，先睡眠 {sleep_until:.0f} 秒")
-                        await asyncio.sleep(sleep_until)
-                        continue
-
-                    # 距离目标时间很近了，精确等待
-                    if sleep_seconds > 0:
-                        logger.debug(f"即将执行任务，精确等待 {sleep_seconds:.1f} 秒")
-                        await asyncio.sleep(sleep_seconds)
-
-                # 重新获取当前时间（睡眠后）
-                now = get_beijing_time()
-
-                # 执行生成任务
-                if now.hour == gen_time[0] and now.minute == gen_time[1]:
-                    if not self._today_generated:
-                        logger.info("开始生成每日单词卡片...")
-                        await self._generate_daily_card()
-                        self._today_generated = True
-
-                # 执行推送任务
-                if now.hour == push_time[0] and now.minute == push_time[1]:
-                    if self._cached_image_path and os.path.exists(self._cached_image_path):
-                        logger.info("开始推送每日单词卡片...")
-                        await self._push_daily_card()
-
-                # 执行完任务后等待 10 秒，避免重复触发
-                await asyncio.sleep(10)
+                self._outbox_changed.clear()
+                await self._drain_outbox()
+                retry_at = await asyncio.to_thread(self.outbox.next_attempt_at)
+                timeout = None if retry_at is None else max(1, retry_at - time.time())
+                try:
+                    await asyncio.wait_for(self._outbox_changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except Exception as e:
+                logger.error(f"推送重试出错: {e}")
+                await asyncio.sleep(60)
 
+    def _reschedule(self):
+        """订阅或全局配置变化后重新安排定时任务"""
+        self.scheduler.update(self._plan_slots())
+        self._pregenerate_wakeup.set()
+
+    async def _pregenerate_loop(self):
+        """预生成循环：启动时和推送时段变化、每日生成任务完成后，补齐未来几天的卡片"""
+        await self.scheduler.ready.wait()
+        while True:
+            self._pregenerate_wakeup.clear()
+            try:
+                await self._pregenerate(self._plan_slots())
             except Exception as e:
-                logger.error(f"定时任务出错: {e}")
-                await asyncio.sleep(60)  # 出错后等待 60 秒重试
+                logger.error(f"预生成卡片出错: {e}")
+            await self._pregenerate_wakeup.wait()
 
-    def _parse_time(self, time_str: str) -> tuple:
-        """解析时间字符串 HH:MM"""
-        try:
-            parts = time_str.split(':')
-            return (int(parts[0]), int(parts[1]))
-        except (ValueError, IndexError) as e:
-            logger.warning(f"时间格式解析失败 '{time_str}': {e}，使用默认值 08:00")
-            return (8, 0)  # 默认 8:00
-
-    def _calculate_next_target_time(self, now: datetime.datetime, gen_time: tuple, push_time: tuple) -> Optional[datetime.datetime]:
-        """计算下一个目标时间点（生成时间或推送时间中最近的一个）"""
-        today = now.date()
-        # 获取时区信息（与 now 保持一致）
-        tz = now.tzinfo
-
-        # 构建今天的生成时间和推送时间（带时区）
-        gen_datetime = datetime.datetime.combine(today, datetime.time(gen_time[0], gen_time[1]), tzinfo=tz)
-        push_datetime = datetime.datetime.combine(today, datetime.time(push_time[0], push_time[1]), tzinfo=tz)
-
-        # 找出所有未来的目标时间
-        targets = []
-
-        # 如果还没生成过，且生成时间未到
-        if not self._today_generated and gen_datetime > now:
-            targets.append(gen_datetime)
-
-        # 如果推送时间未到
-        if push_datetime > now:
-            targets.append(push_datetime)
-
-        # 如果今天的任务都完成了，计算明天的第一个任务（生成时间）
-        if not targets:
-            tomorrow = today + datetime.timedelta(days=1)
-            next_gen = datetime.datetime.combine(tomorrow, datetime.time(gen_time[0], gen_time[1]), tzinfo=tz)
-            targets.append(next_gen)
-
-        # 返回最近的目标时间
-        return min(targets) if targets else None
-
-    async def _select_word(self) -> Optional[WordEntry]:
-        """选择一个未推送过的单词"""
-        if not self.words:
+    async def _pregenerate(self, slots: List[SlotPlan]):
+        """
+        为各推送时段预先选词并渲染未来 pregenerate_days 天的卡片
+
+        选中的单词作为预留记录到学习进度（不会被其他时段或 /vocab 选中），
+        卡片图片存入图片缓存；到生成时间时直接取用预留的单词，渲染命中缓存，推送时只剩发送。
+        过期未使用（以及已不存在的时段）的预留会被取消，单词放回未推送集合。
+        """
+        horizon = self.config.get("pregenerate_days", 2)
+        planned: Dict[str, Dict[str, SlotPlan]] = {}
+        for slot in slots:
+            planned.setdefault(slot.progress_key, {})[slot.key] = slot
+
+        # 已不在推送计划中的进度组，取消全部预留
+        for progress_key, cohort in list(self._cohorts.items()):
+            if progress_key in planned:
+                continue
+            for slot_key, dates in list(cohort.progress["reserved"].items()):
+                for date in list(dates):
+                    cohort.release(slot_key, date, unmark=True)
+                    await self._save_progress(self.progress_store.release, progress_key, slot_key, date)
+
+        for progress_key, cohort_slots in planned.items():
+            deck = await self._get_deck(next(iter(cohort_slots.values())).deck)
+            if not deck.words:
+                continue
+            cohort = await self._get_cohort(deck, progress_key)
+
+            # 需要保留的 (时段, 日期)
+            wanted: Dict[str, List[str]] = {}
+            for slot in cohort_slots.values():
+                first = self.scheduler.next_occurrence(slot, "generate")
+                if first is None:
+                    continue
+                start = datetime.date.fromisoformat(first)
+                wanted[slot.key] = [(start + datetime.timedelta(days=i)).isoformat() for i in range(horizon)]
+
+            for slot_key, dates in list(cohort.progress["reserved"].items()):
+                for date in list(dates):
+                    if date not in wanted.get(slot_key, ()):
+                        cohort.release(slot_key, date, unmark=True)
+                        await self._save_progress(self.progress_store.release, progress_key, slot_key, date)
+
+            # 按日期先后为各时段预留，每天的卡片合并为一次批量渲染，保证最近的卡片先就绪
+            for offset in range(horizon):
+                words: List[WordEntry] = []
+                exhausted = False
+                for slot_key, dates in wanted.items():
+                    date = dates[offset]
+                    word = self._reserved_word(deck, cohort, slot_key, date)
+                    if word is None:
+                        word = await self._select_word(deck, cohort)
+                        if word is None:
+                            exhausted = True
+                            break
+                        cohort.reserve(slot_key, date, word.word)
+                        await self._save_progress(self.progress_store.reserve, progress_key, slot_key, date, word.word)
+                    words.append(word)
+                try:
+                    rendered = await self._render_card_batch(words, deck)
+                except Exception as e:
+                    logger.warning(f"预生成卡片失败 [{progress_key} +{offset}天]: {e}")
+                    rendered = 0
+                if rendered:
+                    logger.debug(f"已预生成 {rendered} 张卡片 [{progress_key} +{offset}天]")
+                if exhausted:
+                    # 可选单词已全部被预留，之后的日期不再逐个选词，留到生成时再选
+                    logger.debug(f"进度组 {progress_key} 没有可预留的单词，停止预生成")
+                    break
+
+    async def _render_card_batch(self, words: List[WordEntry], deck: DeckRuntime) -> int:
+        """
+        批量渲染同一卡组的多张卡片并写入图片缓存（已缓存的跳过）
+
+        卡片排在同一个浏览器页面上一次排版、逐张截图，缓存键与 _generate_card_image 一致，
+        之后生成这些卡片时直接命中缓存
+
+        Returns:
+            本次渲染的卡片数
+        """
+        await asyncio.gather(
+            *(self._prefetch_background(word, deck, BG_PREFETCH_TIMEOUT) for word in words),
+            return_exceptions=True
+        )
+
+        width, height = deck.handler.config.card_size
+        encoder = self.image_encoder
+        pending: Dict[str, str] = {}
+        for word in words:
+            html_content = self._render_template(word, deck)
+            cache_key = self.image_cache.make_key(html_content, width, height, CARD_SCALE, **encoder.cache_params())
+            if self.image_cache.get(cache_key, encoder.suffix) is None:
+                pending[cache_key] = html_content
+        if not pending:
+            return 0
+
+        images = await self._get_renderer().render_batch(
+            list(pending.values()),
+            width=width,
+            height=height,
+            scale=CARD_SCALE,
+            ready_timeout=self.config.get("bg_load_timeout", 5000),
+            font_scope=deck.lang_id
+        )
+        for cache_key, data in zip(pending, images):
+            data = await encoder.encode_async(data)
+            await asyncio.to_thread(self.image_cache.put, cache_key, data, encoder.suffix)
+        return len(images)
+
+    def _reserved_word(self, deck: DeckRuntime, cohort: Cohort, slot_key: str, date: str) -> Optional[WordEntry]:
+        """查找时段某一天预留的单词（卡组中已没有该单词时返回 None）"""
+        word_text = cohort.reservation(slot_key, date)
+        if word_text is None:
             return None
+        positions = cohort.selector.positions(word_text)
+        return deck.words[positions[0]] if positions else None
+
+    def _subscriptions(self) -> List[Subscription]:
+        """已注册会话的有效订阅（未单独订阅的沿用全局卡组和推送时间）"""
+        generate_time = self.config.get("push_time_generate", "07:30")
+        send_time = self.config.get("push_time_send", "08:00")
+        timezone = self.config.get("timezone", "Asia/Shanghai")
+        subscriptions = []
+        for umo in self.config.get("target_groups", []):
+            subscription = self.subscriptions.get(umo)
+            if subscription is None:
+                subscription = Subscription(umo, self.current_language, send_time, generate_time, timezone=timezone)
+            subscriptions.append(subscription)
+        return subscriptions
+
+    def _timezone(self) -> datetime.tzinfo:
+        """配置的默认时区（未单独订阅的会话使用）"""
+        return resolve_timezone(self.config.get("timezone", "Asia/Shanghai"))
+
+    def _plan_slots(self) -> List[SlotPlan]:
+        """按 (进度键, 时区, 生成时间, 推送时间) 将已注册会话分组为推送时段"""
+        return plan_slots(self._subscriptions())
+
+    async def _select_word(
+        self,
+        deck: Optional[DeckRuntime] = None,
+        cohort: Optional[Cohort] = None
+    ) -> Optional[WordEntry]:
+        """
+        选择一个未推送过的单词
 
-        sent_words = set(self.progress.get("sent_words", []))
-        available = [w for w in self.words if w.word not in sent_words]
+        Args:
+            deck: 卡组，默认为当前卡组
+            cohort: 进度组，默认为当前卡组的进度
+        """
+        deck = deck or self.deck
+        cohort = cohort or self.cohort
+        if deck is None or cohort is None or not deck.words:
+            return None
 
         # 如果全部推送完毕
-        if not available:
+        if cohort.selector.remaining == 0:
             if self.config.get("reset_on_complete", True):
                 # 重置进度
-                self.progress["sent_words"] = []
-                await self._save_progress()
-                available = self.words
-                logger.info("所有单词已推送完毕，已重置进度")
+                cohort.progress["sent_words"] = []
+                cohort.selector.reset()
+                # 预留给未来日期的单词仍不可选
+                for reserved in cohort.reserved_words():
+                    cohort.selector.mark(reserved)
+                await self._save_progress(self.progress_store.reset, cohort.key)
+                logger.info(f"[{cohort.key}] 所有单词已推送完毕，已重置进度")
             else:
-                logger.warning("所有单词已推送完毕，且未开启自动重置")
-                return self.words[0] if self.words else None
+                logger.warning(f"[{cohort.key}] 所有单词已推送完毕，且未开启自动重置")
+                return deck.words[0]
 
         # 选择模式
         mode = self.config.get("learning_mode", "random")
-        if mode == "sequential":
-            return available[0]
-        return random.choice(available)
+        position = cohort.selector.pick(sequential=(mode == "sequential"))
+        # 卡组中的单词全部被预留时没有可选的单词
+        return deck.words[position] if position is not None else None
+
+    async def _mark_word_sent(
+        self,
+        word: str,
+        cohort: Optional[Cohort] = None,
+        claimed: bool = False,
+        date: Optional[str] = None
+    ):
+        """
+        标记单词已推送
 
-    async def _mark_word_sent(self, word: str):
-        """标记单词已推送"""
-        if word not in self.progress["sent_words"]:
-            self.progress["sent_words"].append(word)
-        self.progress["last_push_date"] = get_beijing_time().strftime("%Y-%m-%d")
-        await self._save_progress()
+        Args:
+            word: 单词文本
+            cohort: 进度组，默认为当前卡组的进度
+            claimed: 单词是否已在选词索引中标记（预留或生成前占用）
+            date: 推送日期（时段时区的本地日期），默认为配置时区的今天
+        """
+        cohort = cohort or self.cohort
+        today = date or datetime.datetime.now(self._timezone()).date().isoformat()
+        if cohort.selector.mark(word) or claimed:
+            cohort.progress.setdefault("sent_words", []).append(word)
+        cohort.progress["last_push_date"] = today
+        await self._save_progress(self.progress_store.mark_sent, cohort.key, word, today)
 
     def _generate_bg_prompt(self, word: WordEntry) -> str:
         """根据单词生成背景图提示词"""
@@ -409,114 +805,269 @@ class VocabCardPlugin(Star):
         prompt = f"{word_text} concept, {theme}, high quality, 4k, no text, cinematic lighting"
         return urllib.parse.quote(prompt)
 
-    def _render_template(self, word: WordEntry) -> str:
-        """渲染 HTML 模板（使用 Handler）"""
-        # 获取背景图 URL
-        bg_url = self._get_background_url(word)
+    def _background_blur(self, deck: DeckRuntime) -> Optional[float]:
+        """卡组模板玻璃效果的模糊半径（关闭派生图时返回 None）"""
+        if not self.config.get("bg_derivatives", True):
+            return None
+        template_path = deck.handler.get_template_path()
+        if template_path not in self._template_blur:
+            self._template_blur[template_path] = detect_backdrop_blur(template_path)
+        return self._template_blur[template_path]
+
+    async def _prefetch_background(self, word: WordEntry, deck: DeckRuntime, timeout: Optional[float]):
+        """提前把卡片要用的背景图下载到本地缓存，并生成按卡片尺寸缩小的派生图"""
+        bg_url = self._get_background_url(word, deck.handler.card_rng(word))
+        if not self.config.get("bg_derivatives", True):
+            await self.bg_assets.ensure(bg_url, timeout=timeout)
+            return
+        await self.bg_assets.prepare(
+            bg_url,
+            deck.handler.config.card_size,
+            CARD_SCALE,
+            blur=self._background_blur(deck),
+            timeout=timeout
+        )
 
-        # 从当前语种配置中选择主题色
-        theme_colors = self.current_handler.config.theme_colors
-        theme_color = random.choice(theme_colors) if theme_colors else random.choice(THEME_COLORS)
+    def _render_template(self, word: WordEntry, deck: Optional[DeckRuntime] = None) -> str:
+        """渲染 HTML 模板（使用卡组的 Handler，默认为当前卡组）"""
+        deck = deck or self.deck
+        handler = deck.handler
+        rng = deck.handler.card_rng(word)
+
+        # 获取背景图 URL（已缓存到本地时改写为本地地址，有派生图时使用派生图）
+        bg_url = self._get_background_url(word, rng)
+        if self.config.get("bg_derivatives", True):
+            bg_url, bg_blur_url = self.bg_assets.resolve(
+                bg_url,
+                handler.config.card_size,
+                CARD_SCALE,
+                blur=self._background_blur(deck)
+            )
+        else:
+            bg_url, bg_blur_url = self.bg_assets.localize(bg_url), ""
+
+        # 从卡组配置中选择主题色
+        theme_colors = handler.config.theme_colors
+        theme_color = rng.choice(theme_colors) if theme_colors else rng.choice(THEME_COLORS)
 
         # 随机背景图位置
-        bg_x = random.randint(0, 100)
-        bg_y = random.randint(0, 100)
+        bg_x = rng.randint(0, 100)
+        bg_y = rng.randint(0, 100)
         bg_position = f"{bg_x}% {bg_y}%"
 
         # 使用 Handler 渲染卡片
-        return self.current_handler.render_card(
+        return handler.render_card(
             word,
             bg_url=bg_url,
+            bg_blur_url=bg_blur_url,
             theme_color=theme_color,
             bg_position=bg_position
         )
 
-    async def _generate_card_image(self, word: WordEntry) -> str:
-        """生成单词卡片图片"""
-        from .core.image_renderer import get_image_renderer
+    async def _generate_card_image(
+        self,
+        word: WordEntry,
+        deck: Optional[DeckRuntime] = None,
+        bg_timeout: Optional[float] = None
+    ) -> str:
+        """
+        生成单词卡片图片
 
-        # 渲染 HTML
-        html_content = self._render_template(word)
+        Args:
+            word: 单词数据
+            deck: 卡组，默认为当前卡组
+            bg_timeout: 等待背景图下载到本地的上限（秒），默认取 bg_load_timeout
+        """
+        deck = deck or self.deck
 
-        # 输出文件路径
-        output_png = self.plugin_dir / f"card_{word.word}.png"
+        # 先把背景图下载到本地，超时则由浏览器直接加载远程地址
+        if bg_timeout is None:
+            bg_timeout = self.config.get("bg_load_timeout", 5000) / 1000
+        await self._prefetch_background(word, deck, bg_timeout)
 
-        try:
-            # 使用 Playwright 渲染
-            renderer = get_image_renderer()
-            await renderer.render_to_file(
-                html_content=html_content,
-                output_path=str(output_png),
-                width=432,
-                height=540,
-                scale=4  # 4K 清晰度
+        # 渲染 HTML
+        html_content = self._render_template(word, deck)
+        width, height = deck.handler.config.card_size
+        scale = CARD_SCALE
+        encoder = self.image_encoder
+
+        async def render(output_path: Path):
+            # 使用 Playwright 渲染（页面池中已加载该卡组样式的页面只替换卡片内容）
+            renderer = self._get_renderer()
+            data, = await renderer.render_batch(
+                [html_content],
+                width=width,
+                height=height,
+                scale=scale,
+                ready_timeout=self.config.get("bg_load_timeout", 5000),
+                font_scope=deck.lang_id
             )
-            
-            logger.info(f"卡片图片已生成: {output_png}")
-            return str(output_png)
-            
+            # 截图后在工作线程中按配置重新编码
+            await encoder.write(data, output_path)
+
+        try:
+            # 相同 HTML 和渲染参数的卡片直接复用缓存中的图片（多个时段抽到同一单词时只渲染一次）
+            cache_key = self.image_cache.make_key(html_content, width, height, scale, **encoder.cache_params())
+            output_image = await self.image_cache.get_or_render(cache_key, render, encoder.suffix)
+
+            logger.info(f"卡片图片已就绪: {word.word} -> {output_image.name}")
+            return str(output_image)
+
         except Exception as e:
             logger.error(f"生成卡片图片失败: {e}")
             raise
 
-    async def _generate_daily_card(self):
-        """生成每日单词卡片"""
-        word = await self._select_word()
-        if not word:
-            logger.warning("没有可用的单词")
-            return
+    async def _generate_slot_card(self, slot: SlotPlan, date: Optional[str] = None) -> bool:
+        """
+        为一个推送时段选词并生成卡片
 
+        Args:
+            slot: 推送时段
+            date: 生成日期（用于取用预生成的预留单词），默认为时段时区的今天
+        """
+        word = None
+        claimed = False
         try:
-            image_path = await self._generate_card_image(word)
-            self._cached_image_path = image_path
-            self._current_word = word
-            await self._mark_word_sent(word.word)
-            logger.info(f"已生成每日单词卡片: {word.word}")
+            deck = await self._get_deck(slot.deck)
+            cohort = await self._get_cohort(deck, slot.progress_key)
+            if date is None:
+                date = datetime.datetime.now(resolve_timezone(slot.timezone)).date().isoformat()
+
+            # 优先使用预生成时预留的单词（图片已在缓存中）
+            word = self._reserved_word(deck, cohort, slot.key, date)
+            reserved = word is not None
+            if not reserved:
+                word = await self._select_word(deck, cohort)
+                if word:
+                    # 渲染期间先占用该单词，避免被预生成选中
+                    claimed = cohort.selector.mark(word.word)
+            if not word:
+                logger.warning(f"[{slot.progress_key}] 没有可用的单词")
+                return False
+
+            # 生成时间与推送时间之间有充足余量，完整等待背景图（含 AI 生成图）下载到本地
+            image_path = await self._generate_card_image(word, deck, bg_timeout=BG_PREFETCH_TIMEOUT)
+            self._slot_cards[slot.key] = (image_path, word.word, date)
+            await asyncio.to_thread(self.scheduler.state.save_card, slot.key, image_path, word.word, date)
+            await self._mark_word_sent(word.word, cohort, claimed=reserved or claimed, date=date)
+            claimed = False
+            if reserved:
+                cohort.release(slot.key, date)
+                await self._save_progress(self.progress_store.release, cohort.key, slot.key, date)
+            logger.info(f"已生成每日单词卡片 [{slot.progress_key} {slot.send_time}]: {word.word}")
+            return True
         except Exception as e:
-            logger.error(f"生成每日卡片失败: {e}")
+            logger.error(f"生成每日卡片失败 [{slot.key}]: {e}")
+            if claimed:
+                cohort.selector.unmark(word.word)
+            return False
+
+    async def _regenerate_slot_image(self, slot: SlotPlan, word_text: str) -> str:
+        """按时段已选定的单词重新渲染卡片图片"""
+        deck = await self._get_deck(slot.deck)
+        cohort = await self._get_cohort(deck, slot.progress_key)
+        positions = cohort.selector.positions(word_text)
+        if not positions:
+            raise ValueError(f"卡组中已没有单词 {word_text}")
+        return await self._generate_card_image(deck.words[positions[0]], deck, bg_timeout=BG_PREFETCH_TIMEOUT)
+
+    async def _generate_daily_cards(self, slots: List[SlotPlan], dates: Optional[Dict[str, str]] = None) -> int:
+        """
+        为多个推送时段生成每日卡片
 
-    async def _push_daily_card(self):
-        """推送卡片到已注册的群聊"""
-        if not self._cached_image_path or not os.path.exists(self._cached_image_path):
-            logger.warning("没有已生成的卡片可推送")
-            return
+        共享同一进度的时段依次选词（避免抽到同一个词），不同进度组之间并发渲染
 
-        target_groups = self.config.get("target_groups", [])
-        if not target_groups:
-            logger.warning("没有已注册的推送目标")
-            return
+        Args:
+            slots: 推送时段
+            dates: 时段标识 -> 生成日期，默认为各时段时区的今天
 
-        success_count = 0
-        word_text = self._current_word.word if self._current_word else "单词"
+        Returns:
+            成功生成的卡片数
+        """
+        dates = dates or {}
+        cohorts: Dict[str, List[SlotPlan]] = {}
+        for slot in slots:
+            cohorts.setdefault(slot.progress_key, []).append(slot)
 
-        for umo in target_groups:
-            try:
-                # 构建消息链
+        async def generate_cohort(cohort_slots: List[SlotPlan]) -> int:
+            generated = 0
+            for slot in cohort_slots:
+                generated += await self._generate_slot_card(slot, dates.get(slot.key))
+            return generated
+
+        results = await asyncio.gather(*(generate_cohort(group) for group in cohorts.values()))
+        return sum(results)
+
+    async def _push_daily_cards(self, slots: List[SlotPlan]) -> int:
+        """
+        推送已生成的卡片到各时段的会话
+
+        Returns:
+            登记推送的会话数
+        """
+        queued = 0
+        for slot in slots:
+            card = self._slot_cards.pop(slot.key, None)
+            if card is None:
+                logger.warning(f"[{slot.key}] 没有已生成的卡片可推送")
+                continue
+            await asyncio.to_thread(self.scheduler.state.remove_card, slot.key)
+            image_path, word_text, _ = card
+            if not os.path.exists(image_path):
+                # 图片已被缓存淘汰（如重启前生成的卡片），按已选的单词重新渲染
+                try:
+                    image_path = await self._regenerate_slot_image(slot, word_text)
+                except Exception as e:
+                    logger.warning(f"[{slot.key}] 重新生成卡片图片失败: {e}")
+                    continue
+
+            # 先登记到发件箱（图片随之保留），失败的目标由定时任务按退避重试
+            image_path = Path(image_path)
+            queued += await asyncio.to_thread(
+                self.outbox.enqueue, image_path.stem, f"📚 每日单词: {word_text}", image_path, slot.targets
+            )
+
+        if queued:
+            await self._drain_outbox()
+            # 失败的投递由重试循环按新的重试时间接手
+            self._outbox_changed.set()
+        return queued
+
+    async def _drain_outbox(self):
+        """发送发件箱中所有到期的投递，并记录结果"""
+        async with self._outbox_lock:
+            cards = await asyncio.to_thread(self.outbox.due)
+            for card in cards:
+                # 消息链只构建一次，所有目标共用
                 chain = MessageChain()
-                chain.message(f"📚 每日单词: {word_text}")
-                chain.file_image(self._cached_image_path)
+                chain.message(card.caption)
+                chain.file_image(str(card.image_path))
 
-                await self.context.send_message(umo, chain)
-                success_count += 1
-                logger.info(f"已推送到: {umo}")
-            except Exception as e:
-                logger.error(f"推送到 {umo} 失败: {e}")
+                report = await self.delivery.deliver(
+                    card.targets,
+                    lambda umo: self.context.send_message(umo, chain)
+                )
+                counts = await asyncio.to_thread(self.outbox.record, card.card_id, report.results)
 
-        logger.info(f"每日单词推送完成: {success_count}/{len(target_groups)}")
+                slowest = max((r.latency for r in report.results), default=0)
+                logger.info(
+                    f"推送完成 [{card.caption}]: 成功 {counts['delivered']}/{len(card.targets)}，"
+                    f"待重试 {counts['retrying']}，放弃 {counts['expired']}，"
+                    f"耗时 {report.elapsed:.1f}s，最慢目标 {slowest * 1000:.0f} ms"
+                )
 
-        # 清理缓存的图片
-        try:
-            if os.path.exists(self._cached_image_path):
-                os.remove(self._cached_image_path)
-        except OSError as e:
-            logger.warning(f"清理缓存图片失败: {e}")
-        self._cached_image_path = None
+            if cards:
+                await asyncio.to_thread(self.outbox.cleanup)
 
     # ========== 用户命令 ==========
 
     @filter.command("vocab")
     async def cmd_vocab(self, event: AstrMessageEvent):
         """手动获取一个单词卡片"""
+        if not await self._wait_deck_ready():
+            yield event.plain_result(DECK_LOADING_MESSAGE)
+            return
+
         word = await self._select_word()
         if not word:
             yield event.plain_result("没有可用的单词数据")
@@ -526,12 +1077,6 @@ class VocabCardPlugin(Star):
         try:
             image_path = await self._generate_card_image(word)
             yield event.image_result(image_path)
-
-            # 清理图片
-            try:
-                os.remove(image_path)
-            except OSError as e:
-                logger.warning(f"清理临时图片失败: {e}")
         except Exception as e:
             logger.error(f"生成卡片失败: {e}")
             yield event.plain_result(f"❌ 生成卡片失败: {e}")
@@ -539,6 +1084,10 @@ class VocabCardPlugin(Star):
     @filter.command("vocab_status")
     async def cmd_status(self, event: AstrMessageEvent):
         """查看学习进度"""
+        if not await self._wait_deck_ready():
+            yield event.plain_result(DECK_LOADING_MESSAGE)
+            return
+
         total = len(self.words)
         sent = len(self.progress.get("sent_words", []))
         percent = sent * 100 // total if total > 0 else 0
@@ -553,22 +1102,74 @@ class VocabCardPlugin(Star):
 ━━━━━━━━━━━━━━━━"""
         yield event.plain_result(msg)
 
+    def _generate_time_for(self, send_time: str) -> str:
+        """订阅的生成时间：与全局推送时间相同时沿用全局生成时间，否则提前 GENERATE_LEAD_MINUTES 分钟"""
+        if send_time == self.config.get("push_time_send", "08:00"):
+            return self.config.get("push_time_generate", "07:30")
+        hour, minute = parse_time(send_time)
+        total = (hour * 60 + minute - GENERATE_LEAD_MINUTES) % (24 * 60)
+        return f"{total // 60:02d}:{total % 60:02d}"
+
     @filter.command("vocab_register")
-    async def cmd_register(self, event: AstrMessageEvent):
-        """在当前会话注册接收每日单词推送"""
+    async def cmd_register(
+        self,
+        event: AstrMessageEvent,
+        deck: str = "",
+        send_time: str = "",
+        mode: str = "",
+        timezone: str = ""
+    ):
+        """
+        在当前会话注册接收每日单词推送
+
+        用法:
+        - /vocab_register                     # 使用全局卡组和推送时间
+        - /vocab_register japanese_n3 21:00   # 订阅指定卡组，每天 21:00 推送
+        - /vocab_register idiom 12:00 独立     # 独立进度，不与其他会话共享
+        - /vocab_register english 08:00 共享 Europe/Berlin  # 按指定时区的 08:00 推送
+        """
         umo = event.unified_msg_origin
         target_groups = self.config.get("target_groups", [])
 
-        if umo in target_groups:
+        if deck:
+            if not self.lang_manager.is_registered(deck):
+                yield event.plain_result(f"❌ 卡组 '{deck}' 不存在\n请使用 /vocab_lang 查看可用卡组")
+                return
+            if send_time and not re.fullmatch(r"([01]?\d|2[0-3]):[0-5]\d", send_time):
+                yield event.plain_result(f"❌ 时间格式错误: {send_time}，应为 HH:MM")
+                return
+            if timezone and not is_valid_timezone(timezone):
+                yield event.plain_result(f"❌ 未知时区: {timezone}，应为 IANA 时区名（如 Asia/Tokyo）")
+                return
+
+            send_time = send_time or self.config.get("push_time_send", "08:00")
+            subscription = Subscription(
+                umo, deck, send_time, self._generate_time_for(send_time),
+                own_progress=mode in ("独立", "own"),
+                timezone=timezone or self.config.get("timezone", "Asia/Shanghai")
+            )
+            await asyncio.to_thread(self.subscriptions.set, subscription)
+        elif umo in target_groups:
             yield event.plain_result("当前会话已注册过了 ✅")
             return
+        else:
+            subscription = None
 
-        target_groups.append(umo)
-        self.config["target_groups"] = target_groups
-        self.config.save_config()
+        if umo not in target_groups:
+            target_groups.append(umo)
+            self.config["target_groups"] = target_groups
+            self.config.save_config()
+        self._reschedule()
 
-        push_time = self.config.get("push_time_send", "08:00")
-        yield event.plain_result(f"注册成功！🎉\n将在每天 {push_time} 推送单词卡片")
+        if subscription is None:
+            push_time = self.config.get("push_time_send", "08:00")
+            yield event.plain_result(f"注册成功！🎉\n将在每天 {push_time} 推送单词卡片")
+        else:
+            progress = "独立进度" if subscription.own_progress else "与同卡组会话共享进度"
+            yield event.plain_result(
+                f"订阅成功！🎉\n📚 卡组: {deck}（{progress}）\n"
+                f"⏰ 每天 {subscription.send_time} ({subscription.timezone}) 推送单词卡片"
+            )
 
     @filter.command("vocab_unregister")
     async def cmd_unregister(self, event: AstrMessageEvent):
@@ -583,9 +1184,32 @@ class VocabCardPlugin(Star):
         target_groups.remove(umo)
         self.config["target_groups"] = target_groups
         self.config.save_config()
+        await asyncio.to_thread(self.subscriptions.remove, umo)
+        self._reschedule()
 
         yield event.plain_result("已取消注册 👋")
 
+    @filter.command("vocab_subs")
+    async def cmd_subscriptions(self, event: AstrMessageEvent):
+        """查看推送时段（每个时段每天只生成一张卡片，发给时段内的全部会话）"""
+        slots = self._plan_slots()
+        if not slots:
+            yield event.plain_result("没有已注册的推送目标，请先使用 /vocab_register 注册")
+            return
+
+        umo = event.unified_msg_origin
+        msg = "🗓️ 推送时段\n━━━━━━━━━━━━━━━━"
+        for slot in sorted(slots, key=lambda s: (s.send_time, s.progress_key)):
+            marker = "👉" if umo in slot.targets else "  "
+            progress = "独立进度" if slot.progress_key != slot.deck else "共享进度"
+            msg += f"\n{marker} {slot.send_time} ({slot.timezone}) {slot.deck}（{progress}）: {len(slot.targets)} 个会话"
+            next_run = self.scheduler.next_run(slot.key, "send")
+            if next_run is not None:
+                next_time = datetime.datetime.fromtimestamp(next_run, resolve_timezone(slot.timezone))
+                msg += f"\n   下次推送: {next_time.strftime('%m-%d %H:%M')}"
+        msg += "\n━━━━━━━━━━━━━━━━"
+        yield event.plain_result(msg)
+
     @filter.command("vocab_test")
     async def cmd_test_push(self, event: AstrMessageEvent, delay_seconds: str = "0"):
         """
@@ -598,6 +1222,10 @@ class VocabCardPlugin(Star):
         # 参数解析
         delay = int(delay_seconds) if delay_seconds.isdigit() else 0
 
+        if not await self._wait_deck_ready():
+            yield event.plain_result(DECK_LOADING_MESSAGE)
+            return
+
         # 快速测试模式（delay=0）
         if delay == 0:
             try:
@@ -613,12 +1241,6 @@ class VocabCardPlugin(Star):
                 yield event.plain_result(f"📚 测试单词: {word.word}")
                 yield event.image_result(image_path)
 
-                # 清理
-                try:
-                    os.remove(image_path)
-                except OSError as e:
-                    logger.warning(f"清理临时图片失败: {e}")
-
             except Exception as e:
                 logger.error(f"测试推送失败: {e}")
                 yield event.plain_result(f"❌ 测试失败: {e}")
@@ -640,7 +1262,7 @@ class VocabCardPlugin(Star):
                     yield event.plain_result("ℹ️ 当前会话已注册")
 
                 # 等待
-                now = get_beijing_time()
+                now = datetime.datetime.now(self._timezone())
                 target_time = now + datetime.timedelta(seconds=delay)
                 yield event.plain_result(f"⏰ 将在 {delay} 秒后执行推送")
                 yield event.plain_result(f"📅 目标时间: {target_time.strftime('%H:%M:%S')}")
@@ -650,13 +1272,14 @@ class VocabCardPlugin(Star):
 
                 # 步骤 1: 生成
                 yield event.plain_result("🎨 步骤 1/2: 生成单词卡片...")
+                slots = self._plan_slots()
                 try:
-                    await self._generate_daily_card()
-                    if self._cached_image_path:
-                        word_text = self._current_word.word if self._current_word else '?'
-                        yield event.plain_result(f"✅ 卡片生成成功: {word_text}")
+                    generated = await self._generate_daily_cards(slots)
+                    if generated:
+                        words = "、".join(self._slot_cards[slot.key][1] for slot in slots if slot.key in self._slot_cards)
+                        yield event.plain_result(f"✅ 卡片生成成功 ({generated}/{len(slots)}): {words}")
                     else:
-                        yield event.plain_result("❌ 卡片生成失败：缓存路径为空")
+                        yield event.plain_result("❌ 卡片生成失败")
                         return
                 except Exception as e:
                     error_detail = traceback.format_exc()
@@ -670,7 +1293,7 @@ class VocabCardPlugin(Star):
                     targets = self.config.get("target_groups", [])
                     yield event.plain_result(f"📋 推送目标: {len(targets)} 个会话")
 
-                    await self._push_daily_card()
+                    await self._push_daily_cards(slots)
                     yield event.plain_result("✅ 推送完成")
                 except Exception as e:
                     error_detail = traceback.format_exc()
@@ -691,14 +1314,16 @@ class VocabCardPlugin(Star):
         用法: /vocab_preview [单词]
         不带参数则随机选一个单词
         """
+        if not await self._wait_deck_ready():
+            yield event.plain_result(DECK_LOADING_MESSAGE)
+            return
+
         # 查找单词
         if word_input:
-            # 搜索指定单词
-            word = None
-            for w in self.words:
-                if w.word.lower() == word_input.lower():
-                    word = w
-                    break
+            # 在单词文本索引中查找（不解码词条），只构造命中的词条
+            target = word_input.lower()
+            position = next((i for i, key in enumerate(self.deck.keys) if key.lower() == target), None)
+            word = self.words[position] if position is not None else None
             if not word:
                 yield event.plain_result(f"未找到单词: {word_input}")
                 return
@@ -727,12 +1352,6 @@ class VocabCardPlugin(Star):
             yield event.plain_result("✅ 图片生成成功！")
             yield event.image_result(image_path)
 
-            # 清理
-            try:
-                os.remove(image_path)
-            except OSError as e:
-                logger.warning(f"清理临时图片失败: {e}")
-
         except Exception as e:
             import traceback
             error_detail = traceback.format_exc()
@@ -742,6 +1361,10 @@ class VocabCardPlugin(Star):
     @filter.command("vocab_now")
     async def cmd_push_now(self, event: AstrMessageEvent):
         """立即执行一次完整的生成+推送流程（模拟定时任务）"""
+        if not await self._wait_deck_ready():
+            yield event.plain_result(DECK_LOADING_MESSAGE)
+            return
+
         yield event.plain_result("🚀 开始执行完整推送流程...")
 
         # 检查是否有注册的群
@@ -755,17 +1378,19 @@ class VocabCardPlugin(Star):
         try:
             # 1. 生成卡片
             yield event.plain_result("⏳ 步骤1: 生成单词卡片...")
-            await self._generate_daily_card()
+            slots = self._plan_slots()
+            generated = await self._generate_daily_cards(slots)
 
-            if not self._cached_image_path:
+            if not generated:
                 yield event.plain_result("❌ 卡片生成失败")
                 return
 
-            yield event.plain_result(f"✅ 卡片已生成: {self._current_word.word if self._current_word else '?'}")
+            words = "、".join(self._slot_cards[slot.key][1] for slot in slots if slot.key in self._slot_cards)
+            yield event.plain_result(f"✅ 卡片已生成 ({generated}/{len(slots)}): {words}")
 
             # 2. 推送
             yield event.plain_result("⏳ 步骤2: 推送到所有已注册群聊...")
-            await self._push_daily_card()
+            await self._push_daily_cards(slots)
 
             yield event.plain_result("✅ 推送完成！")
 
@@ -815,20 +1440,153 @@ class VocabCardPlugin(Star):
             self.current_language = lang_id
             self.current_handler = new_handler
 
-            # 重新加载词汇数据和进度
-            self.words = self._load_words()
-            self.progress = self._load_progress()
+            # 在后台重新加载词汇数据和进度
+            self._deck_task = self._start_deck_load()
 
             # 保存配置
             self.config["current_language"] = lang_id
             self.config.save_config()
+            # 未单独订阅的会话跟随当前语种
+            self._reschedule()
 
-            yield event.plain_result(f"✅ 已切换到语种: {lang_id}\n📚 已加载 {len(self.words)} 个单词")
+            if await self._wait_deck_ready():
+                yield event.plain_result(f"✅ 已切换到语种: {lang_id}\n📚 已加载 {len(self.words)} 个单词")
+            else:
+                yield event.plain_result(f"✅ 已切换到语种: {lang_id}\n⏳ 词库正在后台加载，完成后即可使用")
 
         except Exception as e:
             logger.error(f"切换语种失败: {e}")
             yield event.plain_result(f"❌ 切换失败: {e}")
 
+    @filter.command("vocab_export")
+    async def cmd_export(self, event: AstrMessageEvent, lang_id: str = "", fmt: str = "png"):
+        """
+        导出整个卡组为图片或 PDF（后台执行，可中断续导）
+        用法: /vocab_export <卡组> [png|webp|jpeg|pdf]
+        不带参数则查看导出进度
+        """
+        running = self._export_task is not None and not self._export_task.done()
+        if not lang_id:
+            if self._export_progress is None:
+                yield event.plain_result("当前没有导出任务\n用法: /vocab_export <卡组> [png|webp|jpeg|pdf]")
+                return
+            state = "导出中" if running else "已结束"
+            yield event.plain_result(f"📦 {self._export_deck} {state}: {self._export_progress.summary()}")
+            return
+
+        if running:
+            yield event.plain_result(f"⚠️ 正在导出 {self._export_deck}，请等待完成后再试")
+            return
+        if not self.lang_manager.is_registered(lang_id):
+            yield event.plain_result(f"❌ 卡组 '{lang_id}' 不存在\n请使用 /vocab_lang 查看可用卡组")
+            return
+        if fmt not in EXPORT_FORMATS:
+            yield event.plain_result(f"❌ 不支持的格式: {fmt}（可选: {', '.join(EXPORT_FORMATS)}）")
+            return
+
+        deck = await self._get_deck(lang_id)
+        if not deck.words:
+            yield event.plain_result(f"❌ 卡组 '{lang_id}' 没有可用的单词")
+            return
+
+        output_dir = self.data_dir / "exports" / f"{lang_id}_{fmt}"
+        bg_timeout = self.config.get("bg_load_timeout", 5000) / 1000
+        try:
+            exporter = DeckExporter(
+                self._get_renderer(),
+                lang_id,
+                deck.words,
+                lambda word: self._render_template(word, deck),
+                output_dir,
+                deck.handler.config.card_size,
+                scale=self.config.get("export_scale", 2),
+                fmt=fmt,
+                ready_timeout=self.config.get("bg_load_timeout", 5000),
+                prepare=lambda word: self._prefetch_background(word, deck, bg_timeout)
+            )
+        except ValueError as e:
+            yield event.plain_result(f"❌ {e}")
+            return
+
+        self._export_deck = lang_id
+        self._export_progress = ExportProgress(total=len(deck.words))
+        self._export_task = asyncio.create_task(self._run_export(exporter, event.unified_msg_origin))
+        yield event.plain_result(
+            f"📦 开始导出 {lang_id}（{len(deck.words)} 张，{fmt}）\n"
+            f"📁 {output_dir}\n使用 /vocab_export 查看进度"
+        )
+
+    async def _run_export(self, exporter: DeckExporter, umo: str):
+        """在后台执行导出，结束后通知发起导出的会话"""
+        def on_progress(progress: ExportProgress):
+            self._export_progress = progress
+            logger.info(f"导出 {exporter.lang_id}: {progress.summary()}")
+
+        try:
+            progress = await exporter.run(on_progress=on_progress)
+            msg = f"✅ {exporter.lang_id} 导出完成: {progress.summary()}\n📁 {exporter.output_dir}"
+            if progress.failed:
+                msg += "\n部分卡片失败，重新执行相同命令可继续导出"
+        except Exception as e:
+            logger.error(f"导出卡组失败: {traceback.format_exc()}")
+            msg = f"❌ {exporter.lang_id} 导出失败: {e}\n重新执行相同命令可从断点继续"
+
+        try:
+            chain = MessageChain()
+            chain.message(msg)
+            await self.context.send_message(umo, chain)
+        except Exception as e:
+            logger.warning(f"发送导出结果失败: {e}")
+
+    @filter.command("vocab_outbox")
+    async def cmd_outbox(self, event: AstrMessageEvent):
+        """查看推送发件箱（待重试和已放弃的推送）"""
+        stats = await asyncio.to_thread(self.outbox.stats)
+
+        msg = f"""📮 推送发件箱
+━━━━━━━━━━━━━━━━
+⏳ 待发送: {stats['pending']} 条
+❌ 已放弃: {stats['expired']} 条
+🔁 累计失败: {stats['failures']} 次
+━━━━━━━━━━━━━━━━"""
+        tz = self._timezone()
+        for entry in stats["entries"][:10]:
+            if entry["status"] == "pending":
+                next_time = datetime.datetime.fromtimestamp(entry["next_attempt_at"], tz).strftime("%H:%M:%S")
+                state = f"第 {entry['attempts'] + 1} 次发送 {next_time}"
+            else:
+                state = f"已放弃（{entry['attempts']} 次）"
+            msg += f"\n{entry['card']} → {entry['target']}\n  {state}"
+            if entry["last_error"]:
+                msg += f"\n  错误: {entry['last_error'][:60]}"
+        if len(stats["entries"]) > 10:
+            msg += f"\n... 共 {len(stats['entries'])} 条"
+        yield event.plain_result(msg)
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("vocab_reload")
+    async def cmd_reload(self, event: AstrMessageEvent):
+        """
+        重新加载卡组配置和卡片模板（管理员）
+        修改 config.json 中的样式配置或模板文件后使用，无需重启插件
+        """
+        failed = []
+        for lang in self.lang_manager.list_languages():
+            try:
+                # 已实例化的处理器随即重新计算静态模板变量
+                self.lang_manager.reload_config(lang['id'])
+            except (OSError, ValueError) as e:
+                logger.warning(f"重新加载卡组配置失败 [{lang['id']}]: {e}")
+                failed.append(lang['id'])
+
+        invalidate_templates()
+        self._template_blur.clear()
+
+        msg = "✅ 卡组配置和卡片模板已重新加载，之后生成的卡片使用新样式"
+        if failed:
+            msg += f"\n⚠️ 以下卡组配置读取失败，沿用原配置: {', '.join(failed)}"
+        yield event.plain_result(msg)
+
     @filter.command("vocab_help")
     async def cmd_help(self, event: AstrMessageEvent):
         """显示帮助信息"""
@@ -838,10 +1596,14 @@ class VocabCardPlugin(Star):
 /vocab_preview [单词] - 预览卡片效果
 /vocab_now - 立即执行推送流程
 /vocab_status - 查看学习进度
-/vocab_register - 注册每日推送
+/vocab_register [卡组] [HH:MM] [独立] - 注册每日推送
 /vocab_unregister - 取消每日推送
 /vocab_test - 测试推送功能
 /vocab_lang [语种ID] - 切换语种
+/vocab_subs - 查看推送时段
+/vocab_export <卡组> [格式] - 导出整个卡组
+/vocab_outbox - 查看推送重试队列
+/vocab_reload - 重新加载卡组配置和模板（管理员）
 /vocab_help - 显示此帮助
 ━━━━━━━━━━━━━━━━━━━━
 💡 注册后每天 8:00 自动推送"""
@@ -849,10 +1611,32 @@ class VocabCardPlugin(Star):
 
     async def terminate(self):
         """插件卸载时取消定时任务"""
-        if self._scheduler_task:
-            self._scheduler_task.cancel()
-            try:
-                await self._scheduler_task
-            except asyncio.CancelledError:
-                pass
+        if self._deck_task and not self._deck_task.done():
+            self._deck_task.cancel()
+
+        background = list(self._background_tasks)
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+
+        for task in (self._scheduler_task, self._retry_task, self._pregenerate_task, self._export_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                except Exception as e:
+                    # 任务此前已异常退出，记录后继续释放其余资源
+                    logger.warning(f"后台任务异常退出: {e}")
+
+        # 关闭常驻浏览器
+        try:
+            await get_image_renderer().close()
+        except Exception as e:
+            logger.warning(f"关闭浏览器页面池失败: {e}")
+
+        self.progress_store.close()
+        self.outbox.close()
+        self.scheduler.state.close()
         logger.info("单词卡片插件已卸载")
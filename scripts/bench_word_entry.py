@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WordEntry 内存占用对比
+
+将整个卡组物化为词条列表，分别统计旧版表示（普通 dataclass + 每个词条一个 extra_fields 字典，
+分类字段不驻留）与当前表示（__slots__ + 带类型的扩展字段 + 驻留分类字段）的每词条字节数。
+
+用法:
+    python scripts/bench_word_entry.py
+    python scripts/bench_word_entry.py --deck english
+"""
+
+import argparse
+import gc
+import importlib
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+project_dir = Path(__file__).parent.parent
+# 处理器使用包内相对导入，需以插件目录名作为包名导入
+sys.path.insert(0, str(project_dir.parent))
+package = project_dir.name
+
+# 卡组 -> (处理器模块, 处理器类)
+HANDLERS = {
+    "english": ("english", "EnglishLanguageHandler"),
+    "japanese": ("japanese", "JapaneseLanguageHandler"),
+    "idiom": ("idiom", "IdiomLanguageHandler"),
+    "classical": ("classical", "ClassicalLanguageHandler"),
+    "radio": ("radio", "RadioLanguageHandler"),
+}
+
+
+@dataclass
+class LegacyWordEntry:
+    """旧版词条表示（对照组）"""
+
+    word: str
+    phonetic: Optional[str] = None
+    pos: Optional[str] = None
+    definition: str = ""
+    example: Optional[str] = None
+    extra_fields: Dict[str, Any] = field(default_factory=dict)
+
+
+def load_handler(lang_id: str):
+    """加载卡组处理器"""
+    LanguageManager = importlib.import_module(f"{package}.core.language_manager").LanguageManager
+    manager = LanguageManager(project_dir)
+    module_name, class_name = HANDLERS[lang_id]
+    module = importlib.import_module(f"{package}.languages.{module_name}.handler")
+    manager.register_language(lang_id, getattr(module, class_name))
+    return manager.get_handler(lang_id)
+
+
+def measure(build):
+    """物化词条列表，返回 (列表, 保留的字节数, 耗时)"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    entries = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return entries, retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WordEntry 内存占用对比")
+    parser.add_argument("--deck", default="japanese", choices=sorted(HANDLERS), help="卡组 ID")
+    args = parser.parse_args()
+
+    base_handler = importlib.import_module(f"{package}.core.base_handler")
+    handler = load_handler(args.deck)
+    words = handler.load_words()
+    count = len(words)
+    print(f"卡组 {args.deck}: {count} 个词条")
+
+    def build_legacy():
+        # 关闭驻留，按旧版结构重建：分类字段各自一份，每个词条一个字典
+        intern = base_handler._intern
+        base_handler._intern = lambda value: value
+        try:
+            return [
+                LegacyWordEntry(
+                    entry.word, entry.phonetic, entry.pos, entry.definition, entry.example,
+                    entry.extra_fields
+                )
+                for entry in words
+            ]
+        finally:
+            base_handler._intern = intern
+
+    def build_compact():
+        return list(words)
+
+    results = []
+    for name, build in (("旧版 dataclass", build_legacy), ("__slots__ + 驻留", build_compact)):
+        entries, retained, elapsed = measure(build)
+        results.append(retained)
+        print(
+            f"  {name:<16} {retained / count:8.1f} 字节/词条  "
+            f"合计 {retained / 1024 / 1024:6.2f} MB  实例 {sys.getsizeof(entries[0])} 字节  "
+            f"物化 {elapsed * 1000:.0f} ms"
+        )
+        del entries
+
+    legacy, compact = results
+    if legacy:
+        print(f"  节省 {(legacy - compact) / count:.1f} 字节/词条 ({(legacy - compact) * 100 / legacy:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+下载卡片模板使用的本地字体到 fonts/ 目录
+
+渲染时插件会拦截 Google Fonts 请求并改用这些本地字体，
+适用于无法访问外网或希望避免网络字体加载延迟的部署。
+运行前请先安装: pip install requests
+"""
+
+import sys
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+NOTO_CJK = "https://github.com/notofonts/noto-cjk/raw/main"
+
+# 文件名 -> 下载地址（文件名需与 core/font_assets.py 中的 FONT_FILES 一致）
+FONT_SOURCES = {
+    "NotoSansSC-Regular.otf": f"{NOTO_CJK}/Sans/SubsetOTF/SC/NotoSansSC-Regular.otf",
+    "NotoSansSC-Medium.otf": f"{NOTO_CJK}/Sans/SubsetOTF/SC/NotoSansSC-Medium.otf",
+    "NotoSansSC-Bold.otf": f"{NOTO_CJK}/Sans/SubsetOTF/SC/NotoSansSC-Bold.otf",
+    "NotoSerifSC-Bold.otf": f"{NOTO_CJK}/Serif/SubsetOTF/SC/NotoSerifSC-Bold.otf",
+    "NotoSansJP-Regular.otf": f"{NOTO_CJK}/Sans/SubsetOTF/JP/NotoSansJP-Regular.otf",
+    "NotoSansJP-Medium.otf": f"{NOTO_CJK}/Sans/SubsetOTF/JP/NotoSansJP-Medium.otf",
+    "NotoSerifJP-Bold.otf": f"{NOTO_CJK}/Serif/SubsetOTF/JP/NotoSerifJP-Bold.otf",
+    "MaShanZheng-Regular.ttf": "https://github.com/google/fonts/raw/main/ofl/mashanzheng/MaShanZheng-Regular.ttf",
+}
+
+
+def main():
+    import requests
+    from core.font_assets import FONT_FILES
+
+    fonts_dir = project_dir / "fonts"
+    fonts_dir.mkdir(parents=True, exist_ok=True)
+
+    expected = {name for weights in FONT_FILES.values() for name in weights.values()}
+    missing_sources = expected - set(FONT_SOURCES)
+    if missing_sources:
+        print(f"警告: 以下字体没有下载地址: {', '.join(sorted(missing_sources))}")
+
+    print("=" * 50)
+    print("下载本地字体")
+    print(f"保存目录: {fonts_dir}")
+    print("=" * 50)
+
+    for filename, url in FONT_SOURCES.items():
+        target = fonts_dir / filename
+        if target.exists():
+            print(f"  已存在，跳过: {filename}")
+            continue
+
+        print(f"\n下载: {filename}")
+        try:
+            response = requests.get(url, timeout=120)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"  下载失败: {e}")
+            continue
+
+        target.write_bytes(response.content)
+        print(f"  完成: {len(response.content) // 1024} KB")
+
+    downloaded = [name for name in FONT_SOURCES if (fonts_dir / name).exists()]
+    print(f"\n完成！本地字体 {len(downloaded)}/{len(FONT_SOURCES)} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导出整个卡组为图片或 PDF（与插件 /vocab_export 命令使用同一导出流程）
+
+用法:
+    python scripts/export_deck.py idiom
+    python scripts/export_deck.py japanese_n3 --format pdf --pool 4
+    python scripts/export_deck.py english --format webp --out ~/cards --scale 4
+
+中断后使用相同参数重新运行即从断点继续。
+背景图取自 photos/ 目录（按单词固定选取），没有离线图时使用纯色背景。
+"""
+
+import argparse
+import asyncio
+import importlib
+import logging
+import sys
+import time
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+# 处理器使用包内相对导入，需以插件目录名作为包名导入
+sys.path.insert(0, str(project_dir.parent))
+package = project_dir.name
+
+# 卡组 -> (处理器模块, 处理器类)
+HANDLERS = {
+    "english": ("english", "EnglishLanguageHandler"),
+    "japanese": ("japanese", "JapaneseLanguageHandler"),
+    "japanese_n1": ("japanese", "JapaneseLanguageHandler"),
+    "japanese_n2": ("japanese", "JapaneseLanguageHandler"),
+    "japanese_n3": ("japanese", "JapaneseLanguageHandler"),
+    "japanese_n4": ("japanese", "JapaneseLanguageHandler"),
+    "japanese_n5": ("japanese", "JapaneseLanguageHandler"),
+    "idiom": ("idiom", "IdiomLanguageHandler"),
+    "classical": ("classical", "ClassicalLanguageHandler"),
+    "radio": ("radio", "RadioLanguageHandler"),
+}
+
+PLAIN_BACKGROUND = (
+    "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='1080' height='1350'%3E"
+    "%3Crect fill='%231a1a2e' width='100%25' height='100%25'/%3E%3C/svg%3E"
+)
+
+
+def load_handler(lang_id: str):
+    """加载卡组处理器"""
+    card_renderer = importlib.import_module(f"{package}.core.card_renderer")
+    card_renderer.configure_shared_renderers(bytecode_cache_dir=project_dir / "data" / "template_cache")
+    LanguageManager = importlib.import_module(f"{package}.core.language_manager").LanguageManager
+    manager = LanguageManager(project_dir)
+    module_name, class_name = HANDLERS[lang_id]
+    module = importlib.import_module(f"{package}.languages.{module_name}.handler")
+    manager.register_language(lang_id, getattr(module, class_name))
+    return manager.get_handler(lang_id)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="导出整个卡组为图片或 PDF")
+    parser.add_argument("deck", choices=sorted(HANDLERS), help="卡组 ID")
+    parser.add_argument("--format", default="png", choices=["png", "webp", "jpeg", "pdf"], help="输出格式")
+    parser.add_argument("--out", type=Path, default=None, help="导出目录（默认 data/exports/<卡组>_<格式>）")
+    parser.add_argument("--scale", type=int, default=2, help="设备缩放倍数")
+    parser.add_argument("--quality", type=int, default=90, help="webp / jpeg 质量")
+    parser.add_argument("--pool", type=int, default=4, help="浏览器页面数（并发渲染数）")
+    parser.add_argument("--batch", type=int, default=None, help="每个页面同时排版的卡片数（默认按网格容量，1 为逐张渲染）")
+    parser.add_argument("--level", default="all", help="japanese 卡组的 JLPT 等级筛选")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    deck_export = importlib.import_module(f"{package}.core.deck_export")
+    image_renderer = importlib.import_module(f"{package}.core.image_renderer")
+
+    handler = load_handler(args.deck)
+    if args.deck == "japanese":
+        words = handler.load_words(level_filter=args.level)
+    else:
+        words = handler.load_words()
+    print(f"卡组 {args.deck}: {len(words)} 张卡片")
+
+    renderer = image_renderer.ImageRenderer(pool_size=args.pool)
+    photos_dir = project_dir / "photos"
+    backgrounds = sorted(
+        path for path in photos_dir.glob("*")
+        if path.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp")
+    ) if photos_dir.exists() else []
+    if backgrounds:
+        renderer.allow_asset_dir(photos_dir)
+
+    theme_colors = handler.get_theme_colors()
+
+    def build_html(word) -> str:
+        # 视觉参数按 (模板, 单词) 固定随机种子选取；背景图只取自本地 photos/，与插件发送的卡片不一定相同
+        rng = handler.card_rng(word)
+        bg_url = image_renderer.local_asset_url(rng.choice(backgrounds)) if backgrounds else PLAIN_BACKGROUND
+        return handler.render_card(
+            word,
+            bg_url=bg_url,
+            theme_color=rng.choice(theme_colors),
+            bg_position=f"{rng.randint(0, 100)}% {rng.randint(0, 100)}%"
+        )
+
+    output_dir = args.out or project_dir / "data" / "exports" / f"{args.deck}_{args.format}"
+    exporter = deck_export.DeckExporter(
+        renderer,
+        args.deck,
+        words,
+        build_html,
+        output_dir,
+        handler.config.card_size,
+        scale=args.scale,
+        fmt=args.format,
+        quality=args.quality,
+        batch_size=args.batch
+    )
+
+    def on_progress(progress):
+        percent = progress.done * 100 // progress.total if progress.total else 100
+        print(f"  {percent:3d}% {progress.summary()}", flush=True)
+
+    started = time.monotonic()
+    try:
+        progress = await exporter.run(on_progress=on_progress)
+    finally:
+        await renderer.close()
+
+    print("=" * 50)
+    print(f"导出目录: {output_dir}")
+    print(f"本次渲染 {progress.rendered} 张，用时 {time.monotonic() - started:.1f} 秒，{progress.rate:.2f} 张/秒")
+    if progress.failed:
+        print(f"失败 {progress.failed} 张，重新运行相同命令可继续导出")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+测试背景图本地缓存
+
+在本机启动一个 HTTP 服务代替 CDN，用默认的 HttpFetcher 下载，
+外面再包一层计数的 BackgroundFetcher，检查：
+- 同一 URL 并发请求只下载一次，之后命中缓存
+- 下载后远程地址改写为虚拟源地址，并能还原为本地文件
+- 404 和非图片响应不会写入缓存
+- 安装 Pillow 时生成派生图
+"""
+
+import asyncio
+import functools
+import http.server
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+# 1x1 PNG，未安装 Pillow 时作为背景图
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360f8cfc0f01f0005000201e3b3d6"
+    "bc0000000049454e44ae426082"
+)
+
+
+def write_backgrounds(directory: Path):
+    """生成测试用背景图和一个非图片文件"""
+    try:
+        from PIL import Image
+        Image.new("RGB", (1600, 1200), (40, 90, 160)).save(directory / "bg.jpg", quality=90)
+    except ImportError:
+        (directory / "bg.jpg").write_bytes(TINY_PNG)
+    (directory / "page.html").write_text("<html></html>", encoding="utf-8")
+
+
+def start_server(directory: Path):
+    """在随机端口启动静态文件服务，返回 (server, 根地址)"""
+    class QuietHandler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    handler = functools.partial(QuietHandler, directory=str(directory))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def main():
+    from core.background_assets import BackgroundAssetManager, BackgroundFetcher, HttpFetcher, PIL_AVAILABLE
+
+    class CountingFetcher(BackgroundFetcher):
+        """记录实际下载次数的下载器"""
+
+        def __init__(self):
+            self.inner = HttpFetcher(timeout=10)
+            self.calls = 0
+
+        async def fetch(self, url: str) -> bytes:
+            self.calls += 1
+            return await self.inner.fetch(url)
+
+    print("测试背景图本地缓存...")
+
+    with tempfile.TemporaryDirectory() as temp:
+        serve_dir = Path(temp) / "cdn"
+        serve_dir.mkdir()
+        write_backgrounds(serve_dir)
+        server, origin = start_server(serve_dir)
+
+        fetcher = CountingFetcher()
+        assets = BackgroundAssetManager(Path(temp) / "cache", fetcher=fetcher)
+        url = f"{origin}/bg.jpg"
+
+        try:
+            # 并发请求只下载一次
+            paths = await asyncio.gather(*(assets.ensure(url) for _ in range(5)))
+            assert all(path is not None for path in paths), "下载失败"
+            assert len({str(path) for path in paths}) == 1
+            assert fetcher.calls == 1, f"并发请求下载了 {fetcher.calls} 次"
+
+            # 再次请求命中缓存
+            assert await assets.ensure(url) == paths[0]
+            assert fetcher.calls == 1
+            print(f"  下载与缓存: OK ({paths[0].stat().st_size} 字节)")
+
+            # 地址改写与还原
+            local_url = assets.localize(url)
+            assert local_url != url
+            assert assets.source_path(local_url) == paths[0].resolve()
+            print(f"  地址改写: {local_url}")
+
+            # 404 与非图片响应
+            assert await assets.ensure(f"{origin}/missing.jpg") is None
+            assert await assets.ensure(f"{origin}/page.html") is None
+            assert assets.cached_path(f"{origin}/page.html") is None
+            print("  错误响应不入缓存: OK")
+
+            # 派生图
+            if PIL_AVAILABLE:
+                assert await assets.prepare(url, (432, 540), 2, blur=20)
+                cover, blurred = assets.resolve(url, (432, 540), 2, blur=20)
+                assert cover and blurred
+                print("  派生图: OK")
+            else:
+                print("  未安装 Pillow，跳过派生图")
+        finally:
+            server.shutdown()
+
+    print("测试成功！")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
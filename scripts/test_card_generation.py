@@ -16,6 +16,9 @@ sys.path.insert(0, str(project_dir))
 from dataclasses import dataclass, field
 from typing import Optional, Dict, List
 
+# 与插件使用同一渲染器（没有 Jinja2 时为内置简易模板，支持 {% if %} 条件块）
+from core.card_renderer import CardRenderer
+
 
 @dataclass
 class WordEntry:
@@ -44,34 +47,6 @@ class LanguageConfig:
             return cls(json.load(f))
 
 
-class CardRenderer:
-    def __init__(self, templates_dir):
-        self.templates_dir = templates_dir
-
-    def render(self, template_name, variables):
-        template_path = self.templates_dir / template_name
-        with open(template_path, "r", encoding="utf-8") as f:
-            html = f.read()
-
-        # 简单的模板替换
-        for key, value in variables.items():
-            html = html.replace("{{" + key + "}}", str(value) if value else "")
-
-        # 处理简单的 {% if %} 条件
-        import re
-        # 移除 {% if xxx %} ... {% endif %} 中内容为空的块
-        pattern = r'\{% if (\w+) %\}(.*?)\{% endif %\}'
-        def replace_if(match):
-            var_name = match.group(1)
-            content = match.group(2)
-            if variables.get(var_name):
-                return content
-            return ""
-        html = re.sub(pattern, replace_if, html, flags=re.DOTALL)
-
-        return html
-
-
 # CDN 背景图
 CDN_BACKGROUNDS = [
     "https://tuchuang12.oss-cn-hangzhou.aliyuncs.com/photos/alex-he-IGsLkWL4JMM-unsplash.jpg",
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+测试每日推送调度和发件箱重试
+
+不依赖 AstrBot 和浏览器，检查：
+- 跨午夜的补执行：错过的任务在 catch_up 时长内立即执行，任务日期为错过的那一天
+- 同一时刻在不同时区的时段按各自的本地日期安排
+- 没有完成记录的新时段、超出补执行时长的任务不补执行
+- 生成时间晚于推送时间的时段，推送对应前一天的生成
+- 一个时段生成较慢时，其他时段的推送不被阻塞，同一时段的推送等待其生成完成
+- 发件箱失败投递按指数退避重试，超过次数后放弃
+
+用法:
+    python scripts/test_scheduler.py
+"""
+
+import asyncio
+import datetime
+import sys
+import tempfile
+import time
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+from core.delivery import DeliveryResult  # noqa: E402
+from core.outbox import RETRY_BASE_DELAY, Outbox  # noqa: E402
+from core.scheduler import DailyScheduler, JobStateStore, ScheduledJob, generate_occurrence  # noqa: E402
+from core.subscriptions import SlotPlan  # noqa: E402
+
+
+def local_ts(tz: str, *args) -> float:
+    """时区本地时间对应的时间戳"""
+    return datetime.datetime(*args, tzinfo=ZoneInfo(tz)).timestamp()
+
+
+def make_scheduler(temp: Path, done, catch_up: float = 6 * 3600) -> DailyScheduler:
+    """创建调度器并直接设置完成记录（不启动调度协程）"""
+    async def runner(kind, slots, occurrences):
+        pass
+
+    scheduler = DailyScheduler(JobStateStore(temp / "schedule.db"), runner, catch_up=catch_up)
+    scheduler._done = dict(done)
+    return scheduler
+
+
+def test_next_job(temp: Path):
+    """补执行判断"""
+    shanghai = SlotPlan("japanese", "japanese", "23:50", "07:00", timezone="Asia/Shanghai")
+    berlin = SlotPlan("english", "english", "23:50", "07:00", timezone="Europe/Berlin")
+
+    # 上海 10-17 00:10（柏林 10-16 18:10），上海时段昨晚 23:50 的生成被错过
+    now = local_ts("Asia/Shanghai", 2026, 10, 17, 0, 10)
+    scheduler = make_scheduler(temp, {
+        (shanghai.key, "generate"): "2026-10-15",
+        (berlin.key, "generate"): "2026-10-15",
+    })
+    job = scheduler._next_job(shanghai, "generate", now)
+    assert job.due == now and job.occurrence == "2026-10-16", job
+    # 柏林时段 10-16 23:50 尚未到来，10-15 已完成，按时安排
+    job = scheduler._next_job(berlin, "generate", now)
+    assert job.occurrence == "2026-10-16", job
+    assert job.due == local_ts("Europe/Berlin", 2026, 10, 16, 23, 50), job
+    print("  跨午夜补执行 / 跨时区本地日期: OK")
+
+    # 已完成则安排到当晚
+    scheduler._done[(shanghai.key, "generate")] = "2026-10-16"
+    job = scheduler._next_job(shanghai, "generate", now)
+    assert job.occurrence == "2026-10-17" and job.due == local_ts("Asia/Shanghai", 2026, 10, 17, 23, 50), job
+
+    # 新时段不补执行
+    fresh = SlotPlan("idiom", "idiom", "23:50", "07:00", timezone="Asia/Shanghai")
+    job = scheduler._next_job(fresh, "generate", now)
+    assert job.occurrence == "2026-10-17" and job.due > now, job
+
+    # 超出补执行时长（错过 6 小时 10 分钟）
+    scheduler._done[(shanghai.key, "generate")] = "2026-10-15"
+    late = local_ts("Asia/Shanghai", 2026, 10, 17, 6, 0)
+    job = scheduler._next_job(shanghai, "generate", late)
+    assert job.occurrence == "2026-10-17" and job.due > late, job
+    print("  新时段 / 超出补执行时长不补执行: OK")
+
+    # 执行中的任务不重复安排，但预生成看到的下一次执行仍是执行中的那一天
+    scheduler._running[(shanghai.key, "generate")] = ("2026-10-16", None)
+    job = scheduler._next_job(shanghai, "generate", now)
+    assert job.occurrence == "2026-10-17" and job.due > now, job
+    job = scheduler._next_job(shanghai, "generate", now, include_running=False)
+    assert job.occurrence == "2026-10-16", job
+    print("  执行中的任务: OK")
+
+    # 推送对应的生成日期
+    assert generate_occurrence(shanghai, "2026-10-17") == "2026-10-16"
+    morning = SlotPlan("english", "english", "07:30", "08:00")
+    assert generate_occurrence(morning, "2026-10-17") == "2026-10-17"
+    print("  推送对应的生成日期: OK")
+    scheduler.state.close()
+
+
+async def test_concurrent_slots(temp: Path):
+    """慢时段不阻塞其他时段的推送"""
+    tz = "Asia/Shanghai"
+    trigger = (datetime.datetime.now(ZoneInfo(tz)) - datetime.timedelta(minutes=2)).strftime("%H:%M")
+    slow = SlotPlan("japanese", "japanese", trigger, trigger, timezone=tz)
+    fast = SlotPlan("english", "english", trigger, trigger, timezone=tz)
+
+    state = JobStateStore(temp / "concurrent.db")
+    # 两个时段都有较早的完成记录，启动后生成和推送都立即补执行
+    state.mark_done([
+        ScheduledJob(0, 0, 0, kind, slot.key, "2000-01-01")
+        for slot in (slow, fast) for kind in ("generate", "send")
+    ])
+
+    started = time.monotonic()
+    events = {}
+    all_done = asyncio.Event()
+
+    async def runner(kind, slots, occurrences):
+        if kind == "generate" and slots[0].key == slow.key:
+            await asyncio.sleep(0.5)
+        for slot in slots:
+            events[(kind, slot.deck)] = time.monotonic() - started
+        if len(events) == 4:
+            all_done.set()
+
+    scheduler = DailyScheduler(state, runner, catch_up=3600)
+    scheduler.update([slow, fast])
+    task = asyncio.create_task(scheduler.run())
+    try:
+        await asyncio.wait_for(all_done.wait(), 5)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert events[("send", "english")] < 0.25, events
+    assert events[("send", "japanese")] >= events[("generate", "japanese")], events
+    done = state.load()
+    assert all(done[(slot.key, kind)] != "2000-01-01" for slot in (slow, fast) for kind in ("generate", "send")), done
+    state.close()
+    print(
+        f"  慢时段不阻塞: english 推送 {events[('send', 'english')] * 1000:.0f} ms，"
+        f"japanese 推送 {events[('send', 'japanese')] * 1000:.0f} ms（等待自身生成）"
+    )
+
+
+def test_outbox_backoff(temp: Path):
+    """发件箱指数退避"""
+    image = temp / "card.png"
+    image.write_bytes(b"png")
+    outbox = Outbox(temp / "outbox", max_attempts=3, max_age=3600)
+    outbox.enqueue("card", "每日单词", image, ["ok", "flaky"])
+
+    cards = outbox.due()
+    assert [card.targets for card in cards] == [["flaky", "ok"]], cards
+
+    delays = []
+    for attempt in range(3):
+        before = time.time()
+        counts = outbox.record("card", [DeliveryResult("ok", True, 0), DeliveryResult("flaky", False, 0, "timeout")])
+        if attempt < 2:
+            assert counts["retrying"] == 1, counts
+            delays.append(outbox.next_attempt_at() - before)
+            # 未到重试时间不会再次取出，到时间后取出
+            assert outbox.due() == []
+            assert [card.targets for card in outbox.due(now=outbox.next_attempt_at())] == [["flaky"]]
+        else:
+            assert counts["expired"] == 1, counts
+
+    assert abs(delays[0] - RETRY_BASE_DELAY) < 5 and abs(delays[1] - 2 * RETRY_BASE_DELAY) < 5, delays
+    assert outbox.next_attempt_at() is None
+    outbox.cleanup()
+    outbox.close()
+    print(f"  发件箱退避: {[round(d) for d in delays]} 秒后重试，第 3 次失败后放弃")
+
+
+def main():
+    print("测试推送调度...")
+    with tempfile.TemporaryDirectory() as temp:
+        temp = Path(temp)
+        test_next_job(temp)
+        asyncio.run(test_concurrent_slots(temp))
+        test_outbox_backoff(temp)
+    print("测试成功！")
+
+
+if __name__ == "__main__":
+    main()